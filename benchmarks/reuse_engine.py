@@ -0,0 +1,67 @@
+r"""Benchmark reuse of openSMILE engines on short clips.
+
+Processes a set of random clips
+shorter than 2 s
+with ``reuse_engine=False`` and ``reuse_engine=True``
+and reports the average processing time per file.
+
+.. code-block:: bash
+
+    $ python benchmarks/reuse_engine.py
+
+"""
+
+import os
+import tempfile
+import time
+
+import numpy as np
+
+import audiofile
+
+import opensmile
+
+
+num_files = 500
+sampling_rate = 16000
+feature_sets = [
+    opensmile.FeatureSet.eGeMAPSv02,
+    opensmile.FeatureSet.ComParE_2016,
+]
+feature_levels = [
+    opensmile.FeatureLevel.LowLevelDescriptors,
+    opensmile.FeatureLevel.Functionals,
+]
+
+
+with tempfile.TemporaryDirectory() as root:
+    rng = np.random.default_rng(0)
+    files = []
+    for idx in range(num_files):
+        duration = rng.uniform(0.2, 2.0)
+        signal = rng.normal(scale=0.1, size=int(duration * sampling_rate))
+        file = os.path.join(root, f"{idx}.wav")
+        audiofile.write(file, signal.astype("float32"), sampling_rate)
+        files.append(file)
+
+    print(f"{'feature set':<15} {'level':<20} {'new':>8} {'reuse':>8} {'speed-up':>8}")
+    for feature_set in feature_sets:
+        for feature_level in feature_levels:
+            times = []
+            for reuse_engine in [False, True]:
+                smile = opensmile.Smile(
+                    feature_set,
+                    feature_level,
+                    reuse_engine=reuse_engine,
+                )
+                smile.process_files(files[:10])  # warm up
+                start = time.time()
+                smile.process_files(files)
+                times.append((time.time() - start) / num_files * 1000)
+            print(
+                f"{feature_set.name:<15} "
+                f"{feature_level.name:<20} "
+                f"{times[0]:>6.1f}ms "
+                f"{times[1]:>6.1f}ms "
+                f"{times[0] / times[1]:>7.2f}x"
+            )
@@ -1,7 +1,15 @@
 from opensmile.core.config import config
 from opensmile.core.define import FeatureLevel
 from opensmile.core.define import FeatureSet
+from opensmile.core.footprint import MemoryFootprint
+from opensmile.core.functionals import functionals
+from opensmile.core.job import Job
+from opensmile.core.pipeline import Pipeline
+from opensmile.core.scheduler import Scheduler
 from opensmile.core.smile import Smile
+from opensmile.core.store import FeatureStore
+from opensmile.core.stream import Stream
+from opensmile.core.workers import WorkerPool
 
 
 __all__ = []
@@ -19,6 +19,9 @@ class config:
     EXTERNAL_INPUT_CONFIG = "shared/standard_external_wave_input.conf.inc"
     """Standard config name for external wave input."""
 
+    EXTERNAL_INPUT_BUFFERED_CONFIG = "shared/standard_external_wave_input_rb.conf.inc"
+    """Standard config name for external wave input with fixed buffer size."""
+
     EXTERNAL_OUTPUT_SINGLE_CONFIG = (
         "shared/standard_external_data_output_single.conf.inc"
     )
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+import concurrent.futures
+import gc
+import multiprocessing
+import sys
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from opensmile.core.smile import Smile
+
+
+class MemoryFootprint:
+    r"""Memory footprint of feature extraction.
+
+    Runs ``smile`` on synthetic signals
+    of the given durations
+    and measures the peak memory
+    of every run.
+    Every run takes place in a new process,
+    so that runs do not influence each other.
+    Memory allocated by Python objects,
+    including NumPy arrays,
+    is traced with :mod:`tracemalloc`.
+    The remaining increase
+    of the peak resident set size of the process
+    is attributed to native code,
+    i.e. openSMILE.
+
+    A linear model
+    is fitted to the total memory
+    of all runs,
+    which predicts the memory needed
+    for a signal of any duration,
+    see :meth:`opensmile.MemoryFootprint.predict`.
+
+    Args:
+        smile: feature extractor
+        durations: durations of the synthetic signals in seconds
+        sampling_rate: sampling rate in Hz.
+            If ``None``,
+            the sampling rate of ``smile`` is used
+            or 16000 Hz
+            if it does not define one
+
+    Raises:
+        ValueError: if less than two durations are given
+
+    Examples:
+        >>> import opensmile
+        >>> smile = opensmile.Smile(
+        ...     feature_set=opensmile.FeatureSet.eGeMAPSv02,
+        ...     feature_level=opensmile.FeatureLevel.LowLevelDescriptors,
+        ... )
+        >>> footprint = MemoryFootprint(smile, [10, 20, 40])
+        >>> list(footprint.measurements.columns)
+        ['python', 'native', 'total']
+        >>> footprint.predict(1800) > footprint.predict(60)
+        True
+
+    """
+
+    def __init__(
+        self,
+        smile: Smile,
+        durations: Sequence[float] = (60, 120, 240),
+        *,
+        sampling_rate: int = None,
+    ):
+        if len(durations) < 2:
+            raise ValueError(
+                f"At least two durations are needed to fit a model, "
+                f"got {len(durations)}."
+            )
+        if sampling_rate is None:
+            sampling_rate = smile.process.sampling_rate or 16000
+
+        self.smile = smile
+        r"""Feature extractor"""
+        self.sampling_rate = sampling_rate
+        r"""Sampling rate in Hz"""
+
+        rows = []
+        for duration in durations:
+            # new process for every run,
+            # as the peak resident set size cannot be reset
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=multiprocessing.get_context("spawn"),
+            ) as executor:
+                rows.append(
+                    executor.submit(
+                        _measure,
+                        smile,
+                        duration,
+                        sampling_rate,
+                    ).result()
+                )
+
+        self.measurements = pd.DataFrame(
+            rows,
+            index=pd.Index(durations, name="duration", dtype="float64"),
+            columns=["python", "native", "total"],
+        )
+        r"""Peak memory in bytes for every duration in seconds"""
+
+        slope, intercept = np.polyfit(
+            self.measurements.index.to_numpy(),
+            self.measurements["total"].to_numpy(dtype="float64"),
+            1,
+        )
+        self.bytes_per_second = max(float(slope), 0.0)
+        r"""Memory in bytes per second of audio"""
+        self.offset = max(float(intercept), 0.0)
+        r"""Memory in bytes independent of duration"""
+
+    def predict(self, duration: float) -> float:
+        r"""Predict peak memory.
+
+        Args:
+            duration: duration of signal in seconds
+
+        Returns:
+            memory in bytes
+
+        """
+        return self.offset + self.bytes_per_second * duration
+
+
+def _measure(
+    smile: Smile,
+    duration: float,
+    sampling_rate: int,
+) -> tuple[int, int, int]:
+    r"""Peak memory of Python, native code and in total."""
+    rng = np.random.default_rng(0)
+    signal = rng.standard_normal(int(duration * sampling_rate), dtype=np.float32)
+    signal *= 0.1
+
+    # exclude memory for loading openSMILE
+    smile.process_signal(signal[:sampling_rate], sampling_rate)
+    gc.collect()
+
+    rss = _peak_rss()
+    tracemalloc.start()
+    smile.process_signal(signal, sampling_rate)
+    _, python = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    total = max(_peak_rss() - rss, python)
+
+    return python, total - python, total
+
+
+def _peak_rss() -> int:
+    r"""Peak resident set size of current process in bytes."""
+    if sys.platform == "win32":  # pragma: no cover
+        import ctypes
+        from ctypes import wintypes
+
+        class ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        ctypes.windll.psapi.GetProcessMemoryInfo(
+            ctypes.windll.kernel32.GetCurrentProcess(),
+            ctypes.byref(counters),
+            counters.cb,
+        )
+        return counters.PeakWorkingSetSize
+
+    import resource
+
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":  # pragma: no cover
+        # bytes on macOS
+        return rss
+    # kilobytes on Linux
+    return rss * 1024
@@ -0,0 +1,658 @@
+from __future__ import annotations
+
+import functools
+import re
+
+import numpy as np
+import pandas as pd
+
+from opensmile.core.define import FeatureLevel
+from opensmile.core.define import FeatureSet
+from opensmile.core.smile import Smile
+
+
+_F0 = "F0semitoneFrom27.5Hz_sma3nz"
+
+# Frame step in seconds of low-level descriptors
+# of the GeMAPS family
+_FRAME_STEP = 0.01
+
+# openSMILE computes voiced and unvoiced segments
+# only from frames starting at least 70 ms
+# before the end of a segment
+_SEGMENT_MARGIN = pd.Timedelta(70, unit="ms").value
+
+# Functionals of openSMILE's temporal set
+# with low-level descriptor, functional type and argument,
+# see _specs()
+_TEMPORAL = {
+    "loudnessPeaksPerSec": ("loudness_sma3", "peaksPerSec", None),
+    "VoicedSegmentsPerSec": (_F0, "segmentsPerSec", "V"),
+    "MeanVoicedSegmentLengthSec": (_F0, "meanSegmentLength", "V"),
+    "StddevVoicedSegmentLengthSec": (_F0, "stddevSegmentLength", "V"),
+    "MeanUnvoicedSegmentLength": (_F0, "meanSegmentLength", "UV"),
+    "StddevUnvoicedSegmentLength": (_F0, "stddevSegmentLength", "UV"),
+}
+
+_SLOPES = [
+    "meanRisingSlope",
+    "stddevRisingSlope",
+    "meanFallingSlope",
+    "stddevFallingSlope",
+]
+
+
+def functionals(
+    lld: pd.DataFrame,
+    index: pd.Index = None,
+    *,
+    feature_set: str | FeatureSet = FeatureSet.eGeMAPSv02,
+) -> pd.DataFrame:
+    r"""Compute functionals from low-level descriptors.
+
+    Computes the functionals of ``feature_set``
+    with NumPy
+    from low-level descriptors
+    as returned by :class:`opensmile.Smile`
+    with :attr:`opensmile.FeatureLevel.LowLevelDescriptors`.
+    This way the functionals of a new segmentation
+    can be computed
+    without extracting the low-level descriptors again.
+
+    Supported are arithmetic mean (``amean``),
+    normalized standard deviation (``stddevNorm``),
+    percentiles (``percentile<p>``),
+    percentile ranges (``pctlrange<i>-<j>``),
+    mean and standard deviation
+    of rising and falling slopes,
+    loudness peaks per second,
+    and rate, mean and standard deviation of the length
+    of voiced and unvoiced segments.
+    For low-level descriptors ending on ``nz``
+    only non-zero frames are considered,
+    for formant frequencies and bandwidths
+    only voiced frames.
+    Functionals of voiced (``V``)
+    and unvoiced (``UV``) frames,
+    e.g. ``alphaRatioV_sma3nz_amean``,
+    are computed from the smoothed low-level descriptor
+    of frames with non-zero or zero F0.
+    Peaks and slopes are found
+    between alternating maxima and minima,
+    which rise or fall by at least 10%
+    of the range of a segment.
+    Voiced and unvoiced segments
+    bridge gaps of a single frame
+    and are at least three frames long.
+    Like openSMILE,
+    they ignore frames starting
+    less than 70 ms before the end of a segment
+    and a voiced frame at the end.
+    The equivalent sound level
+    needs the energy of openSMILE
+    and is not part of the result.
+
+    A frame belongs to a segment
+    if its start lies inside the segment.
+    Results may deviate
+    from :attr:`opensmile.FeatureLevel.Functionals`
+    as openSMILE processes the signal of every segment
+    on its own
+    and computes some functionals
+    from low-level descriptors
+    before smoothing.
+    Deviations of a few percent are common,
+    rising slopes deviate more.
+
+    Args:
+        lld: low-level descriptors
+            with frames grouped by file
+            and sorted by start time
+        index: segments to compute functionals for.
+            Segmented index conform to audformat_
+            or index with levels ``start`` and ``end``.
+            If ``None``,
+            functionals are computed
+            over all frames of every file
+        feature_set: feature set with the functionals
+
+    Returns:
+        functionals
+
+    Raises:
+        ValueError: if ``lld`` does not contain
+            low-level descriptors of ``feature_set``
+
+    Examples:
+        >>> import numpy as np
+        >>> import opensmile
+        >>> smile = opensmile.Smile(
+        ...     feature_set=opensmile.FeatureSet.eGeMAPSv02,
+        ...     feature_level=opensmile.FeatureLevel.LowLevelDescriptors,
+        ... )
+        >>> lld = smile.process_signal(np.zeros(16000), 16000)
+        >>> y = functionals(lld)
+        >>> y.loudness_sma3_amean
+        start   end
+        0 days  0 days 00:00:01    0.001034
+        Name: loudness_sma3_amean, dtype: float32
+
+    .. _audformat: https://audeering.github.io/audformat/data-format.html
+
+    """
+    specs = _specs(_feature_names(feature_set), list(lld.columns))
+    if not specs:
+        raise ValueError(
+            f"'lld' does not contain low-level descriptors of '{feature_set}'."
+        )
+
+    sources = list(dict.fromkeys(_source(spec) for spec in specs))
+    columns = [column for column, _ in sources]
+    values = lld[columns].to_numpy(dtype=np.float64, copy=True)
+    nonzero = np.array([column.endswith("nz") for column in columns])
+    values[:, nonzero] = np.where(values[:, nonzero] == 0, np.nan, values[:, nonzero])
+    if _F0 in lld.columns:
+        voiced = lld[_F0].to_numpy() > 0
+        # openSMILE outputs formants for all frames,
+        # but computes their functionals only over voiced frames
+        formants = np.array(
+            [
+                re.match(r"F\d(frequency|bandwidth)", column) is not None
+                for column in columns
+            ]
+        )
+        values[np.ix_(~voiced, formants)] = np.nan
+        # functionals of voiced or unvoiced frames
+        # ignore zeros as well
+        for mask, frames in [("V", ~voiced), ("UV", voiced)]:
+            selected = np.array([source == mask for _, source in sources])
+            values[np.ix_(frames, selected)] = np.nan
+            values[:, selected] = np.where(
+                values[:, selected] == 0, np.nan, values[:, selected]
+            )
+
+    if index is None:
+        index = _file_index(lld)
+    lo, hi = _positions(lld.index, index)
+    durations = _durations(lld.index, index, lo, hi)
+
+    results = {}
+
+    # moments from cumulative sums
+    # over all segments at once
+    valid = ~np.isnan(values)
+    zeros = np.zeros((1, len(sources)))
+    counts = np.concatenate([zeros, np.cumsum(valid, axis=0)])
+    sums = np.concatenate([zeros, np.nancumsum(values, axis=0)])
+    squares = np.concatenate([zeros, np.nancumsum(values**2, axis=0)])
+    n = counts[hi] - counts[lo]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = (sums[hi] - sums[lo]) / n
+        std = np.sqrt(np.maximum((squares[hi] - squares[lo]) / n - mean**2, 0))
+        std_norm = std / mean
+    results["amean"] = mean
+    results["stddevNorm"] = std_norm
+
+    qs = sorted({q for _, _, functional, q in specs if functional == "percentile"})
+    if qs:
+        percentiles = _percentiles(values, lo, hi, n, qs)
+
+    cols = {
+        sources.index(_source(spec))
+        for spec in specs
+        if spec[2] in ["peaksPerSec", *_SLOPES]
+    }
+    if cols:
+        peaks = _peaks(values, lo, hi, sorted(cols))
+        # openSMILE normalizes by the time
+        # between the first and last sample
+        duration = durations / 1e9 - _FRAME_STEP
+        with np.errstate(divide="ignore", invalid="ignore"):
+            results["peaksPerSec"] = peaks[:, :, 0] / duration[:, np.newaxis]
+        for idx, functional in enumerate(_SLOPES):
+            results[functional] = peaks[:, :, idx + 1]
+
+    if _F0 in lld.columns:
+        step = pd.Timedelta(_FRAME_STEP, unit="s").value
+        last = lo + np.maximum((durations - _SEGMENT_MARGIN) // step + 1, 0)
+        last = np.minimum(last, hi)
+        # and ignores the last frame if it is voiced,
+        # the appended frame handles empty low-level descriptors
+        last = np.where(
+            (last > lo) & np.append(voiced, False)[last - 1], last - 1, last
+        )
+        for mask, frames in [("V", voiced), ("UV", ~voiced)]:
+            stats = _segment_stats(frames, lo, last)
+            for functional, x in zip(
+                ["segmentsPerSec", "meanSegmentLength", "stddevSegmentLength"],
+                stats,
+            ):
+                results[functional, mask] = x
+
+    data = np.zeros((len(lo), len(specs)), dtype=np.float32)
+    for idx, spec in enumerate(specs):
+        _, column, functional, arg = spec
+        col = sources.index(_source(spec))
+        if functional == "percentile":
+            x = percentiles[qs.index(arg), :, col]
+        elif functional == "pctlrange":
+            q1, q2 = arg
+            x = percentiles[qs.index(q2), :, col] - percentiles[qs.index(q1), :, col]
+        elif (functional, arg) in results:
+            x = results[functional, arg]
+        else:
+            x = results[functional][:, col]
+        data[:, idx] = np.nan_to_num(x, nan=0, posinf=0, neginf=0)
+
+    return pd.DataFrame(
+        data,
+        index=index,
+        columns=[name for name, _, _, _ in specs],
+    )
+
+
+def _bounds(index: pd.Index) -> tuple[np.ndarray, np.ndarray]:
+    r"""Start and end of every segment.
+
+    Missing ends are set to the largest representable time.
+
+    """
+    if "start" in index.names:
+        starts = index.get_level_values("start").to_numpy("timedelta64[ns]")
+        ends = index.get_level_values("end").to_numpy("timedelta64[ns]")
+    else:
+        starts = np.zeros(len(index), dtype="timedelta64[ns]")
+        ends = np.full(len(index), np.timedelta64("NaT"), dtype="timedelta64[ns]")
+    ends = np.where(np.isnat(ends), np.timedelta64(np.iinfo(np.int64).max, "ns"), ends)
+    return starts, ends
+
+
+def _durations(
+    frames: pd.MultiIndex,
+    index: pd.Index,
+    lo: np.ndarray,
+    hi: np.ndarray,
+) -> np.ndarray:
+    r"""Duration of every segment in nanoseconds.
+
+    Segments end at the latest
+    with the end of their last frame.
+
+    """
+    starts, ends = _bounds(index)
+    frame_ends = np.append(
+        frames.get_level_values("end").to_numpy("timedelta64[ns]"),
+        np.timedelta64(0, "ns"),
+    )
+    ends = np.where(hi > lo, np.minimum(ends, frame_ends[hi - 1]), starts)
+    return (ends - starts).astype(np.int64)
+
+
+def _extrema(
+    x: np.ndarray,
+    positions: np.ndarray,
+    signs: np.ndarray,
+    threshold: float,
+) -> np.ndarray:
+    r"""Positions of alternating maxima and minima.
+
+    Like the peaks functional of openSMILE,
+    of the local maxima (``signs`` 1)
+    and minima (``signs`` -1)
+    at ``positions``,
+    maxima that rise less than ``threshold``
+    above the preceding minimum are removed first,
+    then minima that fall less than ``threshold``
+    below the preceding maximum.
+    Neighboring extrema of the same kind are merged
+    into the more extreme one.
+    The result starts with a maximum.
+
+    """
+    extrema = list(zip(positions, signs))
+    for sign in [1, -1]:
+        kept = []
+        for position, kind in extrema:
+            if kept:
+                last, last_kind = kept[-1]
+                if last_kind == kind:
+                    if kind * (x[position] - x[last]) > 0:
+                        kept[-1] = (position, kind)
+                    continue
+                if kind == sign and kind * (x[position] - x[last]) < threshold:
+                    continue
+            kept.append((position, kind))
+        extrema = kept
+    if extrema and extrema[0][1] == -1:
+        extrema = extrema[1:]
+    return np.array([position for position, _ in extrema], dtype=np.int64)
+
+
+@functools.lru_cache
+def _feature_names(feature_set: str | FeatureSet) -> list[str]:
+    r"""Names of functionals of feature set."""
+    return Smile(feature_set, FeatureLevel.Functionals).feature_names
+
+
+def _file_index(lld: pd.DataFrame) -> pd.Index:
+    r"""Segment over all frames of every file."""
+    frames = lld.index.to_frame(index=False)
+    if "file" in frames:
+        group = frames.groupby("file", sort=False)
+        return pd.MultiIndex.from_arrays(
+            [
+                list(group.groups),
+                group["start"].min().to_numpy(),
+                group["end"].max().to_numpy(),
+            ],
+            names=["file", "start", "end"],
+        )
+    return pd.MultiIndex.from_arrays(
+        [[frames["start"].min()], [frames["end"].max()]],
+        names=["start", "end"],
+    )
+
+
+def _peaks(
+    values: np.ndarray,
+    lo: np.ndarray,
+    hi: np.ndarray,
+    cols: list[int],
+) -> np.ndarray:
+    r"""Number of peaks and mean and standard deviation of slopes.
+
+    Returns an array of shape
+    ``(segments, columns, 5)``
+    with the number of maxima,
+    mean and standard deviation of rising slopes
+    and of falling slopes
+    in units per second
+    of the columns in ``cols``.
+    Frames without a value are skipped.
+    Local extrema and slopes
+    are computed for all segments at once.
+    Whether an extremum is kept
+    depends on the extrema kept before it,
+    so only this step runs per segment,
+    see :func:`_extrema`.
+
+    """
+    peaks = np.full((len(lo), values.shape[1], 5), np.nan)
+    for col in cols:
+        frames = np.flatnonzero(~np.isnan(values[:, col]))
+        x = values[frames, col]
+        # segments in frames with a value
+        first = np.searchsorted(frames, lo)
+        last = np.searchsorted(frames, hi)
+        segments = np.flatnonzero(last > first)
+
+        # local extrema
+        positions = np.arange(1, len(x) - 1)
+        d = np.diff(x)
+        is_max = (d[:-1] > 0) & (d[1:] <= 0)
+        is_min = (d[:-1] < 0) & (d[1:] >= 0)
+        signs = np.where(is_max, 1, -1)[is_max | is_min]
+        positions = positions[is_max | is_min]
+        # extrema need a neighbor on both sides
+        # inside of the segment
+        begin = np.searchsorted(positions, first + 1)
+        end = np.searchsorted(positions, last - 1)
+
+        extrema = []
+        for idx in segments:
+            segment = x[first[idx] : last[idx]]
+            extrema.append(
+                _extrema(
+                    x,
+                    positions[begin[idx] : end[idx]],
+                    signs[begin[idx] : end[idx]],
+                    0.1 * (segment.max() - segment.min()),
+                )
+            )
+        lengths = np.array([len(e) for e in extrema], dtype=np.int64)
+        extrema = np.concatenate(extrema or [np.zeros(0, dtype=np.int64)])
+        owners = np.repeat(segments, lengths)
+        # extrema start with a maximum
+        ranks = np.arange(len(extrema)) - np.repeat(
+            np.cumsum(lengths) - lengths, lengths
+        )
+        peaks[segments, col, 0] = (lengths + 1) // 2
+
+        # slopes between neighboring extrema of a segment,
+        # which are falling for even ranks
+        inner = owners[1:] == owners[:-1]
+        slopes = np.abs(np.diff(x[extrema]) / (np.diff(extrema) * _FRAME_STEP))
+        for offset, rising in [(1, True), (3, False)]:
+            selected = inner & ((ranks[:-1] % 2 == 1) == rising)
+            owner = owners[:-1][selected]
+            slope = slopes[selected]
+            count = np.bincount(owner, minlength=len(lo))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                mean = np.bincount(owner, slope, minlength=len(lo)) / count
+                std = np.sqrt(
+                    np.bincount(owner, (slope - mean[owner]) ** 2, minlength=len(lo))
+                    / count
+                )
+            peaks[segments, col, offset] = mean[segments]
+            peaks[segments, col, offset + 1] = std[segments]
+    return peaks
+
+
+def _percentiles(
+    values: np.ndarray,
+    lo: np.ndarray,
+    hi: np.ndarray,
+    n: np.ndarray,
+    qs: list[float],
+) -> np.ndarray:
+    r"""Percentiles of all segments at once.
+
+    Frames of every segment are gathered
+    and sorted within their segment,
+    with NaN at the end.
+    Percentiles are linearly interpolated
+    as in :func:`numpy.nanpercentile`.
+    Returns an array of shape
+    ``(len(qs), segments, columns)``.
+
+    """
+    lengths = hi - lo
+    offsets = np.concatenate([[0], np.cumsum(lengths)])
+    rows = np.arange(offsets[-1]) - np.repeat(offsets[:-1] - lo, lengths)
+    segments = np.repeat(np.arange(len(lo)), lengths)
+
+    x = values[rows]
+    order = np.argsort(x, axis=0, kind="stable")
+    order = np.take_along_axis(
+        order,
+        np.argsort(segments[order], axis=0, kind="stable"),
+        axis=0,
+    )
+    x = np.take_along_axis(x, order, axis=0)
+
+    cols = np.arange(values.shape[1])
+    percentiles = np.full((len(qs), len(lo), values.shape[1]), np.nan)
+    valid = n > 0
+    last = np.maximum(n - 1, 0)
+    for idx, q in enumerate(qs):
+        position = q / 100 * last
+        below = np.floor(position).astype(np.int64)
+        above = np.minimum(below + 1, last.astype(np.int64))
+        fraction = position - below
+        start = offsets[:-1, np.newaxis]
+        lower = x[np.minimum(start + below, len(x) - 1), cols]
+        upper = x[np.minimum(start + above, len(x) - 1), cols]
+        percentiles[idx] = np.where(
+            valid,
+            lower + (upper - lower) * fraction,
+            np.nan,
+        )
+    return percentiles
+
+
+def _positions(
+    frames: pd.MultiIndex,
+    index: pd.Index,
+) -> tuple[np.ndarray, np.ndarray]:
+    r"""First and last position (exclusive) of frames of every segment."""
+    frame_files = _files(frames)
+    frame_starts = frames.get_level_values("start").to_numpy("timedelta64[ns]")
+
+    files = _files(index)
+    starts, ends = _bounds(index)
+
+    # frames are grouped by file
+    changes = np.flatnonzero(frame_files[1:] != frame_files[:-1]) + 1
+    offsets = np.concatenate([[0], changes, [len(frames)]])
+    groups = {
+        frame_files[offset]: (offset, end)
+        for offset, end in zip(offsets[:-1], offsets[1:])
+        if end > offset
+    }
+
+    lo = np.zeros(len(index), dtype=np.int64)
+    hi = np.zeros(len(index), dtype=np.int64)
+    for file in pd.unique(files):
+        mask = files == file
+        offset, end = groups.get(file, (0, 0))
+        file_starts = frame_starts[offset:end]
+        lo[mask] = offset + np.searchsorted(file_starts, starts[mask])
+        hi[mask] = offset + np.searchsorted(file_starts, ends[mask])
+    return lo, hi
+
+
+def _files(index: pd.Index) -> np.ndarray:
+    r"""File of every entry in index."""
+    if "file" in index.names:
+        return index.get_level_values("file").to_numpy(dtype=object)
+    return np.full(len(index), "", dtype=object)
+
+
+def _segment_stats(
+    mask: np.ndarray,
+    lo: np.ndarray,
+    hi: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    r"""Rate, mean and standard deviation of segment lengths.
+
+    Segments are runs of frames in ``mask``,
+    which bridge gaps of a single frame.
+    As in openSMILE,
+    the length of a segment
+    is the distance of its first and last frame
+    and segments shorter than three frames are ignored.
+    Runs are clipped to the segments in ``lo`` and ``hi``.
+
+    """
+    bridged = mask.copy()
+    bridged[1:-1] |= mask[:-2] & mask[2:]
+    edges = np.flatnonzero(np.diff(np.concatenate([[0], bridged, [0]])))
+    starts, ends = edges[0::2], edges[1::2]
+
+    # runs inside of a segment
+    # from cumulative sums
+    lengths = ends - starts
+    valid = lengths >= 3
+    zero = np.zeros(1)
+    count = np.concatenate([zero, np.cumsum(valid)])
+    total = np.concatenate([zero, np.cumsum(np.where(valid, lengths - 1, 0))])
+    squares = np.concatenate([zero, np.cumsum(np.where(valid, lengths - 1, 0) ** 2)])
+    first = np.searchsorted(starts, lo)
+    last = np.searchsorted(ends, hi, side="right")
+    inner = last > first
+    first_inner = np.where(inner, first, 0)
+    last_inner = np.where(inner, last, 0)
+    num = count[last_inner] - count[first_inner]
+    sums = total[last_inner] - total[first_inner]
+    sums2 = squares[last_inner] - squares[first_inner]
+
+    # runs clipped at the start or end of a segment,
+    # an empty run is appended to look up
+    # neighbors of non-existing runs
+    num_runs = len(starts)
+    starts = np.append(starts, 0)
+    ends = np.append(ends, 0)
+    before = np.maximum(first - 1, 0)
+    head = np.where(
+        (first > 0) & (ends[before] > lo),
+        np.minimum(ends[before], hi) - lo,
+        0,
+    )
+    tail = np.where(
+        (last < num_runs) & (starts[last] >= lo) & (starts[last] < hi),
+        hi - starts[last],
+        0,
+    )
+    for clipped in [head, tail]:
+        keep = clipped >= 3
+        num = num + keep
+        sums = sums + np.where(keep, clipped - 1, 0)
+        sums2 = sums2 + np.where(keep, clipped - 1, 0) ** 2
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = sums / num
+        std = np.sqrt(np.maximum(sums2 / num - mean**2, 0))
+        rate = num / ((hi - lo) * _FRAME_STEP)
+    return rate, mean * _FRAME_STEP, std * _FRAME_STEP
+
+
+def _source(spec: tuple[str, str, str, object]) -> tuple[str, str | None]:
+    r"""Low-level descriptor and frame selection of functional."""
+    _, column, functional, arg = spec
+    if functional in ["amean", "stddevNorm"]:
+        return column, arg
+    return column, None
+
+
+def _specs(
+    names: list[str],
+    columns: list[str],
+) -> list[tuple[str, str, str, object]]:
+    r"""Parse functionals that can be computed from columns.
+
+    Returns tuples of functional name,
+    low-level descriptor,
+    functional type,
+    and its argument,
+    e.g. percentile
+    or ``'V'`` and ``'UV'``
+    for functionals of voiced or unvoiced frames.
+
+    """
+    lookup = {column.lower(): column for column in columns}
+    has_f0 = _F0 in columns
+    percentiles = {}
+    specs = []
+    for name in names:
+        if name in _TEMPORAL:
+            lld, functional, arg = _TEMPORAL[name]
+            if lld.lower() in lookup and (has_f0 or arg is None):
+                specs.append((name, lookup[lld.lower()], functional, arg))
+            continue
+        match = re.fullmatch(
+            r"(.+)_(amean|stddevNorm|percentile|pctlrange|"
+            r"(?:mean|stddev)(?:Rising|Falling)Slope)([0-9.-]*)",
+            name,
+        )
+        if match is None:
+            continue
+        lld, functional, arg = match.groups()
+        # e.g. alphaRatioV_sma3nz
+        # is alphaRatio_sma3 of voiced frames
+        voicing = re.fullmatch(r"(.+?)(UV|V)([0-9-]*)_sma3nz", lld)
+        if lld.lower() not in lookup and voicing is not None and has_f0:
+            base, arg, band = voicing.groups()
+            lld = f"{base}{band}_sma3"
+        if lld.lower() not in lookup:
+            continue
+        column = lookup[lld.lower()]
+        if functional == "percentile":
+            arg = float(arg)
+            percentiles.setdefault(column, []).append(arg)
+        elif functional == "pctlrange":
+            i, j = (int(x) for x in arg.split("-"))
+            arg = (percentiles[column][i], percentiles[column][j])
+        elif functional not in ["amean", "stddevNorm"] or arg not in ["V", "UV"]:
+            arg = None
+        specs.append((name, column, functional, arg))
+    return specs
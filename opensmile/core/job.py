@@ -0,0 +1,469 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from collections.abc import Sequence
+import concurrent.futures
+import hashlib
+import itertools
+import json
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+import audeer
+import audformat
+
+from opensmile.core.smile import Smile
+
+
+class Job:
+    r"""Resumable feature extraction in shards.
+
+    The index is split into shards
+    of consecutive entries.
+    Whether a new shard starts at a file
+    is decided by a hash of its path,
+    so that on average a shard holds
+    the entries of ``shard_size`` files
+    and adding or removing a file
+    only changes the shard it belongs to.
+    Consecutive entries of the same file
+    are identified by a hash
+    of the serialized feature extractor,
+    the file and the entries.
+    Files of the job are stored
+    in the folder ``<job_root>/<job>``,
+    where ``<job>`` is a hash
+    of the serialized feature extractor
+    and the names of the index levels.
+    The features of every shard are stored as
+    ``<job>/<shard>.pkl``,
+    where ``<shard>`` is a hash
+    of the hashes of its files,
+    next to ``<job>/<shard>.json``
+    with the hashes and number of rows of its files.
+    A manifest ``<job>/manifest.json``
+    lists the shards of the job.
+    Hence,
+    jobs with different feature extractors
+    can share ``job_root``.
+
+    When a job is run again,
+    shards that are already stored
+    are skipped,
+    i.e. after a crash
+    only the unfinished shards are processed.
+    Shards can be processed by any executor
+    following the :mod:`concurrent.futures` interface,
+    as long as it has access to ``job_root``.
+
+    This can also be used to update the features
+    of a growing or changing corpus:
+    when the job is run with an updated index,
+    only shards with new or changed entries are processed,
+    and only the features of new or changed files
+    are extracted,
+    the others are copied
+    from the shards of the previous run.
+    If ``fingerprint`` is not ``None``,
+    a fingerprint of every file
+    is included in its hash,
+    so that modified files
+    are processed again as well.
+    Shards of the previous run
+    that are no longer part of the job
+    are removed after a run.
+    As a job with another index
+    but the same feature extractor
+    is considered an update,
+    such jobs should not share ``job_root``.
+
+    Args:
+        smile: feature extractor
+        index: index conform to audformat_
+        job_root: folder to store the folder of the job
+        shard_size: average number of files per shard
+        root: root folder to expand relative file paths
+        fingerprint: fingerprint to detect modified files.
+            ``"mtime"`` uses size
+            and modification time of a file,
+            ``"md5"`` uses the MD5 sum of its content.
+            If ``None``,
+            files are not checked for modifications
+
+    Raises:
+        ValueError: if ``shard_size`` is smaller than 1
+        ValueError: if ``fingerprint`` is not supported
+
+    Examples:
+        >>> import audformat
+        >>> import opensmile
+        >>> smile = opensmile.Smile(
+        ...     feature_set=opensmile.FeatureSet.eGeMAPSv02,
+        ...     feature_level=opensmile.FeatureLevel.Functionals,
+        ... )
+        >>> index = audformat.filewise_index(["a.wav", "b.wav", "c.wav"])
+        >>> job = Job(smile, index, "./job", shard_size=2)
+        >>> job.pending == job.shards
+        True
+
+    .. _audformat: https://audeering.github.io/audformat/data-format.html
+
+    """
+
+    def __init__(
+        self,
+        smile: Smile,
+        index: pd.Index,
+        job_root: str,
+        *,
+        shard_size: int = 1000,
+        root: str = None,
+        fingerprint: str = None,
+    ):
+        if shard_size < 1:
+            raise ValueError(f"'shard_size' has to be at least 1, not {shard_size}.")
+        if fingerprint not in [None, "mtime", "md5"]:
+            raise ValueError(
+                "'fingerprint' has to be one of None, 'mtime', 'md5', "
+                f"not '{fingerprint}'."
+            )
+
+        self.smile = smile
+        r"""Feature extractor"""
+        self.index = index
+        r"""Index to process"""
+        self.job_root = audeer.path(job_root)
+        r"""Folder with the folder of the job"""
+        self.shard_size = shard_size
+        r"""Average number of files per shard"""
+        self.root = root
+        r"""Root folder to expand relative file paths"""
+        self.fingerprint = fingerprint
+        r"""Fingerprint to detect modified files"""
+
+        files = list(index.get_level_values(0))
+        # runs of consecutive entries of the same file
+        runs = [
+            idx for idx in range(len(index)) if idx == 0 or files[idx] != files[idx - 1]
+        ]
+        runs = list(zip(runs, runs[1:] + [len(index)]))
+        offsets = [
+            run
+            for run, (start, _) in enumerate(runs)
+            if run == 0 or _is_cut(files[start], shard_size)
+        ]
+        if isinstance(index, pd.MultiIndex):
+            timestamps = np.stack(
+                [index.get_level_values(level).asi8 for level in ["start", "end"]],
+                axis=1,
+            )
+        else:
+            timestamps = np.zeros((len(index), 0), dtype=np.int64)
+        params = smile.to_yaml_s() + str(index.names)
+        self._root = os.path.join(self.job_root, audeer.uid(from_string=params))
+        params = hashlib.md5(params.encode())
+        fingerprints = {}
+
+        self._shards = {}
+        self._runs = {}
+        for first, last in zip(offsets, offsets[1:] + [len(runs)]):
+            offset = runs[first][0]
+            keys = []
+            shard_runs = []
+            for start, end in runs[first:last]:
+                md5 = params.copy()
+                md5.update(f"{files[start]}\n{end - start}\n".encode())
+                md5.update(timestamps[start:end].tobytes())
+                if fingerprint is not None:
+                    if files[start] not in fingerprints:
+                        fingerprints[files[start]] = self._fingerprint(files[start])
+                    md5.update(fingerprints[files[start]].encode())
+                keys.append(md5.hexdigest())
+                shard_runs.append((keys[-1], start - offset, end - offset))
+            uid = audeer.uid(from_string="".join(keys))
+            self._shards[uid] = index[offset : runs[last - 1][1]]
+            self._runs[uid] = shard_runs
+
+    @property
+    def shards(self) -> list[str]:
+        r"""Shard IDs in order of the index."""
+        return list(self._shards)
+
+    @property
+    def pending(self) -> list[str]:
+        r"""Shard IDs without stored features."""
+        return [uid for uid in self._shards if not os.path.exists(self._path(uid))]
+
+    def merge(
+        self,
+        shards: Sequence[str] = None,
+    ) -> pd.DataFrame:
+        r"""Merge features of shards.
+
+        Args:
+            shards: IDs of shards to merge.
+                If ``None``,
+                all shards are merged
+
+        Returns:
+            feature frame
+
+        Raises:
+            KeyError: if a shard is not part of the job
+            RuntimeError: if shards are pending
+
+        """
+        if shards is None:
+            shards = self.shards
+        for uid in shards:
+            if uid not in self._shards:
+                raise KeyError(uid)
+        pending = [uid for uid in shards if not os.path.exists(self._path(uid))]
+        if pending:
+            raise RuntimeError(f"{len(pending)} of {len(shards)} shards are pending.")
+        if not shards:
+            return pd.DataFrame(
+                np.empty(
+                    (0, len(self.smile.column_names)),
+                    dtype=self.smile.output_dtype,
+                ),
+                index=audformat.segmented_index(),
+                columns=self.smile.column_names,
+            )
+        return pd.concat(
+            [pd.read_pickle(self._path(uid)) for uid in shards],
+            axis="index",
+        )
+
+    def run(
+        self,
+        executor: concurrent.futures.Executor = None,
+        *,
+        merge: bool = True,
+    ) -> pd.DataFrame | None:
+        r"""Process pending shards and merge features.
+
+        To read only the features of updated shards,
+        store :attr:`opensmile.Job.pending` before the run,
+        call it with ``merge=False``,
+        and merge the stored shards afterwards
+        with :meth:`opensmile.Job.merge`.
+
+        Args:
+            executor: executor to process shards.
+                If ``None``,
+                shards are processed one after another
+                in the current process
+            merge: if ``True``
+                merge and return features of all shards
+
+        Returns:
+            feature frame
+            or ``None`` if ``merge`` is ``False``
+
+        """
+        audeer.mkdir(self._root)
+        # shards of previous runs
+        # are listed as outdated
+        # until they are removed
+        outdated = self._outdated()
+        self._write_manifest(outdated)
+
+        pending = self.pending
+        # features of files that did not change
+        # are copied from shards of previous runs
+        stored = self._stored(outdated) if pending else {}
+        params = [
+            (
+                self.smile,
+                self._shards[uid],
+                [
+                    (key, start, end, stored.get(key))
+                    for key, start, end in self._runs[uid]
+                ],
+                self.root,
+                self._path(uid),
+            )
+            for uid in pending
+        ]
+        with audeer.progress_bar(
+            total=len(pending),
+            desc=f"Process {len(pending)} shards",
+            disable=not self.smile.verbose,
+        ) as pbar:
+            if executor is None:
+                for args in params:
+                    _process_shard(*args)
+                    pbar.update()
+            else:
+                futures = [executor.submit(_process_shard, *args) for args in params]
+                for future in concurrent.futures.as_completed(futures):
+                    pbar.update()
+                # raise first error
+                # after all other shards are stored
+                for future in futures:
+                    future.result()
+
+        for uid in outdated:
+            for ext in [".pkl", ".json"]:
+                path = self._path(uid, ext)
+                if os.path.exists(path):
+                    os.remove(path)
+        self._write_manifest([])
+
+        if merge:
+            return self.merge()
+
+    def _fingerprint(self, file: str) -> str:
+        r"""Fingerprint of file."""
+        if self.root is not None:
+            file = os.path.join(self.root, file)
+        if self.fingerprint == "mtime":
+            stat = os.stat(file)
+            return f"{stat.st_size}-{stat.st_mtime_ns}"
+        return audeer.md5(file)
+
+    def _outdated(self) -> list[str]:
+        r"""IDs of shards of previous runs that are not part of the job.
+
+        They are read from the manifest,
+        which lists the shards of the previous run
+        and shards of earlier runs
+        that were not removed yet.
+        A manifest that cannot be read
+        is ignored.
+
+        """
+        try:
+            with open(self._path("manifest", ".json")) as fp:
+                manifest = json.load(fp)
+            uids = [shard["id"] for shard in manifest["shards"]]
+            uids += list(manifest["outdated"])
+            uids = [uid for uid in uids if isinstance(uid, str)]
+        except (OSError, ValueError, KeyError, TypeError):
+            return []
+        return [uid for uid in dict.fromkeys(uids) if uid not in self._shards]
+
+    def _path(self, uid: str, ext: str = ".pkl") -> str:
+        r"""Path to features or rows of files of shard."""
+        return os.path.join(self._root, f"{uid}{ext}")
+
+    def _stored(self, uids: Sequence[str]) -> dict[str, tuple[str, int, int]]:
+        r"""Shard, first and last row (exclusive) of stored files.
+
+        Shards without features
+        or with rows that cannot be read
+        are skipped.
+
+        """
+        stored = {}
+        for uid in uids:
+            if not os.path.exists(self._path(uid)):
+                continue
+            try:
+                with open(self._path(uid, ".json")) as fp:
+                    files = [
+                        (str(key), int(rows)) for key, rows in json.load(fp)["files"]
+                    ]
+            except (OSError, ValueError, KeyError, TypeError):
+                continue
+            offset = 0
+            for key, rows in files:
+                stored[key] = (self._path(uid), offset, offset + rows)
+                offset += rows
+        return stored
+
+    def _write_manifest(self, outdated: Sequence[str]):
+        r"""Write manifest with shards of job and previous runs."""
+        manifest = {
+            "smile": self.smile.to_yaml_s(),
+            "shard_size": self.shard_size,
+            "fingerprint": self.fingerprint,
+            "shards": [
+                {"id": uid, "size": len(shard_index)}
+                for uid, shard_index in self._shards.items()
+            ],
+            "outdated": list(outdated),
+        }
+        _write_atomic(
+            self._path("manifest", ".json"),
+            lambda path: _write_json(manifest, path),
+        )
+
+
+def _is_cut(file: str, shard_size: int) -> bool:
+    r"""Check if a new shard starts at file."""
+    digest = hashlib.md5(file.encode()).hexdigest()
+    return int(digest, 16) % shard_size == 0
+
+
+def _process_shard(
+    smile: Smile,
+    index: pd.Index,
+    runs: list[tuple[str, int, int, tuple[str, int, int] | None]],
+    root: str | None,
+    path: str,
+):
+    r"""Process shard and store features.
+
+    ``runs`` holds hash, first and last entry (exclusive)
+    of consecutive entries of the same file
+    and where their features are stored,
+    or ``None``.
+    Stored features are copied,
+    the others are extracted.
+
+    """
+    dfs = []
+    rows = []
+    shards = {}
+    for is_stored, group in itertools.groupby(runs, key=lambda run: run[3] is not None):
+        group = list(group)
+        if is_stored:
+            for _, _, _, (shard, first, last) in group:
+                if shard not in shards:
+                    shards[shard] = pd.read_pickle(shard)
+                dfs.append(shards[shard].iloc[first:last])
+                rows.append(last - first)
+        else:
+            df = smile.process_index(index[group[0][1] : group[-1][2]], root=root)
+            # neighboring runs belong to different files
+            files = df.index.get_level_values("file")
+            changes = np.flatnonzero(files[1:] != files[:-1]) + 1
+            rows.extend(np.diff([0, *changes, len(df)]).tolist())
+            dfs.append(df)
+    df = pd.concat(dfs, axis="index")
+    files = {"files": [[key, size] for (key, _, _, _), size in zip(runs, rows)]}
+    # rows are written first,
+    # as a shard is pending until its features exist
+    _write_atomic(
+        os.path.splitext(path)[0] + ".json",
+        lambda tmp: _write_json(files, tmp),
+    )
+    _write_atomic(path, lambda tmp: df.to_pickle(tmp, protocol=4))
+
+
+def _write_atomic(path: str, write: Callable[[str], None]):
+    r"""Write to temporary file and move it to path.
+
+    This ensures a crashed write
+    never leaves an incomplete file at path.
+
+    """
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:  # pragma: no cover
+        os.remove(tmp)
+        raise
+
+
+def _write_json(obj: dict, path: str):
+    r"""Write object to JSON file."""
+    with open(path, "w") as fp:
+        json.dump(obj, fp, indent=2)
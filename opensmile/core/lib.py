@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 from collections.abc import Callable
 from ctypes import CFUNCTYPE
 from ctypes import POINTER
@@ -342,14 +344,19 @@ class OpenSMILE(object):  # pragma: no cover
         otherwise returns False
         (e.g. if the internal buffer of the component is full).
 
+        ``data`` holds a single element per frame,
+        or has shape ``(frames, elements)``.
+
         """
-        if len(data.shape) != 1:
-            raise ValueError("data parameter must have exactly one dimension")
+        if len(data.shape) not in (1, 2):
+            raise ValueError("data parameter must have one or two dimensions")
         if data.dtype.name != "float32":
             raise ValueError("data parameter must have dtype float32")
+        data = np.ascontiguousarray(data)
         data_p = data.ctypes.data_as(POINTER(c_float))
+        # openSMILE expects the number of frames
         result = smileapi.smile_extsource_write_data(
-            self._smileobj, bytes(component_name, "ascii"), data_p, len(data)
+            self._smileobj, bytes(component_name, "ascii"), data_p, data.shape[0]
         )
         if result == SMILE_SUCCESS:
             return True
@@ -377,12 +384,15 @@ class OpenSMILE(object):  # pragma: no cover
         )
 
     def external_audio_source_write_data(
-        self, component_name: str, data: bytes
+        self, component_name: str, data: bytes | memoryview
     ) -> bool:
         """Writes data buffer to cExternalAudioSource.
 
         The data must match the specified data format for the component
         (sample size, number of channels, etc.).
+        A contiguous :class:`memoryview`,
+        e.g. of a :class:`numpy.ndarray`,
+        is passed without copying it.
 
         Returns ``True``
         if the data was written successfully,
@@ -390,8 +400,12 @@ class OpenSMILE(object):  # pragma: no cover
         (e.g. if the internal buffer of the component is full).
 
         """
+        buffer = np.frombuffer(data, dtype=np.uint8)
         result = smileapi.smile_extaudiosource_write_data(
-            self._smileobj, bytes(component_name, "ascii"), data, len(data)
+            self._smileobj,
+            bytes(component_name, "ascii"),
+            buffer.ctypes.data,
+            buffer.size,
         )
         if result == SMILE_SUCCESS:
             return True
@@ -470,6 +484,34 @@ class OpenSMILE(object):  # pragma: no cover
             )
         )
 
+    def external_sink_set_raw_callback_ex(
+        self, component_name: str, callback: Callable[[int, int, int], None]
+    ):
+        """Sets extended callback for cExternalSink without copying to NumPy.
+
+        The function will get called
+        with the address of the data,
+        the number of frames
+        and the number of elements per frame
+        whenever another openSMILE component
+        writes data to the cExternalSink component.
+
+        """
+
+        def internal_callback_ex(data, nt, n, meta: POINTER(FrameMetaData), _):
+            callback(cast(data, c_void_p).value, nt, n)
+            return 1
+
+        cb = ExternalSinkCallbackEx(internal_callback_ex)
+        # we need to keep a reference to any callback objects as otherwise
+        # they may get garbage-collected
+        self._callbacks.append(cb)
+        self._check_smile_result(
+            smileapi.smile_extsink_set_data_callback_ex(
+                self._smileobj, bytes(component_name, "ascii"), cb, None
+            )
+        )
+
     def external_sink_get_num_elements(self, component_name: str) -> int:
         num_elements = c_long()
         self._check_smile_result(
@@ -564,6 +606,9 @@ class OpenSMILE(object):  # pragma: no cover
 
         """
         self._check_smile_result(smileapi.smile_reset(self._smileobj))
+        # callbacks are unregistered by openSMILE during reset,
+        # so we can release our references to them
+        self._callbacks = []
 
     def free(self):
         """Frees any internal resources allocated by openSMILE."""
@@ -571,6 +616,10 @@ class OpenSMILE(object):  # pragma: no cover
             smileapi.smile_free(self._smileobj)
             self._smileobj = None
 
+    def __del__(self):
+        """Frees internal resources when garbage collected."""
+        self.free()
+
     def _check_smile_result(self, result: int):
         if result != SMILE_SUCCESS:
             message = smileapi.smile_error_msg(self._smileobj)
@@ -591,28 +640,7 @@ class OpenSMILE(object):  # pragma: no cover
         Returns the specified set of output buffers.
 
         """
-        opensmile = OpenSMILE()
-        opensmile.initialize(config_file, options)
-
-        for input, data in inputs.items():
-            if not opensmile.external_source_write_data(input, data):
-                raise Exception(
-                    "Could not write input data to component '{}'".format(input)
-                )
-            opensmile.external_source_set_eoi(input)
-
-        output_data = {}
-
-        for output in outputs:
-
-            def callback(data: np.ndarray):
-                if output not in output_data:
-                    output_data[output] = np.copy(data)
-                else:
-                    output_data[output] = np.vstack((output_data[output], data))
-
-            opensmile.external_sink_set_callback(output, callback)
+        from opensmile.core.pipeline import Pipeline
 
-        opensmile.run()
-        opensmile.free()
-        return output_data
+        pipeline = Pipeline(config_file, list(inputs), outputs, options=options)
+        return pipeline(inputs)
@@ -0,0 +1,337 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+import ctypes
+import errno
+import os
+import threading
+import time
+
+import numpy as np
+
+import audeer
+
+from opensmile.core.lib import OpenSMILE
+
+
+# Initialized openSMILE engines of the current thread,
+# see Pipeline._engine()
+_engines = threading.local()
+
+
+class Pipeline:
+    r"""Run custom openSMILE config on arrays.
+
+    Feeds arrays into the ``cExternalSource`` components
+    of a config
+    and collects the frames
+    of its ``cExternalSink`` components,
+    e.g. to transform feature streams
+    other than audio.
+    Inputs are written in blocks
+    of ``block_size`` frames
+    while openSMILE processes them,
+    so that the buffers of the sources
+    never have to hold the whole input.
+    If the buffer of a source is full,
+    the other sources are served
+    until openSMILE has made room.
+    Outputs are collected
+    in preallocated arrays.
+
+    Args:
+        config_file: path to config file
+        inputs: names of ``cExternalSource`` components
+        outputs: names of ``cExternalSink`` components
+        options: dictionary with optional script parameters
+        block_size: number of frames
+            written at once to a source
+        timeout: seconds to wait
+            for openSMILE to process a block
+        reuse_engine: if ``True``
+            every thread keeps an initialized openSMILE engine
+            and resets it after processing,
+            instead of creating a new engine for every call
+        loglevel: log level (0-5), the higher the number the more log
+            messages are given
+        logfile: if not ``None`` log messages will be stored to this file
+
+    Raises:
+        FileNotFoundError: if ``config_file`` does not exist
+        ValueError: if ``block_size`` is smaller than 1
+
+    Examples:
+        >>> import os
+        >>> import tempfile
+        >>> import numpy as np
+        >>> config = [
+        ...     "[componentInstances:cComponentManager]",
+        ...     "instance[dataMemory].type = cDataMemory",
+        ...     "instance[source].type = cExternalSource",
+        ...     "instance[delta].type = cDeltaRegression",
+        ...     "instance[sink].type = cExternalSink",
+        ...     "[source:cExternalSource]",
+        ...     "writer.dmLevel = source",
+        ...     "fieldNames[0] = x",
+        ...     "fieldSizes[0] = 2",
+        ...     "blocksize = 100",
+        ...     "period = 0.01",
+        ...     "[delta:cDeltaRegression]",
+        ...     "reader.dmLevel = source",
+        ...     "writer.dmLevel = delta",
+        ...     "[sink:cExternalSink]",
+        ...     "reader.dmLevel = delta",
+        ... ]
+        >>> config_file = os.path.join(tempfile.mkdtemp(), "delta.conf")
+        >>> with open(config_file, "w") as fp:
+        ...     _ = fp.write("\n".join(config))
+        >>> pipeline = Pipeline(config_file, ["source"], ["sink"])
+        >>> pipeline.output_names
+        {'sink': ['x_de[0]', 'x_de[1]']}
+        >>> x = np.tile(np.arange(100.0), (2, 1)).T
+        >>> y = pipeline({"source": x})
+        >>> y["sink"][:3]
+        array([[0.5, 0.5],
+               [0.8, 0.8],
+               [1. , 1. ]], dtype=float32)
+
+    """
+
+    def __init__(
+        self,
+        config_file: str,
+        inputs: Sequence[str],
+        outputs: Sequence[str],
+        *,
+        options: dict = None,
+        block_size: int = 64,
+        timeout: float = 5.0,
+        reuse_engine: bool = False,
+        loglevel: int = 2,
+        logfile: str = None,
+    ):
+        config_file = audeer.safe_path(config_file)
+        if not os.path.exists(config_file):
+            raise FileNotFoundError(
+                errno.ENOENT,
+                os.strerror(errno.ENOENT),
+                config_file,
+            )
+        if block_size < 1:
+            raise ValueError(f"'block_size' has to be at least 1, not {block_size}.")
+
+        self.config_file = config_file
+        r"""Path to config file"""
+        self.inputs = list(inputs)
+        r"""Names of source components"""
+        self.outputs = list(outputs)
+        r"""Names of sink components"""
+        self.options = options or {}
+        r"""Dictionary with options"""
+        self.block_size = block_size
+        r"""Number of frames written at once"""
+        self.timeout = timeout
+        r"""Seconds to wait for openSMILE to process a block"""
+        self.reuse_engine = reuse_engine
+        r"""Reuse initialized openSMILE engines"""
+        self.loglevel = loglevel
+        r"""Log level"""
+        self.logfile = audeer.safe_path(logfile) if logfile else None
+        r"""Log file"""
+
+        smile = self._smile()
+        self.output_names = {
+            output: [
+                smile.external_sink_get_element_name(output, idx)
+                for idx in range(smile.external_sink_get_num_elements(output))
+            ]
+            for output in self.outputs
+        }
+        r"""Names of the elements of every sink"""
+        smile.free()
+
+    def __call__(
+        self,
+        inputs: dict[str, np.ndarray],
+    ) -> dict[str, np.ndarray]:
+        r"""Run config on inputs.
+
+        Args:
+            inputs: arrays of shape ``(frames,)``
+                or ``(frames, elements)``
+                for every source component
+
+        Returns:
+            float32 arrays of shape ``(frames, elements)``
+            for every sink component
+
+        Raises:
+            RuntimeError: if openSMILE does not process
+                an input block within ``timeout`` seconds
+            ValueError: if inputs do not match
+                the source components
+
+        """
+        if sorted(inputs) != sorted(self.inputs):
+            raise ValueError(
+                f"Inputs {sorted(inputs)} do not match "
+                f"source components {sorted(self.inputs)}."
+            )
+        data = {}
+        for name, x in inputs.items():
+            x = np.asarray(x, dtype=np.float32)
+            if x.ndim == 1:
+                x = x.reshape(-1, 1)
+            data[name] = np.ascontiguousarray(x)
+
+        if self.reuse_engine:
+            smile = self._engine()
+        else:
+            smile = self._smile()
+
+        # preallocate outputs for as many frames as the longest input
+        # and grow them if needed
+        capacity = max([len(x) for x in data.values()] + [1])
+        buffers = {
+            output: np.empty((capacity, len(names)), dtype=np.float32)
+            for output, names in self.output_names.items()
+        }
+        sizes = {output: 0 for output in self.outputs}
+        for output in self.outputs:
+            smile.external_sink_set_raw_callback_ex(
+                output,
+                self._sink_callback(output, buffers, sizes),
+            )
+
+        stop = threading.Event()
+        stalled = []
+        writer = threading.Thread(
+            target=self._write_blocks,
+            args=(smile, data, stop, stalled),
+        )
+        writer.start()
+        try:
+            smile.run()
+        finally:
+            stop.set()
+            writer.join()
+            if self.reuse_engine:
+                smile.reset()
+            else:
+                smile.free()
+        if stalled:
+            raise RuntimeError(
+                f"Input buffer of component '{stalled[0]}' was not "
+                f"processed within {self.timeout} seconds. "
+                "Probably, a component needs more input "
+                "before it can process it."
+            )
+
+        return {output: buffers[output][: sizes[output]] for output in self.outputs}
+
+    def _engine(self) -> OpenSMILE:
+        r"""Return initialized engine of current thread."""
+        key = (
+            self.config_file,
+            tuple(sorted((key, str(value)) for key, value in self.options.items())),
+            self.loglevel,
+            self.logfile,
+        )
+        if not hasattr(_engines, "cache"):
+            _engines.cache = {}
+        if key not in _engines.cache:
+            _engines.cache[key] = self._smile()
+        return _engines.cache[key]
+
+    def _smile(self) -> OpenSMILE:
+        r"""Set up smile instance."""
+        smile = OpenSMILE()
+        smile.initialize(
+            config_file=self.config_file,
+            options=self.options,
+            loglevel=self.loglevel,
+            log_file=self.logfile,
+        )
+        return smile
+
+    @staticmethod
+    def _sink_callback(
+        output: str,
+        buffers: dict[str, np.ndarray],
+        sizes: dict[str, int],
+    ):
+        r"""Return callback that copies frames to output buffer."""
+
+        def callback(address: int, num_frames: int, num_elements: int):
+            size = sizes[output]
+            buffer = buffers[output]
+            if size + num_frames > len(buffer):
+                grown = np.empty(
+                    (max(2 * len(buffer), size + num_frames), num_elements),
+                    dtype=np.float32,
+                )
+                grown[:size] = buffer[:size]
+                buffers[output] = buffer = grown
+            # copy without creating an array for every frame
+            ctypes.memmove(
+                buffer.ctypes.data + size * buffer.strides[0],
+                address,
+                num_frames * num_elements * buffer.itemsize,
+            )
+            sizes[output] = size + num_frames
+
+        return callback
+
+    def _write_blocks(
+        self,
+        smile: OpenSMILE,
+        data: dict[str, np.ndarray],
+        stop: threading.Event,
+        stalled: list[str],
+    ):
+        r"""Write inputs in blocks to sources.
+
+        Sources are served in turn,
+        so that a component reading from several sources
+        gets data from all of them.
+        If a block does not fit into the buffer of a source,
+        the block size of the source is halved
+        until a single frame does not fit,
+        and doubled again
+        up to ``block_size``
+        after every written block.
+        If no frame can be written within ``timeout`` seconds,
+        processing is aborted
+        and the name of the source is added to ``stalled``.
+
+        """
+        offsets = {name: 0 for name in data}
+        block_sizes = {name: self.block_size for name in data}
+        pending = list(data)
+        t = time.time()
+        while pending:
+            progress = False
+            for name in list(pending):
+                x = data[name]
+                offset = offsets[name]
+                if offset < len(x):
+                    block = x[offset : offset + block_sizes[name]]
+                    if not smile.external_source_write_data(name, block):
+                        if block_sizes[name] > 1:
+                            block_sizes[name] = len(block) // 2 or 1
+                            progress = True
+                        continue
+                    offsets[name] += len(block)
+                    block_sizes[name] = min(2 * block_sizes[name], self.block_size)
+                    progress = True
+                if offsets[name] >= len(x):
+                    smile.external_source_set_eoi(name)
+                    pending.remove(name)
+            if progress or not pending:
+                t = time.time()
+            elif time.time() - t > self.timeout:
+                stalled.append(pending[0])
+                smile.abort()
+                return
+            elif stop.wait(0.001):  # pragma: no cover
+                return
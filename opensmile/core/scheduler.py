@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import concurrent.futures
+import heapq
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+import audformat
+
+from opensmile.core.smile import Smile
+
+
+class Scheduler:
+    r"""Longest-first scheduling of segments across workers.
+
+    Segments are processed in parallel
+    in order of decreasing duration,
+    i.e. longest processing time first (LPT).
+    This way a long file
+    at the end of the index
+    does not keep a single worker busy
+    while all other workers are idle.
+    Durations of segments without an end
+    are read from the file headers.
+
+    After processing,
+    :attr:`expected_makespan` holds
+    the time the schedule should take
+    if processing time is proportional to duration,
+    and :attr:`actual_makespan`
+    the time it took.
+    A large difference indicates
+    that durations do not predict processing time,
+    e.g. if decoding dominates for compressed files.
+
+    Segments are not split,
+    as features of a segment
+    depend on all of its samples.
+
+    Args:
+        smile: feature extractor
+        num_workers: number of parallel jobs.
+            If ``None``,
+            ``num_workers`` of ``smile`` is used
+            or the number of processors on the machine
+            if it is ``None`` as well
+
+    Examples:
+        >>> import audformat
+        >>> import opensmile
+        >>> smile = opensmile.Smile(
+        ...     feature_set=opensmile.FeatureSet.eGeMAPSv02,
+        ...     feature_level=opensmile.FeatureLevel.Functionals,
+        ... )
+        >>> scheduler = Scheduler(smile, 2)
+        >>> index = audformat.segmented_index(
+        ...     ["test.wav"] * 3,
+        ...     [0, 0, 1],
+        ...     [1, 3, 2],
+        ... )
+        >>> y = scheduler.process_index(index, root="tests")
+        >>> scheduler.durations.to_list()
+        [1.0, 3.0, 1.0]
+        >>> scheduler.loads
+        [3.0, 2.0]
+
+    """
+
+    def __init__(
+        self,
+        smile: Smile,
+        num_workers: int = None,
+    ):
+        if num_workers is None:
+            num_workers = smile.process.num_workers or os.cpu_count()
+
+        self.smile = smile
+        r"""Feature extractor"""
+        self.num_workers = num_workers
+        r"""Number of parallel jobs"""
+        self.durations = None
+        r"""Duration in seconds of every segment of the last index"""
+        self.loads = None
+        r"""Seconds of audio assigned to every worker"""
+        self.expected_makespan = None
+        r"""Expected processing time in seconds of the last index"""
+        self.actual_makespan = None
+        r"""Actual processing time in seconds of the last index"""
+
+    def process_index(
+        self,
+        index: pd.Index,
+        *,
+        root: str = None,
+        executor: concurrent.futures.Executor = None,
+    ) -> pd.DataFrame:
+        r"""Extract features from an index conform to audformat_.
+
+        Args:
+            index: index with segment information
+            root: root folder to expand relative file paths
+            executor: executor to process segments.
+                If ``None``,
+                a thread pool with ``num_workers`` threads is used
+
+        Returns:
+            feature frame with segmented index
+
+        Raises:
+            ValueError: if index is not conform to audformat_
+
+        .. _audformat: https://audeering.github.io/audformat/data-format.html
+
+        """
+        index = audformat.utils.to_segmented_index(index)
+        files = index.get_level_values("file")
+        starts = index.get_level_values("start").total_seconds().to_numpy()
+        # ends of segments without an end
+        # are replaced by file durations
+        ends = (
+            audformat.utils.to_segmented_index(
+                index,
+                allow_nat=False,
+                files_duration={},
+                root=root,
+            )
+            .get_level_values("end")
+            .total_seconds()
+            .to_numpy()
+        )
+        self.durations = pd.Series(ends - starts, index=index, name="duration")
+
+        # stable sort keeps index order for equal durations
+        order = np.argsort(-self.durations.to_numpy(), kind="stable")
+        self.loads = _lpt(self.durations.to_numpy()[order], self.num_workers)
+
+        if len(index) == 0:
+            self.actual_makespan = 0.0
+            self.expected_makespan = 0.0
+            return pd.DataFrame(
+                np.empty(
+                    (0, len(self.smile.column_names)),
+                    dtype=self.smile.output_dtype,
+                ),
+                index=index,
+                columns=self.smile.column_names,
+            )
+
+        own_executor = executor is None
+        if own_executor:
+            executor = concurrent.futures.ThreadPoolExecutor(self.num_workers)
+        t = time.perf_counter()
+        try:
+            futures = {
+                pos: executor.submit(
+                    _process_segment,
+                    self.smile,
+                    files[pos],
+                    index[pos][1],
+                    index[pos][2],
+                    root,
+                )
+                for pos in order
+            }
+            results = [futures[pos].result() for pos in range(len(index))]
+        finally:
+            if own_executor:
+                executor.shutdown()
+        self.actual_makespan = time.perf_counter() - t
+
+        # processing time per second of audio
+        # from the time all workers were busy
+        busy = sum(seconds for _, seconds in results)
+        total = float(self.durations.sum())
+        rate = busy / total if total > 0 else 0.0
+        self.expected_makespan = rate * max(self.loads, default=0.0)
+
+        return pd.concat([df for df, _ in results])
+
+
+def _lpt(durations: np.ndarray, num_workers: int) -> list[float]:
+    r"""Assign sorted durations to least loaded worker."""
+    loads = [(0.0, worker) for worker in range(num_workers)]
+    for duration in durations:
+        load, worker = heapq.heappop(loads)
+        heapq.heappush(loads, (load + float(duration), worker))
+    return [load for load, _ in sorted(loads, key=lambda x: x[1])]
+
+
+def _process_segment(
+    smile: Smile,
+    file: str,
+    start: pd.Timedelta,
+    end: pd.Timedelta,
+    root: str | None,
+) -> tuple[pd.DataFrame, float]:
+    r"""Process segment and measure processing time."""
+    t = time.perf_counter()
+    df = smile.process_file(
+        file,
+        start=start,
+        end=None if pd.isna(end) else end,
+        root=root,
+    )
+    return df, time.perf_counter() - t
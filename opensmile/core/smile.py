@@ -1,15 +1,26 @@
 from __future__ import annotations
 
+import asyncio
+from collections.abc import AsyncIterable
+from collections.abc import AsyncIterator
 from collections.abc import Callable
 from collections.abc import Sequence
+import concurrent.futures
 import errno
+import multiprocessing
 import os
+import re
+import shutil
+import tempfile
+import threading
+import time
 import warnings
 
 import numpy as np
 import pandas as pd
 
 import audeer
+import audformat
 import audinterface
 import audobject
 
@@ -22,6 +33,51 @@ from opensmile.core.lib import FrameMetaData
 from opensmile.core.lib import OpenSMILE
 
 
+MEMORY_PROFILES = ["throughput", "balanced", "low"]
+
+OUTPUT_DTYPES = ["float32", "float16"]
+
+# Context in seconds on both sides of a chunk,
+# see Smile._chunks().
+# It covers the components with a bounded history,
+# i.e. windows of up to 60 ms,
+# the Viterbi pitch smoother with a buffer of 40 frames,
+# moving average smoothing and deltas over a few frames.
+# Pitch period tracking of jitter and shimmer (GeMAPS family)
+# and the F0 smoother (IS09)
+# keep their state over a whole voiced segment
+# or the preceding unvoiced segment,
+# so no finite context is sufficient
+# and those descriptors may deviate
+# in the first voiced segment of a chunk.
+# Other feature sets contain filters or normalizations
+# that depend on the whole signal.
+CHUNK_CONTEXTS = {
+    FeatureSet.GeMAPS: 1.0,
+    FeatureSet.GeMAPSv01a: 1.0,
+    FeatureSet.GeMAPSv01b: 1.0,
+    FeatureSet.eGeMAPS: 1.0,
+    FeatureSet.eGeMAPSv01a: 1.0,
+    FeatureSet.eGeMAPSv01b: 1.0,
+    FeatureSet.eGeMAPSv02: 1.0,
+    FeatureSet.IS09: 1.0,
+}
+
+# Frame step in seconds of low-level descriptors
+# of the feature sets in CHUNK_CONTEXTS
+_CHUNK_FRAME_STEP = 0.01
+
+# Initialized openSMILE engines of the current thread,
+# see Smile._engine()
+_engines = threading.local()
+
+# Thread pools processing chunks
+# by number of threads,
+# see Smile._extract_chunks()
+_chunk_executors = {}
+_chunk_executors_lock = threading.Lock()
+
+
 class Smile(audinterface.Feature, audobject.Object):
     r"""OpenSMILE feature extractor.
 
@@ -54,16 +110,26 @@ class Smile(audinterface.Feature, audobject.Object):
 
     .. note:: The following arguments are not serialized:
 
+        * ``buffer_dur``
         * ``keep_nat``
         * ``loglevel``
         * ``logfile``
+        * ``memory_profile``
         * ``num_workers``
         * ``multiprocessing``
+        * ``reuse_engine``
         * ``segment``
         * ``verbose``
 
         For more information see section on `hidden arguments`_.
 
+    Signals are passed to openSMILE as 16 bit PCM.
+    A signal of type :class:`numpy.int16`
+    is passed without conversion,
+    unless mixdown or resampling is applied,
+    which convert it to a floating point signal
+    in the range ``[-1, 1)`` first.
+
     Args:
         feature_set: default feature set or path to a custom config file
         feature_level: default feature level or level name if a custom
@@ -78,6 +144,87 @@ class Smile(audinterface.Feature, audobject.Object):
         channels: channel selection, see :func:`audresample.remix`
         mixdown: apply mono mix-down on selection
         resample: if ``True`` enforces given sampling rate by resampling
+        win_dur: window duration in seconds.
+            If not ``None``,
+            functionals are computed over a sliding window
+            instead of the whole signal,
+            i.e. a time series of functionals is returned.
+            Low-level descriptors are computed only once
+            and shared by overlapping windows.
+            Only available for functionals
+            of config files that set the frame mode
+            of the functionals
+            with the option ``frameModeFunctionalsConf``,
+            which excludes the feature sets
+            emobase, IS10, IS11 and IS12
+        hop_dur: hop duration in seconds.
+            This defines the shift between two windows.
+            Defaults to ``win_dur / 2``
+        buffer_dur: buffer duration in seconds.
+            If not ``None``,
+            the signal is written in blocks
+            to an input buffer of fixed size,
+            while openSMILE processes the buffered data.
+            This limits the memory openSMILE needs
+            to store the input signal,
+            independent of the signal duration
+        memory_profile: trade-off between memory and speed
+            of the openSMILE buffers.
+            ``'throughput'`` stores the whole signal
+            and all intermediate levels
+            in buffers that grow with the signal duration.
+            ``'balanced'`` stores the input signal
+            in a buffer of ``buffer_dur`` seconds,
+            which defaults to 1 second.
+            ``'low'`` additionally stores the levels
+            before the functionals
+            in ring buffers
+            sized to the window of the functionals,
+            which reduces memory
+            for low-level descriptors
+            and functionals over a sliding window
+            to a constant,
+            independent of the signal duration.
+            Features are identical for all profiles
+        chunk_dur: chunk duration in seconds.
+            If not ``None``,
+            a signal longer than ``chunk_dur``
+            is split into chunks,
+            which are extended by the context
+            the low-level descriptors depend on
+            and processed in parallel
+            by ``num_workers`` threads,
+            which are shared by all signals
+            processed at the same time.
+            With ``multiprocessing=True``
+            chunks are processed sequentially
+            in every worker process.
+            The frames of the context are removed.
+            The remaining frames are identical
+            to the ones of the whole signal,
+            except for jitter and shimmer (GeMAPS family)
+            and F0 (IS09),
+            which are an approximation
+            in the first voiced segment of every chunk
+            as they depend on the whole preceding voiced
+            or unvoiced segment.
+            Only available for low-level descriptors
+            of the GeMAPS family and IS09.
+            Signals are not split
+            if the frame step of 10 ms
+            is not a multiple of the sampling period
+        output_dtype: data type of the features.
+            openSMILE computes features as ``'float32'``.
+            With ``'float16'``
+            every frame is converted
+            when openSMILE outputs it,
+            which halves the memory of the features.
+            The relative error is below 0.05%
+            for magnitudes between 6e-5 and 65504.
+            Smaller magnitudes lose precision
+            or become zero,
+            larger magnitudes become infinite,
+            e.g. the spectral variance of ComParE_2016
         segment: when a :class:`audinterface.Segment` object is provided,
             it will be used to find a segmentation of the input signal.
             Afterwards processing is applied to each segment
@@ -89,6 +236,14 @@ class Smile(audinterface.Feature, audobject.Object):
             multithreading and number of processors in case of
             multiprocessing
         multiprocessing: use multiprocessing instead of multithreading
+        reuse_engine: if ``True``
+            every thread or worker process
+            keeps one initialized openSMILE engine
+            per sampling rate
+            and resets it after processing a signal,
+            instead of creating a new engine for every signal.
+            This reduces the overhead per file
+            when processing many short files
         verbose: show debug messages
 
     Examples:
@@ -115,11 +270,14 @@ class Smile(audinterface.Feature, audobject.Object):
             "resample": "process",
         },
         hide=[
+            "buffer_dur",
             "keep_nat",
             "logfile",
             "loglevel",
+            "memory_profile",
             "num_workers",
             "multiprocessing",
+            "reuse_engine",
             "segment",
             "verbose",
         ],
@@ -146,10 +304,17 @@ class Smile(audinterface.Feature, audobject.Object):
         channels: int | Sequence[int] = 0,
         mixdown: bool = False,
         resample: bool = False,
+        win_dur: float = None,
+        hop_dur: float = None,
+        buffer_dur: float = None,
+        memory_profile: str = "throughput",
+        chunk_dur: float = None,
+        output_dtype: str = "float32",
         segment: audinterface.Segment = None,
         keep_nat: bool = False,
         num_workers: int | None = 1,
         multiprocessing: bool = False,
+        reuse_engine: bool = False,
         verbose: bool = False,
     ):
         self.feature_level = feature_level
@@ -162,9 +327,53 @@ class Smile(audinterface.Feature, audobject.Object):
         r"""Log file"""
         self.loglevel = loglevel
         r"""Log level"""
+        self.reuse_engine = reuse_engine
+        r"""Reuse initialized openSMILE engines"""
+        if memory_profile not in MEMORY_PROFILES:
+            raise ValueError(
+                f"'memory_profile' has to be one of {MEMORY_PROFILES}, "
+                f"not '{memory_profile}'."
+            )
+        if buffer_dur is None and memory_profile != "throughput":
+            buffer_dur = 1.0
+        self.buffer_dur = buffer_dur
+        r"""Duration of input buffer in seconds"""
+        self.memory_profile = memory_profile
+        r"""Memory profile"""
+        if chunk_dur is not None and (
+            chunk_dur <= 0
+            or feature_set not in CHUNK_CONTEXTS
+            or feature_level
+            not in [
+                FeatureLevel.LowLevelDescriptors,
+                FeatureLevel.LowLevelDescriptors_Deltas,
+            ]
+        ):
+            raise ValueError(
+                "'chunk_dur' has to be positive "
+                "and is only supported for low-level descriptors "
+                "of the GeMAPS family and IS09."
+            )
+        self.chunk_dur = chunk_dur
+        r"""Duration of chunks in seconds"""
+        if output_dtype not in OUTPUT_DTYPES:
+            raise ValueError(
+                f"'output_dtype' has to be one of {OUTPUT_DTYPES}, "
+                f"not '{output_dtype}'."
+            )
+        self.output_dtype = output_dtype
+        r"""Data type of features"""
         self.verbose = verbose
 
+        if win_dur is None and hop_dur is not None:
+            raise ValueError("You have to specify 'win_dur' if 'hop_dur' is given.")
+        if win_dur is not None and hop_dur is None:
+            hop_dur = win_dur / 2
+        self.win_dur = win_dur
+        self.hop_dur = hop_dur
+
         self._check_deltas_available()
+        self._check_window_available()
 
         super().__init__(
             self._feature_names(),
@@ -176,12 +385,17 @@ class Smile(audinterface.Feature, audobject.Object):
             resample=resample,
             channels=channels,
             mixdown=mixdown,
+            win_dur=win_dur,
+            hop_dur=hop_dur,
+            process_func_applies_sliding_window=True,
             segment=segment,
             keep_nat=keep_nat,
             multiprocessing=multiprocessing,
             verbose=verbose,
         )
         self.params = self.to_dict(flatten=True)
+        # convert 16 bit PCM before mixdown and resampling
+        self.process.__class__ = _Process
 
         self._check_deprecated()
 
@@ -219,23 +433,598 @@ class Smile(audinterface.Feature, audobject.Object):
 
         return config_path
 
+    async def astream(
+        self,
+        chunks: AsyncIterable[np.ndarray],
+        sampling_rate: int,
+        *,
+        max_frames: int = 100,
+        buffer_dur: float = 1.0,
+    ) -> AsyncIterator[tuple[np.ndarray, float, float]]:
+        r"""Extract features from an asynchronous stream of audio chunks.
+
+        The chunks are fed into
+        a streaming openSMILE engine
+        running on a worker thread,
+        see :class:`opensmile.Stream`.
+        Feature frames are yielded
+        as soon as openSMILE has computed them,
+        as tuples of features of ``output_dtype``,
+        start and end time in seconds
+        relative to the beginning of the stream.
+        Waiting for chunks and frames
+        does not block the event loop.
+
+        Frames are passed to the event loop
+        through a queue holding at most ``max_frames`` frames.
+        If the consumer is slower than openSMILE,
+        the queue fills up and openSMILE pauses,
+        until the input buffer
+        of ``buffer_dur`` seconds is full
+        and no more chunks are read.
+        This way,
+        memory stays bounded
+        for any number of concurrent streams.
+
+        Args:
+            chunks: mono audio chunks
+            sampling_rate: sampling rate in Hz
+            max_frames: maximum number of frames
+                waiting to be consumed
+            buffer_dur: duration of the input buffer in seconds
+
+        Yields:
+            features, start and end of every frame
+
+        Raises:
+            RuntimeError: if an error occurred
+                during processing
+            ValueError: if ``sampling_rate`` does not match
+                the sampling rate of the feature extractor
+            ValueError: if ``max_frames`` is smaller than 1
+
+        Examples:
+            >>> import asyncio
+            >>> smile = Smile(
+            ...     feature_set=FeatureSet.eGeMAPSv02,
+            ...     feature_level=FeatureLevel.LowLevelDescriptors,
+            ... )
+            >>> async def chunks():
+            ...     for _ in range(10):
+            ...         yield np.zeros(1600)
+            >>> async def extract():
+            ...     return [frame async for frame in smile.astream(chunks(), 16000)]
+            >>> frames = asyncio.run(extract())
+            >>> len(frames)
+            96
+            >>> values, start, end = frames[0]
+            >>> values.shape, start, end
+            ((25,), 0.0, 0.02)
+
+        """
+        # avoid circular import
+        from opensmile.core.stream import Stream
+
+        if max_frames < 1:
+            raise ValueError(f"'max_frames' has to be at least 1, not {max_frames}.")
+
+        loop = asyncio.get_running_loop()
+        frames = asyncio.Queue(maxsize=max_frames)
+        done = object()
+        stopped = threading.Event()
+
+        def callback(values, start, end, latency):
+            future = asyncio.run_coroutine_threadsafe(
+                frames.put((values, start, end)),
+                loop,
+            )
+            # block openSMILE until there is space in the queue,
+            # but give up when the consumer stopped
+            while not stopped.is_set():
+                try:
+                    future.result(timeout=0.1)
+                    return
+                except concurrent.futures.TimeoutError:  # pragma: no cover
+                    pass
+            future.cancel()  # pragma: no cover
+
+        stream = Stream(self, sampling_rate, callback, buffer_dur=buffer_dur)
+
+        async def feed():
+            try:
+                async for chunk in chunks:
+                    await stream.awrite(chunk)
+                await stream.aclose()
+            finally:
+                if not stopped.is_set():
+                    await frames.put(done)
+
+        task = asyncio.ensure_future(feed())
+        try:
+            while True:
+                frame = await frames.get()
+                if frame is done:
+                    break
+                yield frame
+            await task
+        finally:
+            # consumer stopped early
+            # or an error occurred
+            stopped.set()
+            task.cancel()
+            await stream._aabort()
+
+    def process_array(
+        self,
+        signal: np.ndarray,
+        sampling_rate: int,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        r"""Extract features from signal as arrays.
+
+        Returns the same features and timestamps
+        as :meth:`opensmile.Smile.process_signal`,
+        but without creating any pandas objects,
+        which reduces the overhead
+        when processing short signals.
+        Channel selection, mixdown and resampling
+        are applied.
+
+        Args:
+            signal: signal values
+            sampling_rate: sampling rate in Hz
+
+        Returns:
+            features as array of ``output_dtype``
+            with shape ``(frames, features)``,
+            start and end of every frame
+            in nanoseconds
+            as int64 arrays
+
+        Raises:
+            RuntimeError: if sampling rates do not match
+            RuntimeError: if channel selection is invalid
+            ValueError: if a segmentation object is set
+
+        Examples:
+            >>> smile = Smile(
+            ...     feature_set=FeatureSet.eGeMAPSv02,
+            ...     feature_level=FeatureLevel.Functionals,
+            ... )
+            >>> values, starts, ends = smile.process_array(np.zeros(16000), 16000)
+            >>> values.shape, values.dtype.name
+            ((1, 88), 'float32')
+            >>> starts, ends
+            (array([0]), array([1000000000]))
+
+        """
+        if self.process.segment is not None:
+            raise ValueError(
+                "Processing arrays is not available if a segmentation object is set."
+            )
+        starts, ends, values = self.process(signal, sampling_rate)
+        # first and last timestamp match signal boundaries
+        # as in Smile._series_to_frame()
+        starts[0] = 0
+        ends[-1] = _seconds_to_ns(
+            np.array(np.atleast_2d(signal).shape[-1] / sampling_rate)
+        )
+        return values, starts, ends
+
+    def process_arrays(
+        self,
+        signals: Sequence[np.ndarray],
+        sampling_rate: int,
+    ) -> list[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        r"""Extract features for a batch of signals as arrays.
+
+        Batch version of :meth:`opensmile.Smile.process_array`.
+        Signals are processed in parallel
+        if ``num_workers`` is greater than 1.
+
+        Args:
+            signals: list of signals
+            sampling_rate: sampling rate in Hz
+
+        Returns:
+            features, start and end of every signal,
+            see :meth:`opensmile.Smile.process_array`
+
+        Raises:
+            RuntimeError: if sampling rates do not match
+            RuntimeError: if channel selection is invalid
+            ValueError: if a segmentation object is set
+
+        Examples:
+            >>> smile = Smile(
+            ...     feature_set=FeatureSet.eGeMAPSv02,
+            ...     feature_level=FeatureLevel.Functionals,
+            ...     reuse_engine=True,
+            ... )
+            >>> signals = [np.zeros(8000), np.zeros(4000)]
+            >>> [ends for _, _, ends in smile.process_arrays(signals, 16000)]
+            [array([500000000]), array([250000000])]
+
+        """
+        if not signals:
+            return []
+        return audeer.run_tasks(
+            self.process_array,
+            [([signal, sampling_rate], {}) for signal in signals],
+            num_workers=self.process.num_workers,
+            multiprocessing=self.process.multiprocessing,
+            progress_bar=self.verbose,
+            task_description=f"Process {len(signals)} signals",
+        )
+
+    def process_files(
+        self,
+        files: Sequence[str],
+        *,
+        starts: float | str | pd.Timedelta | Sequence = None,
+        ends: float | str | pd.Timedelta | Sequence = None,
+        root: str = None,
+        process_func_args: dict[str, object] = None,
+        prefetch: int = None,
+    ) -> pd.DataFrame:
+        r"""Extract features for a list of files.
+
+        If ``prefetch`` is not ``None``,
+        files are read and decoded by ``prefetch`` threads,
+        while ``num_workers`` threads
+        extract features from the decoded signals.
+        Up to ``prefetch`` files are decoded ahead
+        of the files that are processed,
+        so that the workers do not wait
+        for files on slow storage,
+        e.g. a network drive.
+        Files are read as a whole
+        and features are extracted in threads
+        even if ``multiprocessing=True``.
+
+        If a :class:`audinterface.Segment` object is used,
+        ``prefetch`` is ignored.
+
+        Args:
+            files: list of file paths
+            starts: segment start positions.
+                Time values given as float or integers are treated as seconds.
+                See :func:`audinterface.utils.to_timedelta`
+                for further options.
+                If a scalar is given, it is applied to all files
+            ends: segment end positions.
+                Time values given as float or integers are treated as seconds.
+                See :func:`audinterface.utils.to_timedelta`
+                for further options.
+                If a scalar is given, it is applied to all files
+            root: root folder to expand relative file paths
+            process_func_args: (keyword) arguments passed on
+                to the processing function.
+                They will temporarily overwrite
+                the ones stored in
+                :attr:`audinterface.Feature.process.process_func_args`
+            prefetch: number of files decoded ahead
+
+        Returns:
+            feature frame with segmented index
+
+        Raises:
+            RuntimeError: if sampling rates do not match
+            RuntimeError: if channel selection is invalid
+            ValueError: if ``prefetch`` is smaller than 1
+
+        """
+        if prefetch is not None and prefetch < 1:
+            raise ValueError(f"'prefetch' has to be at least 1, not {prefetch}.")
+        # numpy scalars are not supported by audinterface
+        if isinstance(starts, np.generic):
+            starts = starts.item()
+        if isinstance(ends, np.generic):
+            ends = ends.item()
+        if prefetch is None or self.process.segment is not None or len(files) == 0:
+            return super().process_files(
+                files,
+                starts=starts,
+                ends=ends,
+                root=root,
+                process_func_args=process_func_args,
+            )
+        y = self._process_files_prefetch(
+            files,
+            starts,
+            ends,
+            root,
+            process_func_args,
+            prefetch,
+        )
+        return self._series_to_frame(y)
+
+    def process_index(
+        self,
+        index: pd.Index,
+        *,
+        preserve_index: bool = False,
+        root: str = None,
+        cache_root: str = None,
+        process_func_args: dict[str, object] = None,
+        memmap_root: str = None,
+        lld_root: str = None,
+        deduplicate: str | None = "segments",
+    ) -> pd.DataFrame:
+        r"""Extract features from an index conform to audformat_.
+
+        Segments that appear several times in the index
+        are processed only once
+        and their features are copied
+        to every occurrence.
+        With ``deduplicate="files"``
+        also segments of different files
+        with identical content,
+        as detected by their MD5 sum,
+        are processed only once.
+
+        If ``memmap_root`` is not ``None``,
+        every file in the index is decoded only once
+        and stored as a memory-mapped float32 array
+        in a temporary folder below ``memmap_root``,
+        e.g. on a local disk or in ``/dev/shm``.
+        The segments of a file are then sliced
+        from the memory-mapped array
+        instead of reading and decoding the file again
+        for every segment,
+        which is shared by all workers
+        when ``multiprocessing=True``.
+        The temporary folder is removed afterwards.
+
+        If ``lld_root`` is not ``None``,
+        the low-level descriptors of every file
+        are stored below ``lld_root``
+        and the functionals are computed from them
+        with :func:`opensmile.functionals`.
+        When called again with a different segmentation
+        of the same files,
+        only the functionals are computed,
+        which is much faster.
+        Only functionals supported
+        by :func:`opensmile.functionals`
+        are returned
+        and a warning lists the missing ones.
+        They might deviate slightly
+        from the ones extracted by openSMILE
+        and are cached separately.
+        Stored low-level descriptors are identified
+        by the file path and the feature extractor,
+        so they are not updated when a file is modified.
+
+        If a :class:`audinterface.Segment` object is used,
+        ``memmap_root``, ``lld_root`` and ``deduplicate`` are ignored.
+
+        If ``cache_root`` is not ``None``,
+        a hash value is created from the index
+        using :func:`audformat.utils.hash` and
+        the result is stored as
+        ``<cache_root>/<hash>.pkl``.
+        When called again with the same index,
+        features will be read from the cached file.
+
+        .. _audformat: https://audeering.github.io/audformat/data-format.html
+
+        Args:
+            index: index with segment information
+            preserve_index: if ``True``
+                and :attr:`audinterface.Feature.process.segment` is ``None``
+                the returned index
+                will be of same type
+                as the original one,
+                otherwise always a segmented index is returned
+            root: root folder to expand relative file paths
+            cache_root: cache folder (see description)
+            process_func_args: (keyword) arguments passed on
+                to the processing function.
+                They will temporarily overwrite
+                the ones stored in
+                :attr:`audinterface.Feature.process.process_func_args`
+            memmap_root: folder for memory-mapped signals (see description)
+            lld_root: folder for low-level descriptors (see description)
+            deduplicate: process identical ``"segments"``,
+                or segments of ``"files"`` with identical content,
+                only once.
+                If ``None``,
+                every segment is processed
+
+        Returns:
+            feature frame
+
+        Raises:
+            RuntimeError: if sampling rates do not match
+            RuntimeError: if channel selection is invalid
+            ValueError: if index is not conform to audformat_
+            ValueError: if ``lld_root`` is given,
+                but the feature extractor does not compute functionals
+                of the GeMAPS family without a sliding window
+            ValueError: if ``deduplicate`` is not supported
+
+        """
+        if deduplicate not in [None, "segments", "files"]:
+            raise ValueError(
+                "'deduplicate' has to be one of None, 'segments', 'files', "
+                f"not '{deduplicate}'."
+            )
+        if lld_root is not None and (
+            not self._is_gemaps_family()
+            or self.feature_level != FeatureLevel.Functionals
+            or self.win_dur is not None
+        ):
+            raise ValueError(
+                "'lld_root' is only supported for functionals "
+                "of the GeMAPS family without a sliding window."
+            )
+        if self.process.segment is not None:
+            return super().process_index(
+                index,
+                preserve_index=preserve_index,
+                root=root,
+                cache_root=cache_root,
+                process_func_args=process_func_args,
+            )
+
+        cache_path = None
+        if cache_root is not None:
+            cache_root = audeer.mkdir(cache_root)
+            hash = audformat.utils.hash(index, strict=True)
+            if lld_root is not None:
+                # do not mix approximated and extracted functionals
+                hash = f"{hash}-lld"
+            cache_path = os.path.join(cache_root, f"{hash}.pkl")
+
+        if cache_path and os.path.exists(cache_path):
+            df = pd.read_pickle(cache_path)
+        elif lld_root is not None:
+            df = self._process_index_lld(index, root, audeer.mkdir(lld_root))
+            if cache_path is not None:
+                df.to_pickle(cache_path, protocol=4)
+        else:
+            y = self._process_index_unique(
+                index,
+                root,
+                memmap_root,
+                process_func_args,
+                deduplicate,
+            )
+            df = self._series_to_frame(y)
+
+            if cache_path is not None:
+                df.to_pickle(cache_path, protocol=4)
+
+        if preserve_index:
+            df.index = index
+
+        return df
+
+    def process_signals(
+        self,
+        signals: Sequence[np.ndarray],
+        sampling_rate: int,
+    ) -> pd.DataFrame:
+        r"""Extract features for a batch of signals.
+
+        The signals are processed
+        without creating an intermediate data frame
+        for every signal,
+        which reduces the overhead
+        when processing many short signals.
+        Set ``reuse_engine=True``
+        to additionally share
+        one openSMILE engine between
+        all signals processed in the same thread.
+        The features of every signal
+        are identical to the ones returned by
+        :meth:`opensmile.Smile.process_signal`.
+
+        Args:
+            signals: list of signals
+            sampling_rate: sampling rate in Hz
+
+        Returns:
+            feature frame with index levels
+            ``signal``, ``start`` and ``end``,
+            where ``signal`` holds the position of a signal
+            in ``signals``
+
+        Raises:
+            RuntimeError: if sampling rates do not match
+            RuntimeError: if channel selection is invalid
+
+        Examples:
+            >>> smile = Smile(
+            ...     feature_set=FeatureSet.eGeMAPSv02,
+            ...     feature_level=FeatureLevel.Functionals,
+            ...     reuse_engine=True,
+            ... )
+            >>> signals = [np.zeros(8000), np.zeros(4000)]
+            >>> y = smile.process_signals(signals, 16000)
+            >>> y.loudness_sma3_amean
+            signal  start   end
+            0       0 days  0 days 00:00:00.500000    0.001034
+            1       0 days  0 days 00:00:00.250000    0.001034
+            Name: loudness_sma3_amean, dtype: float32
+
+        """
+        if self.process.segment is not None:
+            ys = []
+            for signal in signals:
+                y = self.process_signal(signal, sampling_rate)
+                ys.append(
+                    (
+                        y.values,
+                        y.index.get_level_values("start").to_numpy("timedelta64[ns]"),
+                        y.index.get_level_values("end").to_numpy("timedelta64[ns]"),
+                    )
+                )
+        else:
+            ys = self.process_arrays(signals, sampling_rate)
+
+        ids = []
+        starts = []
+        ends = []
+        values = []
+        for idx, (y, start, end) in enumerate(ys):
+            ids.append(np.full(len(y), idx))
+            starts.append(start.view("timedelta64[ns]"))
+            ends.append(end.view("timedelta64[ns]"))
+            values.append(y)
+
+        if not values:
+            ids = starts = ends = [np.array([], dtype=int)]
+            values = [np.empty((0, len(self.column_names)), dtype=self.output_dtype)]
+
+        index = pd.MultiIndex.from_arrays(
+            [
+                np.concatenate(ids),
+                pd.to_timedelta(np.concatenate(starts)),
+                pd.to_timedelta(np.concatenate(ends)),
+            ],
+            names=["signal", "start", "end"],
+        )
+        return pd.DataFrame(
+            np.concatenate(values),
+            index=index,
+            columns=self.column_names,
+        )
+
     def _check_deltas_available(self):
         r"""Raise error if deltas are requested for GeMAPS family."""
-        if self.feature_set in [
-            FeatureSet.GeMAPS,
-            FeatureSet.GeMAPSv01a,
-            FeatureSet.GeMAPSv01b,
-            FeatureSet.eGeMAPS,
-            FeatureSet.eGeMAPSv01a,
-            FeatureSet.eGeMAPSv01b,
-            FeatureSet.eGeMAPSv02,
-        ]:
+        if self._is_gemaps_family():
             if self.feature_level == FeatureLevel.LowLevelDescriptors_Deltas:
                 raise ValueError(
                     f"Feature level '{self.feature_level.name}' is not "
                     f"available for feature set '{self.feature_set.name}'."
                 )
 
+    def _check_window_available(self):
+        r"""Raise error if a sliding window is not available.
+
+        The sliding window is set by the option
+        ``frameModeFunctionalsConf``,
+        which is ignored by configs that do not include it.
+
+        """
+        if self.win_dur is None:
+            return
+        if self.feature_level in [
+            FeatureLevel.LowLevelDescriptors,
+            FeatureLevel.LowLevelDescriptors_Deltas,
+        ]:
+            raise ValueError(
+                f"A sliding window is not available "
+                f"for feature level '{self.feature_level.name}'."
+            )
+        if "\\cm[frameModeFunctionalsConf" not in _read_config(self.config_path):
+            raise ValueError(
+                f"A sliding window is not available "
+                f"for config '{self.config_name}', "
+                "as it does not include 'frameModeFunctionalsConf'."
+            )
+
     def _check_deprecated(self):
         r"""Check if feature set is deprecated."""
         deprecated_feature_sets = {  # deprecated: recommended
@@ -256,63 +1045,206 @@ class Smile(audinterface.Feature, audobject.Object):
                 UserWarning,
             )
 
+    def _chunks(
+        self,
+        num_samples: int,
+        sampling_rate: int,
+    ) -> list[tuple[int, int, int, int | None]]:
+        r"""Split signal into chunks with context.
+
+        Returns first and last sample (exclusive) of every chunk
+        including context,
+        the number of frames of the context at the beginning
+        and the number of frames to keep,
+        or ``None`` to keep all remaining frames.
+        Chunks start at a multiple of the frame step,
+        so that their frames are aligned
+        with the frames of the whole signal.
+
+        """
+        step = _CHUNK_FRAME_STEP * sampling_rate
+        if self.chunk_dur is None or not np.isclose(step, round(step)):
+            return [(0, num_samples, 0, None)]
+        step = round(step)
+        context = int(np.ceil(CHUNK_CONTEXTS[self.feature_set] * sampling_rate / step))
+        context *= step
+        # chunks shorter than their context
+        # would process most samples several times
+        chunk_size = max(int(self.chunk_dur * sampling_rate) // step * step, context)
+        chunks = []
+        for offset in range(0, num_samples, chunk_size):
+            begin = max(offset - context, 0)
+            if offset + chunk_size < num_samples:
+                end = min(offset + chunk_size + context, num_samples)
+                keep = chunk_size // step
+            else:
+                end = num_samples
+                keep = None
+            chunks.append((begin, end, (offset - begin) // step, keep))
+        return chunks or [(0, num_samples, 0, None)]
+
+    def _engine(self, options: dict) -> OpenSMILE:
+        r"""Return initialized engine of current thread.
+
+        Engines are cached per thread
+        and identified by config file, options and log settings.
+        Hence, they are shared by all copies of an extractor,
+        e.g. when it is sent to a worker process for every task.
+
+        """
+        key = self._engine_key(options)
+        if not hasattr(_engines, "cache"):
+            _engines.cache = {}
+        if key not in _engines.cache:
+            _engines.cache[key] = self._smile(options=options)
+        return _engines.cache[key]
+
+    def _engine_key(self, options: dict) -> tuple:
+        r"""Key of engine in cache of current thread."""
+        return (
+            self.config_path,
+            tuple(sorted((key, str(value)) for key, value in options.items())),
+            self.loglevel,
+            self.logfile,
+            self.verbose,
+        )
+
     def _extract(
         self,
         signal: np.ndarray,
         sampling_rate: int,
-    ) -> (pd.TimedeltaIndex, pd.TimedeltaIndex, np.ndarray):
-        r"""Run feature extraction."""
-        signal = signal.copy()
-        signal *= 32768
-        signal = signal.astype(np.int16)
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        r"""Run feature extraction.
+
+        Returns start and end of every frame
+        in nanoseconds
+        and the features.
+
+        """
+        signal = Smile._pcm(signal)
 
         ys = []
         starts = []
         ends = []
 
         for x in signal:
-            y = []
-            starts = []
-            ends = []
-
-            options = self._options()
-            options["source"] = os.path.join(
-                self.default_config_root, config.EXTERNAL_INPUT_CONFIG
-            )
-            options["sampleRate"] = sampling_rate
-            options["nBits"] = 16
-
-            smile = self._smile(options=options)
-            smile.external_sink_set_callback_ex(
-                config.EXTERNAL_OUTPUT_COMPONENT, Smile._sink_callback(y, starts, ends)
-            )
-            smile.external_audio_source_write_data(
-                config.EXTERNAL_SOURCE_COMPONENT, bytes(x)
-            )
-            smile.external_audio_source_set_eoi(config.EXTERNAL_SOURCE_COMPONENT)
-            smile.run()
-            smile.free()
+            chunks = self._chunks(x.size, sampling_rate)
+            if len(chunks) > 1:
+                y, starts, ends = self._extract_chunks(x, sampling_rate, chunks)
+            else:
+                y, starts, ends = self._extract_pcm(x, sampling_rate)
 
             if not y:
                 warnings.warn(UserWarning("Segment too short, filling with NaN."))
-                y.append(np.ones(self.num_features) * np.nan)
+                y.append(np.full(self.num_features, np.nan, dtype=self.output_dtype))
                 starts.append(0)
                 ends.append(signal.size / sampling_rate)
 
-            starts = np.vstack(starts).squeeze()
-            ends = np.vstack(ends).squeeze()
-            if starts.shape:
-                starts = pd.to_timedelta(starts, "s")
-                ends = pd.to_timedelta(ends, "s")
-            else:
-                starts = pd.TimedeltaIndex([pd.to_timedelta(starts, "s")])
-                ends = pd.TimedeltaIndex([pd.to_timedelta(ends, "s")])
+            starts = _seconds_to_ns(np.array(starts, dtype=np.float64))
+            ends = _seconds_to_ns(np.array(ends, dtype=np.float64))
 
             y = np.vstack(y)
             ys.append(y)
 
         return starts, ends, np.concatenate(ys, axis=1)
 
+    def _extract_chunks(
+        self,
+        x: np.ndarray,
+        sampling_rate: int,
+        chunks: list[tuple[int, int, int, int | None]],
+    ) -> tuple[list[np.ndarray], list[float], list[float]]:
+        r"""Extract features from chunks in parallel and stitch them.
+
+        Chunks are processed by a thread pool
+        with ``num_workers`` threads,
+        which is reused by all calls.
+        In a worker process
+        they are processed sequentially.
+
+        """
+        num_workers = self.process.num_workers or os.cpu_count()
+        if num_workers == 1 or multiprocessing.parent_process() is not None:
+            # a worker process is already one of
+            # num_workers parallel jobs
+            results = [
+                self._extract_pcm(x[begin:end], sampling_rate)
+                for begin, end, _, _ in chunks
+            ]
+        else:
+            # the thread pool is shared
+            # by all threads processing signals,
+            # so that no more than num_workers chunks
+            # are processed at the same time
+            executor = _chunk_executor(num_workers)
+            futures = [
+                executor.submit(self._extract_pcm, x[begin:end], sampling_rate)
+                for begin, end, _, _ in chunks
+            ]
+            results = [future.result() for future in futures]
+
+        ys = []
+        starts = []
+        ends = []
+        for (begin, _, skip, keep), (y, chunk_starts, chunk_ends) in zip(
+            chunks, results
+        ):
+            # remove frames of context
+            stop = None if keep is None else skip + keep
+            offset = begin / sampling_rate
+            ys.extend(y[skip:stop])
+            starts.extend(start + offset for start in chunk_starts[skip:stop])
+            ends.extend(end + offset for end in chunk_ends[skip:stop])
+        return ys, starts, ends
+
+    def _extract_pcm(
+        self,
+        x: np.ndarray,
+        sampling_rate: int,
+    ) -> tuple[list[np.ndarray], list[float], list[float]]:
+        r"""Extract features from a single channel of 16 bit PCM.
+
+        Returns the features,
+        start and end in seconds
+        of every frame.
+
+        """
+        y = []
+        starts = []
+        ends = []
+
+        options = self._input_options(sampling_rate, self.buffer_dur)
+        if self.reuse_engine:
+            smile = self._engine(options=options)
+        else:
+            smile = self._smile(options=options)
+        smile.external_sink_set_callback_ex(
+            config.EXTERNAL_OUTPUT_COMPONENT,
+            Smile._sink_callback(y, starts, ends, self.output_dtype),
+        )
+        failed = True
+        try:
+            if self.buffer_dur is None:
+                smile.external_audio_source_write_data(
+                    config.EXTERNAL_SOURCE_COMPONENT, memoryview(x)
+                )
+                smile.external_audio_source_set_eoi(config.EXTERNAL_SOURCE_COMPONENT)
+                smile.run()
+            else:
+                self._run_buffered(smile, x, sampling_rate)
+            failed = False
+        finally:
+            if self.reuse_engine and not failed:
+                smile.reset()
+            else:
+                # an engine left in the state of a failed run
+                # must not be reused
+                if self.reuse_engine:
+                    _engines.cache.pop(self._engine_key(options), None)
+                smile.free()
+
+        return y, starts, ends
+
     def _feature_names(self) -> list[str]:
         r"""Read feature names from config file."""
         options = self._options()
@@ -330,6 +1262,38 @@ class Smile(audinterface.Feature, audobject.Object):
         smile.free()
         return names
 
+    def _input_options(
+        self,
+        sampling_rate: int,
+        buffer_dur: float | None,
+    ) -> dict:
+        r"""Fill options dictionary with external audio input."""
+        options = self._options()
+        if buffer_dur is None:
+            options["source"] = os.path.join(
+                self.default_config_root, config.EXTERNAL_INPUT_CONFIG
+            )
+        else:
+            options["source"] = os.path.join(
+                self.default_config_root, config.EXTERNAL_INPUT_BUFFERED_CONFIG
+            )
+            options["bufferSize"] = buffer_dur
+        options["sampleRate"] = sampling_rate
+        options["nBits"] = 16
+        return options
+
+    def _is_gemaps_family(self) -> bool:
+        r"""Check if feature set belongs to GeMAPS family."""
+        return self.feature_set in [
+            FeatureSet.GeMAPS,
+            FeatureSet.GeMAPSv01a,
+            FeatureSet.GeMAPSv01b,
+            FeatureSet.eGeMAPS,
+            FeatureSet.eGeMAPSv01a,
+            FeatureSet.eGeMAPSv01b,
+            FeatureSet.eGeMAPSv02,
+        ]
+
     def _options(self) -> dict:
         r"""Fill options dictionary."""
         options = self.options.copy()
@@ -343,12 +1307,355 @@ class Smile(audinterface.Feature, audobject.Object):
         options["bufferModeRbConf"] = os.path.join(
             self.default_config_root, "shared/BufferModeRb.conf.inc"
         )
+        # functionals over the whole signal
+        # need all frames of the levels before the functionals
+        windowed = self.win_dur is not None or self.feature_level in [
+            FeatureLevel.LowLevelDescriptors,
+            FeatureLevel.LowLevelDescriptors_Deltas,
+        ]
+        low = self.memory_profile == "low" and windowed
+        # functionals are not part of the output
+        # for low-level descriptors
+        frame_size = self.win_dur or 1.0
+        frame_step = self.hop_dur or 1.0
         if "frameModeFunctionalsConf" not in options:
-            options["frameModeFunctionalsConf"] = os.path.join(
-                self.default_config_root, "shared/FrameModeFunctionals.conf.inc"
+            if self.win_dur is None and not low:
+                options["frameModeFunctionalsConf"] = os.path.join(
+                    self.default_config_root, "shared/FrameModeFunctionals.conf.inc"
+                )
+            else:
+                if low:
+                    frame_mode = "shared/FrameModeFunctionalsFixedRb.conf.inc"
+                else:
+                    frame_mode = "shared/FrameModeFunctionalsFixed.conf.inc"
+                options["frameModeFunctionalsConf"] = os.path.join(
+                    self.default_config_root,
+                    frame_mode,
+                )
+                options["frameSize"] = frame_size
+                options["frameStep"] = frame_step
+        if low and "bufferModeConf" not in options:
+            options["bufferModeConf"] = os.path.join(
+                self.default_config_root, "shared/BufferModeRbWindow.conf.inc"
             )
+            # margin for levels lagging behind,
+            # e.g. smoothed pitch
+            options["bufferModeWindowSize"] = frame_size + frame_step + 1.0
         return options
 
+    def _process_files_prefetch(
+        self,
+        files: Sequence[str],
+        starts: object,
+        ends: object,
+        root: str | None,
+        process_func_args: dict[str, object] | None,
+        prefetch: int,
+    ) -> pd.Series:
+        r"""Process files while the next files are decoded.
+
+        A slot is taken for every file
+        before it is decoded
+        and released after its features are extracted.
+        Slots are taken in order of the files,
+        so that a file waiting for extraction
+        never blocks the decoding of a file before it.
+
+        """
+        if starts is None or np.isscalar(starts) or isinstance(starts, pd.Timedelta):
+            starts = [starts] * len(files)
+        if ends is None or np.isscalar(ends) or isinstance(ends, pd.Timedelta):
+            ends = [ends] * len(files)
+        num_workers = self.process.num_workers or os.cpu_count()
+        slots = threading.Semaphore(num_workers + prefetch)
+
+        def process(decoded, file, start, end):
+            try:
+                signal, sampling_rate = decoded.result()
+                if end is None:
+                    # resolved to file duration unless keep_nat is set
+                    end = pd.NaT
+                return self.process.process_signal(
+                    signal,
+                    sampling_rate,
+                    file=file,
+                    start=start,
+                    end=end,
+                    process_func_args=process_func_args,
+                )
+            finally:
+                slots.release()
+
+        decoder = concurrent.futures.ThreadPoolExecutor(prefetch)
+        executor = concurrent.futures.ThreadPoolExecutor(num_workers)
+        pbar = audeer.progress_bar(
+            total=len(files),
+            desc=f"Process {len(files)} files",
+            disable=not self.verbose,
+        )
+        with decoder, executor, pbar:
+            futures = []
+            for file, start, end in zip(files, starts, ends):
+                slots.acquire()
+                decoded = decoder.submit(
+                    audinterface.utils.read_audio,
+                    file,
+                    root=root,
+                )
+                future = executor.submit(process, decoded, file, start, end)
+                future.add_done_callback(lambda _: pbar.update())
+                futures.append(future)
+            ys = [future.result() for future in futures]
+
+        return pd.concat(ys)
+
+    def _process_index_lld(
+        self,
+        index: pd.Index,
+        root: str | None,
+        lld_root: str,
+    ) -> pd.DataFrame:
+        r"""Compute functionals from stored low-level descriptors."""
+        # avoid circular import
+        from opensmile.core.functionals import functionals
+
+        smile = Smile(
+            self.feature_set,
+            FeatureLevel.LowLevelDescriptors,
+            options=self.options,
+            loglevel=self.loglevel,
+            logfile=self.logfile,
+            sampling_rate=self.process.sampling_rate,
+            channels=self.process.channels,
+            mixdown=self.process.mixdown,
+            resample=self.process.resample,
+            buffer_dur=self.buffer_dur,
+            num_workers=self.process.num_workers,
+            multiprocessing=self.process.multiprocessing,
+            reuse_engine=self.reuse_engine,
+            verbose=self.verbose,
+        )
+        params = smile.to_yaml_s()
+        files = list(dict.fromkeys(index.get_level_values("file")))
+        paths = {
+            file: os.path.join(
+                lld_root,
+                audeer.uid(from_string=params + audeer.path(root or "", file)) + ".pkl",
+            )
+            for file in files
+        }
+
+        # different file paths can point to the same file
+        missing = {
+            paths[file]: file for file in files if not os.path.exists(paths[file])
+        }
+        if missing:
+            lld = smile.process_files(list(missing.values()), root=root)
+            for file, df in lld.groupby(level="file", sort=False):
+                df.to_pickle(paths[file], protocol=4)
+
+        llds = []
+        for file in files:
+            df = pd.read_pickle(paths[file])
+            df.index = df.index.remove_unused_levels().set_levels(
+                [file],
+                level="file",
+            )
+            llds.append(df)
+        lld = pd.concat(llds)
+        index = audformat.utils.to_segmented_index(
+            index,
+            allow_nat=self.process.keep_nat,
+            root=root,
+        )
+        index = pd.MultiIndex.from_arrays(
+            [
+                list(index.get_level_values("file")),
+                index.get_level_values("start"),
+                index.get_level_values("end"),
+            ],
+            names=["file", "start", "end"],
+        )
+        df = functionals(lld, index, feature_set=self.feature_set)
+        missing = [name for name in self.column_names if name not in df.columns]
+        if missing:
+            warnings.warn(
+                f"Functionals {missing} are not supported "
+                "with 'lld_root' and are not returned.",
+                UserWarning,
+            )
+        columns = [name for name in self.column_names if name in df.columns]
+        return df[columns].astype(self.output_dtype)
+
+    def _process_index_memmap(
+        self,
+        index: pd.MultiIndex,
+        root: str | None,
+        memmap_root: str,
+        process_func_args: dict[str, object] | None,
+    ) -> pd.Series:
+        r"""Process segmented index from memory-mapped signals."""
+        files = list(dict.fromkeys(index.get_level_values("file")))
+        params = [
+            ([file, os.path.join(memmap_root, f"{idx}.npy")], {"root": root})
+            for idx, file in enumerate(files)
+        ]
+        decoded = audeer.run_tasks(
+            Smile._decode,
+            params,
+            num_workers=self.process.num_workers,
+            multiprocessing=self.process.multiprocessing,
+            progress_bar=self.verbose,
+            task_description=f"Decode {len(files)} files",
+        )
+        decoded = dict(zip(files, decoded))
+
+        params = [
+            (
+                [*decoded[file], file, start, end],
+                {"process_func_args": process_func_args},
+            )
+            for file, start, end in index
+        ]
+        ys = audeer.run_tasks(
+            self._process_memmap,
+            params,
+            num_workers=self.process.num_workers,
+            multiprocessing=self.process.multiprocessing,
+            progress_bar=self.verbose,
+            task_description=f"Process {len(index)} segments",
+        )
+        return pd.concat(ys)
+
+    def _process_index_unique(
+        self,
+        index: pd.Index,
+        root: str | None,
+        memmap_root: str | None,
+        process_func_args: dict[str, object] | None,
+        deduplicate: str | None,
+    ) -> pd.Series:
+        r"""Process every unique segment of index only once.
+
+        Returns the result of every segment of the index
+        in its original order.
+
+        """
+        index = audformat.utils.to_segmented_index(index)
+        files = index.get_level_values("file")
+        if deduplicate is None or index.empty:
+            positions = np.arange(len(index))
+            unique = index
+        else:
+            keys = files
+            if deduplicate == "files":
+                hashes = {
+                    file: audeer.md5(os.path.join(root, file) if root else file)
+                    for file in files.unique()
+                }
+                keys = files.map(hashes)
+            positions, _ = pd.factorize(
+                pd.MultiIndex.from_arrays(
+                    [
+                        keys,
+                        index.get_level_values("start").asi8,
+                        index.get_level_values("end").asi8,
+                    ]
+                )
+            )
+            _, first = np.unique(positions, return_index=True)
+            unique = index[first]
+
+        if memmap_root is None:
+            y = self.process.process_index(
+                unique,
+                root=root,
+                process_func_args=process_func_args,
+            )
+        else:
+            tmp_root = tempfile.mkdtemp(dir=audeer.mkdir(memmap_root))
+            try:
+                y = self._process_index_memmap(
+                    unique,
+                    root,
+                    tmp_root,
+                    process_func_args,
+                )
+            finally:
+                shutil.rmtree(tmp_root)
+
+        if len(unique) == len(index):
+            return y
+        # end of segments can be resolved to the file duration
+        return pd.Series(
+            y.values[positions],
+            index=pd.MultiIndex.from_arrays(
+                [
+                    files,
+                    y.index.get_level_values("start")[positions],
+                    y.index.get_level_values("end")[positions],
+                ],
+                names=["file", "start", "end"],
+            ),
+        )
+
+    def _process_memmap(
+        self,
+        path: str,
+        sampling_rate: int,
+        file: str,
+        start: pd.Timedelta,
+        end: pd.Timedelta,
+        *,
+        process_func_args: dict[str, object] | None,
+    ) -> pd.Series:
+        r"""Process segment of memory-mapped signal."""
+        signal = np.load(path, mmap_mode="r")
+        return self.process.process_signal(
+            signal,
+            sampling_rate,
+            file=file,
+            start=start,
+            end=end,
+            process_func_args=process_func_args,
+        )
+
+    def _run_buffered(
+        self,
+        smile: OpenSMILE,
+        x: np.ndarray,
+        sampling_rate: int,
+    ):
+        r"""Run engine while signal is written to input buffer.
+
+        Blocks of half the buffer size are written,
+        while openSMILE consumes them in the current thread.
+
+        """
+        block_size = max(int(self.buffer_dur * sampling_rate / 2), 1)
+        timeout = max(self.buffer_dur, 5.0)
+        stop = threading.Event()
+        stalled = threading.Event()
+        writer = threading.Thread(
+            target=Smile._write_blocks,
+            args=(smile, x, block_size, timeout, stop, stalled),
+        )
+        writer.start()
+        try:
+            smile.run()
+        finally:
+            stop.set()
+            writer.join()
+        if stalled.is_set():
+            raise RuntimeError(
+                f"Input buffer of {self.buffer_dur} seconds was not "
+                f"processed within {timeout} seconds. "
+                "Probably, a component needs the whole input "
+                "before it can process it. "
+                "Set 'buffer_dur' to None "
+                "and 'memory_profile' to 'throughput' for this config."
+            )
+
     def _series_to_frame(
         self,
         series: pd.Series,
@@ -366,8 +1673,8 @@ class Smile(audinterface.Feature, audobject.Object):
             for idx, ((file, start, end), values) in enumerate(series.items()):
                 num = len(values[0])
                 files = [file] * num
-                starts = values[0] + start
-                ends = values[1] + start
+                starts = pd.to_timedelta(values[0]) + start
+                ends = pd.to_timedelta(values[1]) + start
                 # override first and last timestamp
                 starts._values[0] = start
                 ends._values[-1] = end
@@ -387,8 +1694,8 @@ class Smile(audinterface.Feature, audobject.Object):
                 )
         else:
             for idx, ((start, end), values) in enumerate(series.items()):
-                starts = values[0] + start
-                ends = values[1] + start
+                starts = pd.to_timedelta(values[0]) + start
+                ends = pd.to_timedelta(values[1]) + start
                 # override first and last timestamp
                 starts._values[0] = start
                 ends._values[-1] = end
@@ -419,14 +1726,87 @@ class Smile(audinterface.Feature, audobject.Object):
         )
         return smile
 
+    @staticmethod
+    def _pcm(signal: np.ndarray) -> np.ndarray:
+        r"""Convert signal to 16 bit PCM.
+
+        A 16 bit PCM signal is returned as it is,
+        unless its channels are not contiguous in memory.
+        Otherwise,
+        scaling and casting in a single pass
+        avoids intermediate copies of the signal.
+
+        """
+        if signal.dtype == np.int16:
+            return np.ascontiguousarray(signal)
+        pcm = np.empty(signal.shape, dtype=np.int16)
+        np.multiply(signal, 32768, out=pcm, casting="unsafe")
+        return pcm
+
+    @staticmethod
+    def _write_blocks(
+        smile: OpenSMILE,
+        signal: np.ndarray,
+        block_size: int,
+        timeout: float,
+        stop: threading.Event,
+        stalled: threading.Event,
+    ):
+        r"""Write signal in blocks to input buffer.
+
+        If the buffer is full,
+        we wait until openSMILE has processed enough data
+        or ``stop`` is set.
+        If no block can be written within ``timeout`` seconds,
+        processing is aborted and ``stalled`` is set.
+
+        """
+        for offset in range(0, signal.size, block_size):
+            data = memoryview(signal[offset : offset + block_size])
+            t = time.time()
+            while not smile.external_audio_source_write_data(
+                config.EXTERNAL_SOURCE_COMPONENT, data
+            ):
+                if time.time() - t > timeout:
+                    stalled.set()
+                    smile.abort()
+                    return
+                if stop.wait(0.001):  # pragma: no cover
+                    return
+        smile.external_audio_source_set_eoi(config.EXTERNAL_SOURCE_COMPONENT)
+
+    @staticmethod
+    def _decode(
+        file: str,
+        path: str,
+        *,
+        root: str | None,
+    ) -> tuple[str, int]:
+        r"""Decode file to memory-mapped float32 array."""
+        signal, sampling_rate = audinterface.utils.read_audio(file, root=root)
+        memmap = np.lib.format.open_memmap(
+            path,
+            mode="w+",
+            dtype=np.float32,
+            shape=signal.shape,
+        )
+        memmap[:] = signal
+        memmap.flush()
+        del memmap
+        return path, sampling_rate
+
     @staticmethod
     def _sink_callback(
-        y: list[np.ndarray], starts: list[float], ends: list[float]
+        y: list[np.ndarray],
+        starts: list[float],
+        ends: list[float],
+        dtype: str,
     ) -> Callable[[np.ndarray, FrameMetaData], None]:
         r"""Return callback where features are collected."""
 
         def callback(data: np.ndarray, meta: FrameMetaData):
-            y.append(data.copy())
+            # copy frame and convert to output data type
+            y.append(data.astype(dtype))
             starts.append(meta.time)
             ends.append(meta.time + meta.lengthSec)
 
@@ -457,9 +1837,76 @@ class Smile(audinterface.Feature, audobject.Object):
             RuntimeError: if channel selection is invalid
 
         """
-        # process functions returns (starts, values, values)
+        # process functions returns (starts, ends, values)
         # but we only want to return values here
         y = self.process(signal, sampling_rate)[2]
         # reshape to (channels, features, frames)
         y = y.T.reshape(self.num_channels, self.num_features, -1)
         return y
+
+
+class _Process(audinterface.Process):
+    r"""Processing interface of :class:`opensmile.Smile`.
+
+    Mixdown and resampling by :mod:`audinterface`
+    would return 16 bit PCM input
+    as floating point values in the range of PCM,
+    or fail.
+    Hence,
+    a 16 bit PCM signal is converted
+    to float32 in the range ``[-1, 1)`` before,
+    which is exact.
+
+    """
+
+    def _call(
+        self,
+        signal: np.ndarray,
+        sampling_rate: int,
+        **kwargs,
+    ) -> object:
+        if signal.dtype == np.int16 and (
+            self.mixdown
+            or (self.sampling_rate is not None and sampling_rate != self.sampling_rate)
+        ):
+            signal = np.divide(signal, 32768, dtype=np.float32)
+        return super()._call(signal, sampling_rate, **kwargs)
+
+
+def _chunk_executor(num_workers: int) -> concurrent.futures.ThreadPoolExecutor:
+    r"""Return thread pool with ``num_workers`` threads."""
+    with _chunk_executors_lock:
+        if num_workers not in _chunk_executors:
+            _chunk_executors[num_workers] = concurrent.futures.ThreadPoolExecutor(
+                num_workers,
+                thread_name_prefix="opensmile-chunk",
+            )
+        return _chunk_executors[num_workers]
+
+
+def _read_config(path: str) -> str:
+    r"""Read config file and the files it includes."""
+    with open(path) as fp:
+        text = fp.read()
+    # includes are given as \{<path>},
+    # paths are relative to the including file
+    includes = [
+        os.path.join(os.path.dirname(path), include)
+        for include in re.findall(r"\\\{([^\\}]+)\}", text)
+    ]
+    return "\n".join(
+        [text]
+        + [_read_config(include) for include in includes if os.path.exists(include)]
+    )
+
+
+def _seconds_to_ns(seconds: np.ndarray) -> np.ndarray:
+    r"""Convert seconds to nanoseconds.
+
+    Rounds like :func:`pandas.to_timedelta`
+    without creating pandas objects.
+
+    """
+    base = seconds.astype(np.int64)
+    frac = np.round(seconds - base, 9)
+    return base * 1_000_000_000 + (frac * 1e9).astype(np.int64)
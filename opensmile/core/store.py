@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import contextlib
+import errno
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+import audeer
+import audformat
+
+from opensmile.core.job import _write_atomic
+from opensmile.core.job import _write_json
+from opensmile.core.smile import Smile
+
+
+class FeatureStore:
+    r"""Memory-mapped features with random access to files.
+
+    A feature store holds the features of every segment
+    of an index in a single contiguous matrix,
+    which is memory-mapped when the store is opened.
+    The features of a file or segment
+    are a slice of this matrix,
+    i.e. reading them does not copy
+    or deserialize any data,
+    which makes the store suited
+    for data loaders during training.
+
+    A store is written with
+    :meth:`opensmile.FeatureStore.create`
+    and consists of the following files in ``store_root``:
+
+    * ``features.bin``: features
+      as C-contiguous matrix
+      of shape ``(frames, features)``
+    * ``starts.bin``, ``ends.bin``: start and end of every frame
+      in nanoseconds as int64
+    * ``manifest.json``: serialized feature extractor,
+      data type and names of the features
+      and file, start, end and first frame
+      of every segment
+
+    Segments of the same file are stored next to each other,
+    in order of the first appearance of the file in the index.
+
+    Args:
+        store_root: folder of the store
+
+    Raises:
+        FileNotFoundError: if ``store_root`` contains no store
+
+    Examples:
+        >>> import tempfile
+        >>> import audformat
+        >>> import opensmile
+        >>> smile = opensmile.Smile(
+        ...     feature_set=opensmile.FeatureSet.eGeMAPSv02,
+        ...     feature_level=opensmile.FeatureLevel.LowLevelDescriptors,
+        ... )
+        >>> index = audformat.filewise_index(["test.wav"])
+        >>> store = FeatureStore.create(
+        ...     smile,
+        ...     index,
+        ...     tempfile.mkdtemp(),
+        ...     root="tests",
+        ... )
+        >>> values, starts, ends = store["test.wav"]
+        >>> values.shape
+        (520, 25)
+        >>> starts[:3]
+        memmap([       0,   10000000,   20000000])
+
+    """
+
+    def __init__(
+        self,
+        store_root: str,
+    ):
+        store_root = audeer.path(store_root)
+        manifest_path = os.path.join(store_root, "manifest.json")
+        if not os.path.exists(manifest_path):
+            raise FileNotFoundError(
+                errno.ENOENT,
+                os.strerror(errno.ENOENT),
+                manifest_path,
+            )
+        with open(manifest_path) as fp:
+            manifest = json.load(fp)
+
+        self.store_root = store_root
+        r"""Folder of the store"""
+        self.params = manifest["smile"]
+        r"""Serialized feature extractor"""
+        self.columns = manifest["columns"]
+        r"""Feature names"""
+
+        segments = manifest["segments"]
+        self.index = audformat.segmented_index(
+            segments["files"],
+            pd.to_timedelta(segments["starts"]),
+            pd.to_timedelta(segments["ends"]),
+        )
+        r"""Segmented index of stored segments"""
+        self._offsets = segments["offsets"]
+        self._files = {}
+        for idx, file in enumerate(segments["files"]):
+            first = self._files.get(file, (idx,))[0]
+            self._files[file] = (first, idx + 1)
+
+        num_frames = self._offsets[-1]
+        self.values = _memmap(
+            os.path.join(store_root, "features.bin"),
+            manifest["dtype"],
+            (num_frames, len(self.columns)),
+        )
+        r"""Features of all segments"""
+        self.starts = _memmap(
+            os.path.join(store_root, "starts.bin"),
+            "int64",
+            (num_frames,),
+        )
+        r"""Start of every frame in nanoseconds"""
+        self.ends = _memmap(
+            os.path.join(store_root, "ends.bin"),
+            "int64",
+            (num_frames,),
+        )
+        r"""End of every frame in nanoseconds"""
+
+    def __getitem__(
+        self,
+        key: int | str,
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        r"""Features of a segment or file.
+
+        Args:
+            key: position of a segment in :attr:`index`
+                or file path
+
+        Returns:
+            features,
+            start and end of every frame
+            in nanoseconds
+
+        Raises:
+            IndexError: if position is out of range
+            KeyError: if file is not stored
+
+        """
+        if isinstance(key, str):
+            first, last = self._files[key]
+        else:
+            first = range(len(self.index))[key]
+            last = first + 1
+        rows = slice(self._offsets[first], self._offsets[last])
+        return self.values[rows], self.starts[rows], self.ends[rows]
+
+    def __len__(self) -> int:
+        r"""Number of stored segments."""
+        return len(self.index)
+
+    @staticmethod
+    def create(
+        smile: Smile,
+        index: pd.Index,
+        store_root: str,
+        *,
+        root: str = None,
+        batch_size: int = 100,
+    ) -> FeatureStore:
+        r"""Extract features from an index and write them to a store.
+
+        Features are extracted for ``batch_size`` segments at once,
+        using ``num_workers`` of ``smile``,
+        and appended to the store,
+        so that memory does not grow
+        with the size of the index.
+        An existing store in ``store_root``
+        is overwritten.
+        As the manifest is written last,
+        an incomplete store cannot be opened.
+
+        Args:
+            smile: feature extractor
+            index: index conform to audformat_
+            store_root: folder to write the store to
+            root: root folder to expand relative file paths
+            batch_size: number of segments
+                that are processed at once
+
+        Returns:
+            feature store
+
+        Raises:
+            ValueError: if ``batch_size`` is smaller than 1
+
+        .. _audformat: https://audeering.github.io/audformat/data-format.html
+
+        """
+        if batch_size < 1:
+            raise ValueError(f"'batch_size' has to be at least 1, not {batch_size}.")
+
+        store_root = audeer.mkdir(store_root)
+        # invalidate existing store before overwriting it
+        manifest_path = os.path.join(store_root, "manifest.json")
+        if os.path.exists(manifest_path):
+            os.remove(manifest_path)
+
+        index = audformat.utils.to_segmented_index(
+            index,
+            allow_nat=smile.process.keep_nat,
+            root=root,
+        )
+        # store segments of the same file next to each other
+        codes, _ = pd.factorize(index.get_level_values("file"))
+        index = index[np.argsort(codes, kind="stable")]
+
+        files = []
+        starts = []
+        ends = []
+        offsets = [0]
+        with contextlib.ExitStack() as stack:
+            fp_values, fp_starts, fp_ends = [
+                stack.enter_context(open(os.path.join(store_root, name), "wb"))
+                for name in ["features.bin", "starts.bin", "ends.bin"]
+            ]
+            for offset in range(0, len(index), batch_size):
+                y = smile.process.process_index(
+                    index[offset : offset + batch_size],
+                    root=root,
+                )
+                for (file, start, end), (
+                    frame_starts,
+                    frame_ends,
+                    values,
+                ) in y.items():
+                    frame_starts = frame_starts + start.value
+                    frame_ends = frame_ends + start.value
+                    # first and last timestamp match segment boundaries
+                    # as in Smile._series_to_frame()
+                    frame_starts[0] = start.value
+                    frame_ends[-1] = end.value
+                    values.tofile(fp_values)
+                    frame_starts.tofile(fp_starts)
+                    frame_ends.tofile(fp_ends)
+                    files.append(file)
+                    starts.append(start.value)
+                    ends.append(None if pd.isna(end) else end.value)
+                    offsets.append(offsets[-1] + len(values))
+
+        manifest = {
+            "smile": smile.to_yaml_s(),
+            "columns": list(smile.column_names),
+            "dtype": smile.output_dtype,
+            "segments": {
+                "files": files,
+                "starts": starts,
+                "ends": ends,
+                "offsets": offsets,
+            },
+        }
+        _write_atomic(manifest_path, lambda path: _write_json(manifest, path))
+        return FeatureStore(store_root)
+
+
+def _memmap(path: str, dtype: str, shape: tuple[int, ...]) -> np.ndarray:
+    r"""Memory-map file read-only."""
+    if shape[0] == 0:
+        # empty files cannot be memory-mapped
+        return np.empty(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=shape)
@@ -0,0 +1,409 @@
+from __future__ import annotations
+
+import asyncio
+import collections
+from collections.abc import Callable
+from collections.abc import Iterator
+import functools
+import threading
+import time
+
+import numpy as np
+
+from opensmile.core.config import config
+from opensmile.core.lib import FrameMetaData
+from opensmile.core.lib import OpenSmileException
+from opensmile.core.smile import Smile
+
+
+# Seconds after which asynchronous methods
+# check the engine again
+# without being woken up,
+# see Stream._wait()
+_WAKEUP_TIMEOUT = 0.01
+
+
+class Stream:
+    r"""Real-time feature extraction.
+
+    Audio chunks written to the stream
+    are processed by an openSMILE engine
+    running on a background thread.
+    Every feature frame is passed to ``callback``
+    as an array of ``output_dtype`` of ``smile``
+    as soon as openSMILE has computed it,
+    together with its start and end time in seconds
+    relative to the beginning of the stream
+    and its latency.
+    The latency is the time in seconds
+    between writing the audio chunk
+    that completes the frame
+    and the frame being ready.
+
+    If the callback is slower than the audio arrives,
+    latencies grow.
+    Frames with a latency above ``max_latency``
+    are dropped
+    and counted in :attr:`num_dropped`.
+    If openSMILE does not consume the written audio
+    fast enough,
+    :meth:`write` blocks
+    until there is space in the input buffer.
+
+    Args:
+        smile: feature extractor
+        sampling_rate: sampling rate in Hz
+        callback: function called with the features,
+            start, end and latency of every frame
+        max_latency: maximum latency in seconds.
+            If ``None``,
+            no frames are dropped
+        buffer_dur: duration of the input buffer in seconds
+
+    Raises:
+        ValueError: if ``sampling_rate`` does not match
+            the sampling rate of ``smile``
+
+    Examples:
+        >>> import numpy as np
+        >>> import opensmile
+        >>> smile = opensmile.Smile(
+        ...     feature_set=opensmile.FeatureSet.eGeMAPSv02,
+        ...     feature_level=opensmile.FeatureLevel.LowLevelDescriptors,
+        ... )
+        >>> frames = []
+        >>> def callback(values, start, end, latency):
+        ...     frames.append((start, end))
+        >>> with Stream(smile, 16000, callback) as stream:
+        ...     for _ in range(10):
+        ...         stream.write(np.zeros(1600))
+        >>> len(frames)
+        96
+        >>> frames[0]
+        (0.0, 0.02)
+
+    """
+
+    def __init__(
+        self,
+        smile: Smile,
+        sampling_rate: int,
+        callback: Callable[[np.ndarray, float, float, float], None],
+        *,
+        max_latency: float = None,
+        buffer_dur: float = 1.0,
+    ):
+        if (
+            smile.process.sampling_rate is not None
+            and smile.process.sampling_rate != sampling_rate
+        ):
+            raise ValueError(
+                f"Sampling rate of stream ({sampling_rate} Hz) does not match "
+                f"sampling rate of feature extractor "
+                f"({smile.process.sampling_rate} Hz)."
+            )
+
+        self.smile = smile
+        r"""Feature extractor"""
+        self.sampling_rate = sampling_rate
+        r"""Sampling rate in Hz"""
+        self.callback = callback
+        r"""Function called for every frame"""
+        self.max_latency = max_latency
+        r"""Maximum latency in seconds"""
+        self.buffer_dur = buffer_dur
+        r"""Duration of input buffer in seconds"""
+        self.num_frames = 0
+        r"""Number of frames computed so far"""
+        self.num_dropped = 0
+        r"""Number of frames dropped so far"""
+
+        self._block_size = max(int(buffer_dur * sampling_rate / 2), 1)
+        self._timeout = max(buffer_dur, 5.0)
+        self._num_samples = 0
+        # end time in seconds and arrival time
+        # of every written block
+        # that is not part of a frame yet
+        self._arrivals = collections.deque()
+        self._lock = threading.Lock()
+        self._error = None
+        self._closed = False
+        self._freed = False
+        # set when openSMILE stopped
+        self._done = threading.Event()
+        # event loop and event
+        # of asynchronous methods waiting for the engine
+        self._loop = None
+        self._wakeup = None
+
+        self._engine = smile._smile(
+            options=smile._input_options(sampling_rate, buffer_dur)
+        )
+        self._engine.external_sink_set_callback_ex(
+            config.EXTERNAL_OUTPUT_COMPONENT,
+            self._sink_callback,
+        )
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> Stream:
+        r"""Enter context."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        r"""Close stream when leaving context."""
+        if exc_type is None:
+            self.close()
+        else:
+            # do not mask the original exception
+            try:
+                self.close()
+            except RuntimeError:
+                pass
+
+    async def aclose(self):
+        r"""Signal end of input and wait for remaining frames.
+
+        Asynchronous version of :meth:`opensmile.Stream.close`.
+
+        Raises:
+            RuntimeError: if an error occurred
+                during processing or in the callback
+
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self._error is None:
+            self._engine.external_audio_source_set_eoi(config.EXTERNAL_SOURCE_COMPONENT)
+        await self._wait(self._done.is_set)
+        self._free()
+        self._raise_error()
+
+    async def awrite(self, chunk: np.ndarray):
+        r"""Write audio chunk to stream.
+
+        Asynchronous version of :meth:`opensmile.Stream.write`.
+        Instead of blocking,
+        it waits for space in the input buffer
+        without blocking the event loop.
+
+        Args:
+            chunk: mono audio chunk
+                of shape ``(samples,)`` or ``(1, samples)``
+
+        Raises:
+            RuntimeError: if stream is closed
+            RuntimeError: if an error occurred
+                during processing or in the callback
+            RuntimeError: if openSMILE does not process
+                the input buffer
+            ValueError: if chunk has more than one channel
+
+        """
+        for block in self._blocks(chunk):
+            await self._wait(
+                functools.partial(self._write_block, block, time.monotonic())
+            )
+
+    def close(self):
+        r"""Signal end of input and wait for remaining frames.
+
+        Raises:
+            RuntimeError: if an error occurred
+                during processing or in the callback
+
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self._error is None:
+            self._engine.external_audio_source_set_eoi(config.EXTERNAL_SOURCE_COMPONENT)
+        self._thread.join()
+        self._free()
+        self._raise_error()
+
+    def write(self, chunk: np.ndarray):
+        r"""Write audio chunk to stream.
+
+        Args:
+            chunk: mono audio chunk
+                of shape ``(samples,)`` or ``(1, samples)``
+
+        Raises:
+            RuntimeError: if stream is closed
+            RuntimeError: if an error occurred
+                during processing or in the callback
+            RuntimeError: if openSMILE does not process
+                the input buffer
+            ValueError: if chunk has more than one channel
+
+        """
+        for block in self._blocks(chunk):
+            t = time.monotonic()
+            while not self._write_block(block, t):
+                time.sleep(0.001)
+
+    async def _aabort(self):
+        r"""Stop processing and release engine.
+
+        Remaining frames are discarded
+        and errors are not raised.
+
+        """
+        self._closed = True
+        if not self._done.is_set():
+            if self._error is None:
+                self._error = RuntimeError("Stream was aborted.")
+            try:
+                self._engine.abort()
+            except OpenSmileException:  # pragma: no cover
+                # processing has not started yet
+                # or has already finished
+                pass
+            # stop engine waiting for input
+            self._engine.external_audio_source_set_eoi(config.EXTERNAL_SOURCE_COMPONENT)
+        await self._wait(self._done.is_set)
+        self._free()
+
+    def _blocks(self, chunk: np.ndarray) -> Iterator[np.ndarray]:
+        r"""Split chunk into blocks of 16 bit PCM.
+
+        The end time and arrival time of every block
+        is recorded for the latency of frames.
+
+        """
+        if self._closed:
+            raise RuntimeError("Stream is closed.")
+        self._raise_error()
+        chunk = np.atleast_2d(chunk)
+        if chunk.shape[0] != 1:
+            raise ValueError(
+                f"Stream expects a mono chunk, not {chunk.shape[0]} channels."
+            )
+        pcm = Smile._pcm(chunk[0])
+
+        arrival = time.monotonic()
+        for offset in range(0, pcm.size, self._block_size):
+            block = pcm[offset : offset + self._block_size]
+            with self._lock:
+                self._num_samples += block.size
+                self._arrivals.append((self._num_samples / self.sampling_rate, arrival))
+            yield block
+
+    def _write_block(self, block: np.ndarray, t: float) -> bool:
+        r"""Try to write block to input buffer.
+
+        Returns ``False``
+        if the input buffer is full.
+        Raises an error,
+        if the block could not be written
+        since ``t``
+        within the timeout.
+
+        """
+        if self._engine.external_audio_source_write_data(
+            config.EXTERNAL_SOURCE_COMPONENT, memoryview(block)
+        ):
+            return True
+        self._raise_error()
+        if time.monotonic() - t > self._timeout:
+            self._error = RuntimeError(
+                f"Input buffer of {self.buffer_dur} seconds "
+                f"was not processed within {self._timeout} seconds. "
+                "Probably, a component needs the whole input "
+                "before it can process it."
+            )
+            self._engine.abort()
+            self._raise_error()
+        return False
+
+    def _free(self):
+        r"""Release engine once."""
+        if not self._freed:
+            self._freed = True
+            self._engine.free()
+
+    def _notify(self):
+        r"""Wake up asynchronous method waiting for the engine."""
+        loop = self._loop
+        wakeup = self._wakeup
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:  # pragma: no cover
+                # event loop is closed
+                pass
+
+    def _raise_error(self):
+        r"""Raise error of processing thread or callback."""
+        if self._error is not None:
+            raise RuntimeError(str(self._error)) from self._error
+
+    def _run(self):
+        r"""Run openSMILE until end of input."""
+        try:
+            self._engine.run()
+        except Exception as ex:  # pragma: no cover
+            self._error = ex
+        finally:
+            self._done.set()
+            self._notify()
+
+    def _sink_callback(self, data: np.ndarray, meta: FrameMetaData):
+        r"""Pass frame to callback."""
+        if self._error is not None:  # pragma: no cover
+            # openSMILE might still emit frames after abort
+            return
+        now = time.monotonic()
+        start = meta.time
+        end = meta.time + meta.lengthSec
+        with self._lock:
+            # frames are ordered by time,
+            # so older blocks are not needed anymore
+            while len(self._arrivals) > 1 and self._arrivals[0][0] < end:
+                self._arrivals.popleft()
+            latency = now - self._arrivals[0][1]
+        # input was consumed
+        self._notify()
+        self.num_frames += 1
+        if self.max_latency is not None and latency > self.max_latency:
+            self.num_dropped += 1
+            return
+        try:
+            self.callback(
+                data.reshape(-1).astype(self.smile.output_dtype),
+                start,
+                end,
+                latency,
+            )
+        except Exception as ex:
+            self._error = ex
+            self._engine.abort()
+
+    async def _wait(self, ready: Callable[[], bool]):
+        r"""Wait until ``ready`` returns ``True``.
+
+        The processing thread wakes up the event loop
+        when openSMILE emitted a frame
+        or stopped.
+        As openSMILE might consume input
+        without emitting a frame,
+        ``ready`` is also checked
+        after ``_WAKEUP_TIMEOUT`` seconds.
+
+        """
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._wakeup = asyncio.Event()
+            self._loop = loop
+        while True:
+            # clear before checking,
+            # so that no wake-up is missed
+            self._wakeup.clear()
+            if ready():
+                return
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), _WAKEUP_TIMEOUT)
+            except asyncio.TimeoutError:
+                pass
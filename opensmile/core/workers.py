@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+import concurrent.futures
+import multiprocessing
+
+import numpy as np
+import pandas as pd
+
+from opensmile.core.smile import Smile
+
+
+# Feature extractors of worker pools,
+# inherited by forked workers
+# or set by the initializer of spawned workers
+_smiles = {}
+
+
+class WorkerPool(concurrent.futures.ProcessPoolExecutor):
+    r"""Process pool with prepared feature extractor.
+
+    Everything a worker needs
+    is prepared once in the current process:
+    the openSMILE library is loaded,
+    the config file is resolved,
+    the feature names are known
+    and,
+    if ``smile`` reuses engines,
+    an initialized engine is created
+    for every sampling rate
+    in ``sampling_rates``.
+    Workers are then forked from the current process
+    and share these memory pages copy-on-write,
+    instead of importing :mod:`opensmile`
+    and setting up the extractor on their own.
+    This reduces the time to the first result
+    and the memory of every worker.
+    On platforms without the ``fork`` start method,
+    workers are spawned
+    and prepare the extractor once when they start.
+
+    :meth:`opensmile.WorkerPool.process_files`
+    and :meth:`opensmile.WorkerPool.process_arrays`
+    send only the inputs to the workers,
+    not the extractor.
+    As a :class:`concurrent.futures.ProcessPoolExecutor`
+    the pool can also run other tasks,
+    e.g. the shards of a :class:`opensmile.Job`.
+
+    Args:
+        smile: feature extractor
+        num_workers: number of worker processes.
+            If ``None``,
+            the number of processors on the machine
+        sampling_rates: sampling rates in Hz
+            to initialize engines for.
+            If ``None``,
+            the sampling rate of ``smile`` is used
+            if it defines one
+
+    Examples:
+        >>> import numpy as np
+        >>> import opensmile
+        >>> smile = opensmile.Smile(
+        ...     feature_set=opensmile.FeatureSet.eGeMAPSv02,
+        ...     feature_level=opensmile.FeatureLevel.Functionals,
+        ...     reuse_engine=True,
+        ... )
+        >>> with WorkerPool(smile, 2, sampling_rates=[16000]) as pool:
+        ...     ys = pool.process_arrays([np.zeros(16000)] * 3, 16000)
+        >>> len(ys)
+        3
+
+    """
+
+    def __init__(
+        self,
+        smile: Smile,
+        num_workers: int = None,
+        *,
+        sampling_rates: Sequence[int] = None,
+    ):
+        if sampling_rates is None:
+            sampling_rate = smile.process.sampling_rate
+            sampling_rates = [] if sampling_rate is None else [sampling_rate]
+
+        self.smile = smile
+        r"""Feature extractor"""
+        self.sampling_rates = list(sampling_rates)
+        r"""Sampling rates with initialized engines"""
+
+        self._key = id(self)
+        if "fork" in multiprocessing.get_all_start_methods():
+            _prepare(self._key, smile, self.sampling_rates)
+            super().__init__(
+                max_workers=num_workers,
+                mp_context=multiprocessing.get_context("fork"),
+            )
+            # fork workers now,
+            # while the current process is prepared
+            self.submit(int).result()
+        else:  # pragma: no cover
+            super().__init__(
+                max_workers=num_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_prepare,
+                initargs=(self._key, smile, self.sampling_rates),
+            )
+
+    def process_arrays(
+        self,
+        signals: Sequence[np.ndarray],
+        sampling_rate: int,
+    ) -> list[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        r"""Extract features for a batch of signals as arrays.
+
+        See :meth:`opensmile.Smile.process_array`.
+
+        Args:
+            signals: list of signals
+            sampling_rate: sampling rate in Hz
+
+        Returns:
+            features, start and end of every signal
+
+        """
+        futures = [
+            self.submit(_call, self._key, "process_array", signal, sampling_rate)
+            for signal in signals
+        ]
+        return [future.result() for future in futures]
+
+    def process_files(
+        self,
+        files: Sequence[str],
+        *,
+        root: str = None,
+    ) -> pd.DataFrame:
+        r"""Extract features for a list of files.
+
+        See :meth:`opensmile.Smile.process_files`.
+
+        Args:
+            files: list of file paths
+            root: root folder to expand relative file paths
+
+        Returns:
+            features with a segmented index conform to audformat_
+
+        .. _audformat: https://audeering.github.io/audformat/data-format.html
+
+        """
+        futures = [
+            self.submit(_call, self._key, "process_file", file, root=root)
+            for file in files
+        ]
+        return pd.concat([future.result() for future in futures])
+
+    def shutdown(self, *args, **kwargs):
+        r"""Shut down workers and release prepared extractor."""
+        super().shutdown(*args, **kwargs)
+        _smiles.pop(self._key, None)
+
+
+def _call(key: int, method: str, *args, **kwargs):
+    r"""Call method of prepared extractor."""
+    return getattr(_smiles[key], method)(*args, **kwargs)
+
+
+def _prepare(key: int, smile: Smile, sampling_rates: Sequence[int]):
+    r"""Prepare extractor and initialize engines."""
+    if smile.reuse_engine:
+        for sampling_rate in sampling_rates:
+            smile._engine(smile._input_options(sampling_rate, smile.buffer_dur))
+    _smiles[key] = smile
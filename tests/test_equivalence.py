@@ -0,0 +1,351 @@
+import os
+import re
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import audformat
+import audiofile
+
+import opensmile
+from opensmile.core.smile import CHUNK_CONTEXTS
+
+
+SAMPLING_RATE = 16000
+
+# Tolerances of optimized code paths
+# as list of (pattern, (rtol, atol)),
+# where the first pattern matching a feature name applies
+# and features with tolerance None are not compared.
+# Features of paths not listed here have to be identical
+# to the ones of the canonical path.
+TOLERANCES = {
+    # functionals from low-level descriptors
+    # approximate the ones of openSMILE,
+    # see opensmile.functionals(),
+    # tolerances are set slightly above
+    # the largest deviation on the corpus
+    "lld_root": [
+        # rising slopes are an approximation
+        (r"^F0semitone.*RisingSlope$", (0.05, 0.0)),
+        # descriptors of voiced frames,
+        # voiced and unvoiced segments and peaks
+        # are identical up to rounding
+        (r"^F0semitone|^jitter|^shimmer|^HNR|^logRelF0", (1e-6, 0.0)),
+        (r"Segment|PeaksPerSec", (1e-6, 0.0)),
+        # known deviations of the other functionals,
+        # the largest ones occur
+        # on the noise and short signals
+        (r"^loudness_sma3_.*RisingSlope$", (0.2, 0.0)),
+        (r"^loudness_sma3_.*FallingSlope$", (0.06, 0.0)),
+        (r"^loudness_sma3_(stddevNorm|pctlrange)", (0.06, 0.0)),
+        (r"^loudness_sma3_", (0.01, 0.0)),
+        (r"^spectralFlux_sma3_stddevNorm", (0.06, 0.0)),
+        (r"^spectralFlux_sma3_", (0.01, 0.0)),
+        (r"^F\d.*_amean", (2e-3, 0.0)),
+        (r"^F\d", (0.1, 0.0)),
+        # values close to zero
+        (r"^slopeUV", (0.0, 1e-3)),
+        (r"UV[0-9-]*_sma3nz", (0.15, 0.0)),
+        (r"^mfcc\dV_sma3nz", (0.03, 0.0)),
+        (r"V[0-9-]*_sma3nz", (5e-3, 0.0)),
+        # mfcc4 is close to zero for noise
+        (r"^mfcc4_sma3", (0.4, 0.1)),
+        (r"^mfcc\d_sma3", (0.2, 0.0)),
+    ],
+    # jitter and shimmer (GeMAPS family) and F0 (IS09)
+    # deviate in the first voiced segment of a chunk,
+    # see test_chunk_voiced() in tests/test_smile.py
+    "chunk_dur": [
+        (r"jitter|shimmer|^F0_sma", None),
+    ],
+}
+
+
+def canonical(smile, files, signals, tmpdir):
+    return [smile.process_signal(signal, SAMPLING_RATE) for signal in signals]
+
+
+def reuse_engine(smile, files, signals, tmpdir):
+    smile = opensmile.Smile(
+        smile.feature_set,
+        smile.feature_level,
+        reuse_engine=True,
+    )
+    # second pass runs on engines
+    # that were already used and reset
+    canonical(smile, files, signals, tmpdir)
+    return canonical(smile, files, signals, tmpdir)
+
+
+def process_signals(smile, files, signals, tmpdir):
+    smile = opensmile.Smile(
+        smile.feature_set,
+        smile.feature_level,
+        reuse_engine=True,
+    )
+    y = smile.process_signals(signals, SAMPLING_RATE)
+    return [y.xs(idx, level="signal") for idx in range(len(signals))]
+
+
+def buffer_dur(smile, files, signals, tmpdir):
+    smile = opensmile.Smile(
+        smile.feature_set,
+        smile.feature_level,
+        buffer_dur=0.25,
+    )
+    return canonical(smile, files, signals, tmpdir)
+
+
+def memory_profile(smile, files, signals, tmpdir):
+    smile = opensmile.Smile(
+        smile.feature_set,
+        smile.feature_level,
+        memory_profile="low",
+    )
+    return canonical(smile, files, signals, tmpdir)
+
+
+def memmap_root(smile, files, signals, tmpdir):
+    y = smile.process_index(
+        audformat.filewise_index(files),
+        memmap_root=tmpdir,
+    )
+    return [y.xs(file, level="file") for file in files]
+
+
+def chunk_dur(smile, files, signals, tmpdir):
+    smile = opensmile.Smile(
+        smile.feature_set,
+        smile.feature_level,
+        chunk_dur=5.0,
+    )
+    return canonical(smile, files, signals, tmpdir)
+
+
+def int16(smile, files, signals, tmpdir):
+    # decoded signals are 16 bit PCM
+    signals = [(signal * 32768).astype(np.int16) for signal in signals]
+    return canonical(smile, files, signals, tmpdir)
+
+
+def process_array(smile, files, signals, tmpdir):
+    ys = []
+    for signal in signals:
+        values, starts, ends = smile.process_array(signal, SAMPLING_RATE)
+        index = pd.MultiIndex.from_arrays(
+            [pd.to_timedelta(starts), pd.to_timedelta(ends)],
+            names=["start", "end"],
+        )
+        ys.append(pd.DataFrame(values, index=index, columns=smile.column_names))
+    return ys
+
+
+def prefetch(smile, files, signals, tmpdir):
+    y = smile.process_files(files, prefetch=2)
+    return [y.xs(file, level="file") for file in files]
+
+
+def lld_root(smile, files, signals, tmpdir):
+    with warnings.catch_warnings():
+        # unsupported functionals are not returned
+        warnings.simplefilter("ignore", category=UserWarning)
+        y = smile.process_index(
+            audformat.filewise_index(files),
+            lld_root=tmpdir,
+        )
+    return [y.xs(file, level="file") for file in files]
+
+
+PATHS = {
+    "reuse_engine": reuse_engine,
+    "process_signals": process_signals,
+    "process_array": process_array,
+    "int16": int16,
+    "buffer_dur": buffer_dur,
+    "memory_profile": memory_profile,
+    "chunk_dur": chunk_dur,
+    "memmap_root": memmap_root,
+    "prefetch": prefetch,
+    "lld_root": lld_root,
+}
+
+
+def supported(path, feature_set, feature_level):
+    gemaps = "GeMAPS" in feature_set.name
+    if gemaps and feature_level == opensmile.FeatureLevel.LowLevelDescriptors_Deltas:
+        return False
+    if path == "lld_root":
+        return gemaps and feature_level == opensmile.FeatureLevel.Functionals
+    if path == "chunk_dur":
+        return (
+            feature_set in CHUNK_CONTEXTS
+            and feature_level != opensmile.FeatureLevel.Functionals
+        )
+    return True
+
+
+def diff_report(expected, actual, tolerances):
+    r"""Report features that deviate more than their tolerance."""
+    rows = []
+    for column in actual.columns:
+        tolerance = next(
+            (tol for pattern, tol in tolerances if re.search(pattern, column)),
+            (0.0, 0.0),
+        )
+        if tolerance is None:
+            continue
+        rtol, atol = tolerance
+        e = expected[column].to_numpy(dtype=np.float64)
+        a = actual[column].to_numpy(dtype=np.float64)
+        diff = np.abs(a - e)
+        nan = np.isnan(a) | np.isnan(e)
+        deviates = np.where(
+            nan,
+            np.isnan(a) != np.isnan(e),
+            diff > atol + rtol * np.abs(e),
+        )
+        if deviates.any():
+            with np.errstate(divide="ignore", invalid="ignore"):
+                rel = diff / np.abs(e)
+            rows.append(
+                {
+                    "feature": column,
+                    "signals": ", ".join(
+                        actual.index.get_level_values("signal")[deviates].unique()
+                    ),
+                    "frames": int(deviates.sum()),
+                    "max_abs_diff": np.nanmax(diff, initial=0),
+                    "max_rel_diff": np.nanmax(rel, initial=0),
+                    "rtol": rtol,
+                    "atol": atol,
+                }
+            )
+    return pd.DataFrame(
+        rows,
+        columns=[
+            "feature",
+            "signals",
+            "frames",
+            "max_abs_diff",
+            "max_rel_diff",
+            "rtol",
+            "atol",
+        ],
+    ).set_index("feature")
+
+
+@pytest.fixture(scope="module")
+def corpus(tmp_path_factory):
+    root = str(tmp_path_factory.mktemp("corpus"))
+    rng = np.random.default_rng(1)
+    # 30 s of speech-like signal,
+    # harmonics with a varying pitch and syllable rate loudness
+    # alternate with noise in voiced and unvoiced segments
+    # of 0.05 s to 2 s,
+    # so that features depending on voicing,
+    # and paths splitting the signal,
+    # see many transitions
+    t = np.arange(30 * SAMPLING_RATE) / SAMPLING_RATE
+    f0 = 140 + 50 * np.sin(2 * np.pi * 0.3 * t) + 20 * np.sin(2 * np.pi * 2.1 * t)
+    phase = 2 * np.pi * np.cumsum(f0) / SAMPLING_RATE
+    harmonics = sum(np.sin(k * phase) / k for k in range(1, 11))
+    durations = rng.uniform(0.05, 2.0, size=len(t) // (SAMPLING_RATE // 20))
+    boundaries = np.cumsum(durations * SAMPLING_RATE).astype(int)
+    voiced = np.searchsorted(boundaries, np.arange(len(t)), side="right") % 2 == 0
+    syllables = 0.6 + 0.4 * np.sin(2 * np.pi * 4 * t)
+    signals = {
+        "silence": np.zeros(SAMPLING_RATE),
+        "noise": 0.1 * rng.normal(size=SAMPLING_RATE),
+        "speech": np.where(
+            voiced,
+            0.2 * harmonics * syllables,
+            0.02 * rng.normal(size=len(t)),
+        ),
+        "short": 0.1 * rng.normal(size=int(0.3 * SAMPLING_RATE)),
+    }
+    files = []
+    for name, signal in signals.items():
+        file = os.path.join(root, f"{name}.wav")
+        audiofile.write(file, signal.astype("float32"), SAMPLING_RATE)
+        files.append(file)
+    # use decoded signals,
+    # so that all paths see the same samples
+    signals = [audiofile.read(file, always_2d=True)[0] for file in files]
+    return files, signals
+
+
+@pytest.fixture(scope="module")
+def expected(corpus):
+    results = {}
+
+    def extract(feature_set, feature_level):
+        key = (feature_set, feature_level)
+        if key not in results:
+            smile = opensmile.Smile(feature_set, feature_level)
+            results[key] = canonical(smile, *corpus, None)
+        return results[key]
+
+    return extract
+
+
+@pytest.mark.filterwarnings("ignore:Feature set")
+@pytest.mark.parametrize(
+    "path,feature_set,feature_level",
+    [
+        (path, feature_set, feature_level)
+        for path in PATHS
+        for feature_set in opensmile.FeatureSet
+        for feature_level in opensmile.FeatureLevel
+        if supported(path, feature_set, feature_level)
+    ],
+)
+def test_equivalence(tmpdir, corpus, expected, path, feature_set, feature_level):
+    files, signals = corpus
+    names = [os.path.splitext(os.path.basename(file))[0] for file in files]
+    smile = opensmile.Smile(feature_set, feature_level)
+
+    y = pd.concat(expected(feature_set, feature_level), keys=names, names=["signal"])
+    y_path = pd.concat(
+        PATHS[path](smile, files, signals, str(tmpdir)),
+        keys=names,
+        names=["signal"],
+    )
+
+    pd.testing.assert_index_equal(y_path.index, y.index)
+    if path not in TOLERANCES:
+        pd.testing.assert_index_equal(y_path.columns, y.columns)
+    assert all(y_path.dtypes == np.float32)
+    report = diff_report(y, y_path, TOLERANCES.get(path, []))
+    assert report.empty, (
+        f"Features of path '{path}' deviate from canonical path:\n{report.to_string()}"
+    )
+
+
+def test_diff_report():
+    index = pd.MultiIndex.from_arrays(
+        [["a", "a", "b"], [0, 1, 0]],
+        names=["signal", "frame"],
+    )
+    expected = pd.DataFrame(
+        {"x": [1.0, 2.0, np.nan], "y": [1.0, 1.0, 1.0]},
+        index=index,
+    )
+    actual = pd.DataFrame(
+        {"x": [1.0, 2.5, 0.0], "y": [1.0, 1.05, 1.0]},
+        index=index,
+    )
+
+    report = diff_report(expected, actual, [])
+    assert list(report.index) == ["x", "y"]
+    assert report.loc["x", "signals"] == "a, b"
+    assert report.loc["x", "frames"] == 2
+    assert report.loc["x", "max_abs_diff"] == 0.5
+    np.testing.assert_allclose(report.loc["y", "max_rel_diff"], 0.05)
+
+    report = diff_report(expected, actual, [("y", (0.1, 0.0))])
+    assert list(report.index) == ["x"]
+    report = diff_report(expected, actual, [("x", None)])
+    assert list(report.index) == ["y"]
@@ -0,0 +1,61 @@
+import pandas as pd
+import pytest
+
+import opensmile
+from opensmile.core.footprint import _measure
+
+
+def test_footprint():
+    smile = opensmile.Smile(
+        opensmile.FeatureSet.eGeMAPSv02,
+        opensmile.FeatureLevel.LowLevelDescriptors,
+    )
+    durations = [5, 10, 20]
+
+    footprint = opensmile.MemoryFootprint(smile, durations)
+
+    assert footprint.smile is smile
+    assert footprint.sampling_rate == 16000
+    y = footprint.measurements
+    assert y.index.name == "duration"
+    assert list(y.index) == durations
+    assert list(y.columns) == ["python", "native", "total"]
+    assert (y >= 0).all(axis=None)
+    pd.testing.assert_series_equal(
+        y["total"],
+        y["python"] + y["native"],
+        check_names=False,
+    )
+    # output grows with signal duration
+    assert y["python"].is_monotonic_increasing
+    assert footprint.bytes_per_second > 0
+    assert footprint.offset >= 0
+    assert footprint.predict(0) == footprint.offset
+    assert footprint.predict(60) == (footprint.offset + 60 * footprint.bytes_per_second)
+
+    # sampling rate of feature extractor
+    smile = opensmile.Smile(
+        opensmile.FeatureSet.eGeMAPSv02,
+        opensmile.FeatureLevel.Functionals,
+        sampling_rate=8000,
+    )
+    footprint = opensmile.MemoryFootprint(smile, [1, 2])
+    assert footprint.sampling_rate == 8000
+    assert len(footprint.measurements) == 2
+
+
+def test_footprint_measure():
+    # runs in worker process in test_footprint
+    smile = opensmile.Smile(
+        opensmile.FeatureSet.eGeMAPSv02,
+        opensmile.FeatureLevel.LowLevelDescriptors,
+    )
+    python, native, total = _measure(smile, 2, 16000)
+    assert python > 0
+    assert native >= 0
+    assert total == python + native
+
+
+def test_footprint_errors():
+    with pytest.raises(ValueError, match="two durations"):
+        opensmile.MemoryFootprint(opensmile.Smile(), [60])
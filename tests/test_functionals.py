@@ -0,0 +1,191 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import audformat
+
+import opensmile
+
+
+# functionals of low-level descriptors
+# that are neither smoothed across unvoiced frames
+# nor computed on intermediate levels
+exact_columns = [
+    "F0semitoneFrom27.5Hz_sma3nz_amean",
+    "F0semitoneFrom27.5Hz_sma3nz_stddevNorm",
+    "F0semitoneFrom27.5Hz_sma3nz_percentile20.0",
+    "F0semitoneFrom27.5Hz_sma3nz_percentile50.0",
+    "F0semitoneFrom27.5Hz_sma3nz_percentile80.0",
+    "F0semitoneFrom27.5Hz_sma3nz_pctlrange0-2",
+    "F0semitoneFrom27.5Hz_sma3nz_meanFallingSlope",
+    "F0semitoneFrom27.5Hz_sma3nz_stddevFallingSlope",
+    "jitterLocal_sma3nz_amean",
+    "jitterLocal_sma3nz_stddevNorm",
+    "shimmerLocaldB_sma3nz_amean",
+    "shimmerLocaldB_sma3nz_stddevNorm",
+    "HNRdBACF_sma3nz_amean",
+    "HNRdBACF_sma3nz_stddevNorm",
+    "logRelF0-H1-H2_sma3nz_amean",
+    "logRelF0-H1-H2_sma3nz_stddevNorm",
+    "logRelF0-H1-A3_sma3nz_amean",
+    "logRelF0-H1-A3_sma3nz_stddevNorm",
+    "VoicedSegmentsPerSec",
+    "MeanVoicedSegmentLengthSec",
+    "StddevVoicedSegmentLengthSec",
+    "MeanUnvoicedSegmentLength",
+    "StddevUnvoicedSegmentLength",
+]
+
+# functionals with a mean close to zero
+# or rising slopes,
+# which deviate more
+approximate_columns = [
+    "F0semitoneFrom27.5Hz_sma3nz_meanRisingSlope",
+    "slopeUV500-1500_sma3nz_amean",
+]
+
+
+def lld_smile(feature_set):
+    return opensmile.Smile(
+        feature_set,
+        opensmile.FeatureLevel.LowLevelDescriptors,
+    )
+
+
+@pytest.mark.parametrize(
+    "feature_set",
+    [
+        opensmile.FeatureSet.GeMAPSv01b,
+        opensmile.FeatureSet.eGeMAPSv02,
+    ],
+)
+def test_functionals(feature_set):
+    lld = lld_smile(feature_set).process_file(pytest.WAV_FILE)
+    expected = opensmile.Smile(feature_set).process_file(pytest.WAV_FILE)
+
+    y = opensmile.functionals(lld, feature_set=feature_set)
+
+    pd.testing.assert_index_equal(y.index, expected.index)
+    assert all(y.dtypes == np.float32)
+    # all functionals but the equivalent sound level
+    assert set(y.columns) == set(expected.columns) - {"equivalentSoundLevel_dBp"}
+    assert list(y.columns) == [
+        column for column in expected.columns if column in y.columns
+    ]
+    np.testing.assert_allclose(
+        y[exact_columns],
+        expected[exact_columns],
+        rtol=1e-5,
+    )
+    np.testing.assert_allclose(
+        y.drop(columns=approximate_columns),
+        expected[y.columns].drop(columns=approximate_columns),
+        rtol=0.2,
+    )
+    np.testing.assert_allclose(
+        y[approximate_columns],
+        expected[approximate_columns],
+        rtol=0.3,
+    )
+
+
+def test_functionals_peaks_segments():
+    # loudness with peaks at frame 2 and 6
+    # and a small peak at frame 4
+    loudness = [0.0, 1.0, 4.0, 2.0, 2.3, 1.0, 5.0, 3.0, 1.0] + [1.0] * 8
+    # voiced frames with a gap of a single frame
+    f0 = [0.0, 30.0, 31.0, 0.0, 32.0, 33.0, 0.0, 0.0, 0.0, 34.0] + [0.0] * 7
+    lld = pd.DataFrame(
+        {
+            "Loudness_sma3": loudness,
+            "F0semitoneFrom27.5Hz_sma3nz": f0,
+        },
+        index=pd.MultiIndex.from_arrays(
+            [
+                pd.to_timedelta(np.arange(17) * 0.01, unit="s"),
+                pd.to_timedelta(np.arange(17) * 0.01 + 0.02, unit="s"),
+            ],
+            names=["start", "end"],
+        ),
+    )
+    y = opensmile.functionals(lld).iloc[0]
+    # segment lasts 0.18 s
+    assert y["loudnessPeaksPerSec"] == pytest.approx(2 / 0.17)
+    # slopes in units per second
+    # from peak 2 to minimum 5 to peak 6 to minimum 8
+    assert y["loudness_sma3_meanRisingSlope"] == pytest.approx(400)
+    assert y["loudness_sma3_meanFallingSlope"] == pytest.approx((100 + 200) / 2)
+    assert y["loudness_sma3_stddevFallingSlope"] == pytest.approx(50)
+    # frames 0 to 11 start 70 ms before the end,
+    # a voiced segment from frame 1 to 5,
+    # the voiced frame 9 is too short
+    assert y["VoicedSegmentsPerSec"] == pytest.approx(1 / 0.12)
+    assert y["MeanVoicedSegmentLengthSec"] == pytest.approx(0.04)
+    assert y["StddevVoicedSegmentLengthSec"] == 0
+    # an unvoiced segment from frame 6 to 11
+    assert y["MeanUnvoicedSegmentLength"] == pytest.approx(0.05)
+    # frames 0 to 9 start 70 ms before the end,
+    # but the last frame is voiced and ignored
+    y = opensmile.functionals(lld.iloc[:15]).iloc[0]
+    assert y["VoicedSegmentsPerSec"] == pytest.approx(1 / 0.09)
+    assert y["MeanUnvoicedSegmentLength"] == pytest.approx(0.02)
+
+
+def test_functionals_index():
+    files = [pytest.WAV_FILE, "other.wav"]
+    smile = lld_smile(opensmile.FeatureSet.eGeMAPSv02)
+    lld = smile.process_files(files[:1])
+
+    # segmented index
+    index = audformat.segmented_index(
+        [files[0], files[0], files[0], files[1]],
+        pd.to_timedelta([0, 1, 1, 0], unit="s"),
+        pd.to_timedelta([np.nan, 3, 1, 1], unit="s"),
+    )
+    y = opensmile.functionals(lld, index)
+    pd.testing.assert_index_equal(y.index, index)
+    pd.testing.assert_frame_equal(
+        y.iloc[:1],
+        opensmile.functionals(lld).set_axis(y.index[:1]),
+    )
+    frames = lld.loc[
+        (lld.index.get_level_values("start") >= pd.Timedelta(1, unit="s"))
+        & (lld.index.get_level_values("start") < pd.Timedelta(3, unit="s"))
+    ]
+    x = frames["Loudness_sma3"].to_numpy(dtype=np.float64)
+    np.testing.assert_allclose(y.iloc[1]["loudness_sma3_amean"], x.mean(), rtol=1e-6)
+    np.testing.assert_allclose(
+        y.iloc[1]["loudness_sma3_percentile80.0"],
+        np.percentile(x, 80),
+        rtol=1e-6,
+    )
+    # segments without frames
+    assert (y.iloc[2:] == 0).all(axis=None)
+
+    # filewise index
+    index = audformat.filewise_index(files)
+    y = opensmile.functionals(lld, index)
+    pd.testing.assert_index_equal(y.index, index)
+    np.testing.assert_equal(
+        y.iloc[0].to_numpy(),
+        opensmile.functionals(lld).iloc[0].to_numpy(),
+    )
+
+    # signal
+    signal = pytest.WAV_ARRAY[:, : pytest.WAV_SR * 2]
+    lld = smile.process_signal(signal, pytest.WAV_SR)
+    y = opensmile.functionals(lld)
+    assert y.index.names == ["start", "end"]
+    assert len(y) == 1
+    index = pd.MultiIndex.from_arrays(
+        [pd.to_timedelta([0, 1], unit="s"), pd.to_timedelta([1, 2], unit="s")],
+        names=["start", "end"],
+    )
+    y = opensmile.functionals(lld, index)
+    pd.testing.assert_index_equal(y.index, index)
+
+
+def test_functionals_errors():
+    lld = lld_smile(pytest.CONFIG_FILE).process_file(pytest.WAV_FILE)
+    with pytest.raises(ValueError, match="low-level descriptors"):
+        opensmile.functionals(lld)
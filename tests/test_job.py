@@ -0,0 +1,360 @@
+import concurrent.futures
+import glob
+import json
+import os
+
+import pandas as pd
+import pytest
+
+import audeer
+import audformat
+import audiofile
+
+import opensmile
+
+
+def create_files(root, num_files, duration=2.0):
+    files = []
+    for idx in range(num_files):
+        file = f"{idx}.wav"
+        num_samples = int(duration * pytest.WAV_SR)
+        audiofile.write(
+            os.path.join(root, file),
+            pytest.WAV_ARRAY[:, :num_samples],
+            pytest.WAV_SR,
+        )
+        files.append(file)
+    return files
+
+
+def segmented_index(files):
+    return audformat.segmented_index(
+        [file for file in files for _ in range(2)],
+        pd.to_timedelta([0, 1] * len(files), unit="s"),
+        pd.to_timedelta([1, 2] * len(files), unit="s"),
+    )
+
+
+@pytest.fixture(scope="module")
+def root(tmp_path_factory):
+    root = str(tmp_path_factory.mktemp("media"))
+    create_files(root, 8)
+    return root
+
+
+@pytest.fixture(scope="module")
+def index(root):
+    return segmented_index([f"{idx}.wav" for idx in range(8)])
+
+
+@pytest.fixture(scope="module")
+def smile():
+    return opensmile.Smile(
+        opensmile.FeatureSet.eGeMAPSv02,
+        opensmile.FeatureLevel.Functionals,
+    )
+
+
+class CountingExecutor(concurrent.futures.ThreadPoolExecutor):
+    r"""Executor that counts submitted tasks."""
+
+    def __init__(self):
+        super().__init__(max_workers=2)
+        self.num_tasks = 0
+
+    def submit(self, fn, /, *args, **kwargs):
+        r"""Submit task and increase counter."""
+        self.num_tasks += 1
+        return super().submit(fn, *args, **kwargs)
+
+
+@pytest.mark.parametrize(
+    "executor",
+    [
+        None,
+        concurrent.futures.ThreadPoolExecutor(max_workers=2),
+        concurrent.futures.ProcessPoolExecutor(max_workers=2),
+    ],
+)
+@pytest.mark.parametrize("shard_size", [1, 3, 100])
+def test_job(tmpdir, root, index, smile, executor, shard_size):
+    job = opensmile.Job(smile, index, tmpdir, shard_size=shard_size, root=root)
+    if shard_size == 1:
+        assert len(job.shards) == 8
+    else:
+        assert 1 <= len(job.shards) <= 8
+    assert job.pending == job.shards
+
+    y = job.run(executor)
+
+    assert job.pending == []
+    pd.testing.assert_frame_equal(y, smile.process_index(index, root=root))
+    with open(job._path("manifest", ".json")) as fp:
+        manifest = json.load(fp)
+    assert manifest["smile"] == smile.to_yaml_s()
+    assert [shard["id"] for shard in manifest["shards"]] == job.shards
+    assert manifest["outdated"] == []
+    assert sum(shard["size"] for shard in manifest["shards"]) == len(index)
+
+    # shards are deterministic
+
+    job = opensmile.Job(smile, index, tmpdir, shard_size=shard_size, root=root)
+    assert job.pending == []
+    pd.testing.assert_frame_equal(job.merge(), y)
+
+
+def test_job_resume(tmpdir, root, index, smile):
+    job = opensmile.Job(smile, index, tmpdir, shard_size=1, root=root)
+    y = job.run()
+
+    # simulate crash by removing a shard
+
+    os.remove(job._path(job.shards[1]))
+    assert job.pending == [job.shards[1]]
+    with pytest.raises(RuntimeError, match="1 of 8 shards are pending"):
+        job.merge()
+
+    executor = CountingExecutor()
+    pd.testing.assert_frame_equal(job.run(executor), y)
+    assert executor.num_tasks == 1
+
+    # other feature extractor results in new shards
+
+    other_smile = opensmile.Smile(
+        opensmile.FeatureSet.eGeMAPSv02,
+        opensmile.FeatureLevel.LowLevelDescriptors,
+    )
+    job = opensmile.Job(other_smile, index, tmpdir, shard_size=1, root=root)
+    assert len(job.pending) == 8
+
+    # other output data type results in new shards
+
+    other_smile = opensmile.Smile(
+        smile.feature_set,
+        smile.feature_level,
+        output_dtype="float16",
+    )
+    job = opensmile.Job(other_smile, index, tmpdir, shard_size=1, root=root)
+    assert len(job.pending) == 8
+
+
+@pytest.mark.parametrize(
+    "feature_level",
+    [
+        opensmile.FeatureLevel.Functionals,
+        opensmile.FeatureLevel.LowLevelDescriptors,
+    ],
+)
+@pytest.mark.parametrize("fingerprint", [None, "mtime", "md5"])
+def test_job_update(tmpdir, monkeypatch, feature_level, fingerprint):
+    smile = opensmile.Smile(opensmile.FeatureSet.eGeMAPSv02, feature_level)
+    root = audeer.mkdir(tmpdir, "media")
+    job_root = audeer.mkdir(tmpdir, "job")
+    files = create_files(root, 10)
+
+    job = opensmile.Job(
+        smile,
+        segmented_index(files[:8]),
+        job_root,
+        shard_size=2,
+        root=root,
+        fingerprint=fingerprint,
+    )
+    job.run()
+    shards = job.shards
+
+    # count extracted entries
+    extracted = []
+    process_index = opensmile.Smile.process_index
+
+    def counting_process_index(self, index, **kwargs):
+        extracted.extend(index.get_level_values("file"))
+        return process_index(self, index, **kwargs)
+
+    monkeypatch.setattr(opensmile.Smile, "process_index", counting_process_index)
+
+    # insert new files
+
+    index = segmented_index(files[:4] + files[8:] + files[4:8])
+    job = opensmile.Job(
+        smile,
+        index,
+        job_root,
+        shard_size=2,
+        root=root,
+        fingerprint=fingerprint,
+    )
+    assert 1 <= len(job.pending) < len(job.shards)
+    assert set(job.shards) - set(job.pending) <= set(shards)
+    pending = job.pending
+    assert job.run(merge=False) is None
+    # only new files are extracted
+    assert sorted(set(extracted)) == files[8:]
+    monkeypatch.undo()
+    expected = smile.process_index(index, root=root)
+    pd.testing.assert_frame_equal(job.merge(), expected)
+    # features of updated shards
+    pd.testing.assert_frame_equal(
+        job.merge(pending),
+        pd.concat(
+            [smile.process_index(job._shards[uid], root=root) for uid in pending]
+        ),
+    )
+    # shards of previous run are removed
+    assert len(glob.glob(os.path.join(job._root, "*.pkl"))) == len(job.shards)
+    assert len(glob.glob(os.path.join(job._root, "*.json"))) == len(job.shards) + 1
+
+    # modify file
+
+    audiofile.write(
+        os.path.join(root, files[0]),
+        pytest.WAV_ARRAY[:, : pytest.WAV_SR * 3],
+        pytest.WAV_SR,
+    )
+    job = opensmile.Job(
+        smile,
+        index,
+        job_root,
+        shard_size=2,
+        root=root,
+        fingerprint=fingerprint,
+    )
+    if fingerprint is None:
+        assert job.pending == []
+    else:
+        assert job.pending == [job.shards[0]]
+        extracted.clear()
+        monkeypatch.setattr(opensmile.Smile, "process_index", counting_process_index)
+        y = job.run()
+        monkeypatch.undo()
+        assert sorted(set(extracted)) == files[:1]
+        pd.testing.assert_frame_equal(y, smile.process_index(index, root=root))
+
+
+def test_job_update_incomplete(tmpdir, monkeypatch, root, index, smile):
+    job = opensmile.Job(smile, index, tmpdir, shard_size=1, root=root)
+    job.run()
+    # features of the first shard are missing
+    os.remove(job._path(job.shards[0]))
+
+    # merge into a single shard
+    extracted = []
+    process_index = opensmile.Smile.process_index
+
+    def counting_process_index(self, index, **kwargs):
+        extracted.extend(index.get_level_values("file"))
+        return process_index(self, index, **kwargs)
+
+    monkeypatch.setattr(opensmile.Smile, "process_index", counting_process_index)
+    job = opensmile.Job(smile, index, tmpdir, shard_size=100, root=root)
+    y = job.run()
+    monkeypatch.undo()
+
+    assert sorted(set(extracted)) == ["0.wav"]
+    pd.testing.assert_frame_equal(y, smile.process_index(index, root=root))
+    assert sorted(os.listdir(job._root)) == sorted(
+        [f"{job.shards[0]}.pkl", f"{job.shards[0]}.json", "manifest.json"]
+    )
+
+
+def test_job_empty(tmpdir, smile):
+    index = audformat.segmented_index()
+    job = opensmile.Job(smile, index, tmpdir)
+    assert job.shards == []
+
+    y = job.run()
+
+    assert y.empty
+    assert y.columns.to_list() == list(smile.column_names)
+    assert y.index.names == ["file", "start", "end"]
+    assert (y.dtypes == smile.output_dtype).all()
+    pd.testing.assert_frame_equal(job.merge([]), y)
+
+
+def test_job_foreign_files(tmpdir, root, index, smile):
+    foreign = {}
+    for name, content in [
+        ("features.pkl", "pkl"),
+        ("features.json", '{"features": []}'),
+        ("manifest.json", "{}"),
+    ]:
+        foreign[os.path.join(tmpdir, name)] = content
+        with open(os.path.join(tmpdir, name), "w") as fp:
+            fp.write(content)
+
+    job = opensmile.Job(smile, index, tmpdir, shard_size=1, root=root)
+    y = job.run()
+    # files of the job are stored in a sub-folder
+    assert os.path.dirname(job._root) == job.job_root
+    foreign[os.path.join(job._root, "features.json")] = "[]"
+    with open(os.path.join(job._root, "features.json"), "w") as fp:
+        fp.write("[]")
+    # rows of a shard that do not match the schema
+    with open(job._path(job.shards[0], ".json"), "w") as fp:
+        fp.write('{"files": 1}')
+
+    # update job
+    job = opensmile.Job(smile, index, tmpdir, shard_size=100, root=root)
+    pd.testing.assert_frame_equal(job.run(), y)
+    for path, content in foreign.items():
+        with open(path) as fp:
+            assert fp.read() == content
+
+    # a manifest that does not match the schema is ignored
+    with open(job._path("manifest", ".json"), "w") as fp:
+        fp.write('{"shards": 1}')
+    job = opensmile.Job(smile, index, tmpdir, shard_size=1, root=root)
+    pd.testing.assert_frame_equal(job.run(), y)
+
+
+def test_job_shared_root(tmpdir, root, index, smile):
+    other_smile = opensmile.Smile(
+        opensmile.FeatureSet.eGeMAPSv02,
+        opensmile.FeatureLevel.LowLevelDescriptors,
+    )
+    job = opensmile.Job(smile, index, tmpdir, shard_size=1, root=root)
+    other_job = opensmile.Job(other_smile, index, tmpdir, shard_size=1, root=root)
+    y = job.run()
+    other_job.run()
+
+    # jobs do not remove shards of each other
+    job = opensmile.Job(smile, index, tmpdir, shard_size=1, root=root)
+    assert job.pending == []
+    pd.testing.assert_frame_equal(job.merge(), y)
+    other_job = opensmile.Job(
+        other_smile,
+        index[:4],
+        tmpdir,
+        shard_size=1,
+        root=root,
+    )
+    other_job.run()
+    assert job.pending == []
+    pd.testing.assert_frame_equal(job.run(), y)
+    pd.testing.assert_frame_equal(
+        other_job.merge(),
+        other_smile.process_index(index[:4], root=root),
+    )
+
+
+def test_job_errors(tmpdir, smile):
+    index = audformat.segmented_index(
+        [pytest.WAV_FILE, "missing.wav", pytest.WAV_FILE],
+        pd.to_timedelta([0, 0, 1], unit="s"),
+        pd.to_timedelta([1, 1, 2], unit="s"),
+    )
+
+    with pytest.raises(ValueError, match="shard_size"):
+        opensmile.Job(smile, index, tmpdir, shard_size=0)
+    with pytest.raises(ValueError, match="fingerprint"):
+        opensmile.Job(smile, index, tmpdir, fingerprint="size")
+
+    # error in a shard is raised,
+    # but other shards are stored
+
+    job = opensmile.Job(smile, index, tmpdir, shard_size=1)
+    with pytest.raises((FileNotFoundError, RuntimeError)):
+        job.run(concurrent.futures.ThreadPoolExecutor(max_workers=1))
+    assert job.pending == [job.shards[1]]
+    with pytest.raises(KeyError):
+        job.merge(["unknown"])
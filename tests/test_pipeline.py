@@ -0,0 +1,99 @@
+import os
+
+import numpy as np
+import pytest
+
+import opensmile
+from opensmile.core.lib import OpenSMILE
+
+
+CONFIG_FILE = os.path.join(pytest.ROOT, "test_pipeline.conf")
+
+
+@pytest.fixture(scope="module")
+def inputs():
+    rng = np.random.default_rng(0)
+    return {
+        "source": rng.standard_normal((5000, 2)),
+        "other": rng.standard_normal(5000),
+    }
+
+
+@pytest.fixture(scope="module")
+def expected(inputs):
+    # input buffers of openSMILE can hold all frames
+    pipeline = opensmile.Pipeline(
+        CONFIG_FILE,
+        ["source", "other"],
+        ["sink", "other_sink"],
+        options={"blocksize": 5000},
+        block_size=5000,
+    )
+    return pipeline(inputs)
+
+
+@pytest.mark.parametrize("block_size", [1, 64, 1000])
+@pytest.mark.parametrize("reuse_engine", [False, True])
+def test_pipeline(inputs, expected, block_size, reuse_engine):
+    pipeline = opensmile.Pipeline(
+        CONFIG_FILE,
+        ["source", "other"],
+        ["sink", "other_sink"],
+        block_size=block_size,
+        reuse_engine=reuse_engine,
+    )
+    assert pipeline.output_names == {
+        "sink": ["x_de[0]", "x_de[1]"],
+        "other_sink": ["y"],
+    }
+
+    # second run on reset engine
+    for _ in range(2):
+        y = pipeline(inputs)
+        assert list(y) == ["sink", "other_sink"]
+        for output, values in y.items():
+            assert values.dtype == np.float32
+            np.testing.assert_equal(values, expected[output])
+
+    # outputs grow beyond the length of the inputs
+    assert len(y["sink"]) > len(inputs["source"])
+    np.testing.assert_equal(
+        y["other_sink"][:, 0],
+        inputs["other"].astype(np.float32),
+    )
+
+
+def test_pipeline_empty():
+    pipeline = opensmile.Pipeline(CONFIG_FILE, ["source", "other"], ["other_sink"])
+    y = pipeline({"source": np.zeros((0, 2)), "other": np.zeros(0)})
+    assert y["other_sink"].shape == (0, 1)
+
+
+def test_pipeline_errors(monkeypatch):
+    with pytest.raises(FileNotFoundError):
+        opensmile.Pipeline("bad.conf", ["source"], ["sink"])
+    with pytest.raises(ValueError, match="'block_size' has to be at least 1"):
+        opensmile.Pipeline(CONFIG_FILE, ["source"], ["sink"], block_size=0)
+
+    pipeline = opensmile.Pipeline(
+        CONFIG_FILE,
+        ["source", "other"],
+        ["sink"],
+        timeout=0.1,
+    )
+    with pytest.raises(ValueError, match="do not match"):
+        pipeline({"source": np.zeros((10, 2))})
+
+    # input buffer is never processed
+    monkeypatch.setattr(
+        OpenSMILE,
+        "external_source_write_data",
+        lambda self, name, data: False,
+    )
+    with pytest.raises(RuntimeError, match="'source' was not processed"):
+        pipeline({"source": np.zeros((10, 2)), "other": np.zeros(10)})
+
+
+def test_process(inputs, expected):
+    y = OpenSMILE.process(CONFIG_FILE, {}, inputs, ["sink"])
+    np.testing.assert_equal(y["sink"], expected["sink"])
@@ -0,0 +1,96 @@
+import concurrent.futures
+
+import pandas as pd
+import pytest
+
+import audformat
+
+import opensmile
+from opensmile.core.scheduler import _lpt
+
+
+@pytest.mark.parametrize(
+    "index, expected_durations",
+    [
+        (
+            audformat.filewise_index(["test.wav"]),
+            [5.2477097505668935],
+        ),
+        (
+            audformat.segmented_index(
+                ["test.wav"] * 4,
+                [0, 0.5, 1, 3],
+                [1, 3, None, 3.5],
+            ),
+            [1.0, 2.5, 4.2477097505668935, 0.5],
+        ),
+    ],
+)
+@pytest.mark.parametrize("multiprocessing", [False, True])
+def test_scheduler(index, expected_durations, multiprocessing):
+    smile = opensmile.Smile(
+        opensmile.FeatureSet.eGeMAPSv02,
+        opensmile.FeatureLevel.LowLevelDescriptors,
+    )
+    scheduler = opensmile.Scheduler(smile, 2)
+
+    if multiprocessing:
+        with concurrent.futures.ProcessPoolExecutor(2) as executor:
+            y = scheduler.process_index(index, root=pytest.ROOT, executor=executor)
+    else:
+        y = scheduler.process_index(index, root=pytest.ROOT)
+
+    # order of results follows the index
+    pd.testing.assert_frame_equal(y, smile.process_index(index, root=pytest.ROOT))
+    # durations of files are rounded to nanoseconds
+    assert scheduler.durations.to_list() == pytest.approx(expected_durations, abs=1e-9)
+    assert sum(scheduler.loads) == pytest.approx(sum(expected_durations))
+    assert max(scheduler.loads) == pytest.approx(max(expected_durations))
+    assert scheduler.expected_makespan > 0
+    assert scheduler.actual_makespan > 0
+
+
+@pytest.mark.parametrize(
+    "index",
+    [
+        audformat.filewise_index(),
+        audformat.segmented_index(),
+    ],
+)
+def test_scheduler_empty(index):
+    smile = opensmile.Smile(
+        opensmile.FeatureSet.eGeMAPSv02,
+        opensmile.FeatureLevel.Functionals,
+    )
+    scheduler = opensmile.Scheduler(smile, 2)
+
+    y = scheduler.process_index(index, root=pytest.ROOT)
+
+    assert y.empty
+    assert y.columns.to_list() == list(smile.column_names)
+    assert y.index.names == ["file", "start", "end"]
+    assert (y.dtypes == smile.output_dtype).all()
+    assert scheduler.durations.empty
+    assert scheduler.loads == [0.0, 0.0]
+    assert scheduler.expected_makespan == 0.0
+    assert scheduler.actual_makespan == 0.0
+
+
+def test_scheduler_num_workers():
+    smile = opensmile.Smile(num_workers=3)
+    assert opensmile.Scheduler(smile).num_workers == 3
+    smile = opensmile.Smile(num_workers=None)
+    assert opensmile.Scheduler(smile).num_workers > 0
+
+
+@pytest.mark.parametrize(
+    "durations, num_workers, expected",
+    [
+        ([], 2, [0.0, 0.0]),
+        ([5, 4, 3, 3, 2], 2, [8.0, 9.0]),
+        ([5, 4, 3, 3, 2], 3, [5.0, 6.0, 6.0]),
+        ([0, 0], 1, [0.0]),
+    ],
+)
+def test_lpt(durations, num_workers, expected):
+    assert _lpt(durations, num_workers) == expected
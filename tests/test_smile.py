@@ -1,12 +1,17 @@
 import os
+import shutil
+import threading
 
 import numpy as np
 import pandas as pd
 import pytest
 
 import audeer
+import audformat
+import audinterface
 import audiofile
 import audobject
+import audresample
 
 import opensmile
 
@@ -30,6 +35,16 @@ gemaps_family = [  # no deltas
 ]
 
 
+def segment(signal, sampling_rate):
+    return pd.MultiIndex.from_arrays(
+        [
+            pd.to_timedelta([0.0, 0.5], unit="s"),
+            pd.to_timedelta([1.0, 2.5], unit="s"),
+        ],
+        names=["start", "end"],
+    )
+
+
 @pytest.mark.parametrize(
     "x,sr,num_channels,feature_set,feature_level",
     [
@@ -232,6 +247,51 @@ def test_files(num_files, feature_set, feature_level, num_workers, multiprocessi
     np.testing.assert_equal(np.concatenate([y_file] * num_files), y_files.values)
 
 
+@pytest.mark.parametrize(
+    "starts, ends",
+    [
+        (None, None),
+        (0.5, 2),
+        (np.float32(0.5), np.int64(2)),
+        (pd.Timedelta(0.5, unit="s"), "2s"),
+        ([None, 1, 0.5, None, 2], [1, None, 2, 3, None]),
+    ],
+)
+@pytest.mark.parametrize(
+    "num_workers, prefetch, kwargs",
+    [
+        (1, 1, {}),
+        (3, 2, {"keep_nat": True}),
+        (None, 4, {"sampling_rate": 8000, "resample": True}),
+        # prefetch is ignored
+        (1, 1, {"segment": audinterface.Segment(process_func=segment)}),
+    ],
+)
+def test_files_prefetch(starts, ends, num_workers, prefetch, kwargs):
+    fex = opensmile.Smile(
+        opensmile.FeatureSet.eGeMAPSv02,
+        opensmile.FeatureLevel.Functionals,
+        num_workers=num_workers,
+        **kwargs,
+    )
+    files = [pytest.WAV_FILE] * 5
+    y = fex.process_files(files, starts=starts, ends=ends)
+    y_prefetch = fex.process_files(files, starts=starts, ends=ends, prefetch=prefetch)
+    pd.testing.assert_frame_equal(y_prefetch, y)
+
+
+def test_files_prefetch_errors(tmpdir):
+    fex = opensmile.Smile()
+    with pytest.raises(ValueError, match="prefetch"):
+        fex.process_files([pytest.WAV_FILE], prefetch=0)
+    # errors of files are raised
+    files = [pytest.WAV_FILE, os.path.join(tmpdir, "missing.wav"), pytest.WAV_FILE]
+    with pytest.raises(RuntimeError):
+        fex.process_files(files)
+    with pytest.raises(RuntimeError):
+        fex.process_files(files, prefetch=1)
+
+
 @pytest.mark.parametrize(
     "feature_set,feature_level",
     [
@@ -296,6 +356,268 @@ def test_index(feature_set, feature_level, index, num_workers, multiprocessing):
     pd.testing.assert_frame_equal(y, y_files)
 
 
+@pytest.mark.parametrize(
+    "feature_set,feature_level",
+    [
+        (
+            pytest.CONFIG_FILE,
+            opensmile.FeatureLevel.LowLevelDescriptors,
+        ),
+        (
+            opensmile.FeatureSet.eGeMAPSv02,
+            opensmile.FeatureLevel.Functionals,
+        ),
+    ],
+)
+@pytest.mark.parametrize(
+    "index",
+    [
+        pd.MultiIndex.from_arrays(
+            [
+                [pytest.WAV_FILE, pytest.WAV_FILE, "test.wav", pytest.WAV_FILE],
+                pd.to_timedelta([0, 0.5, 1.2, 3.1], unit="s"),
+                pd.to_timedelta([1, None, 3.3, 4.25], unit="s"),
+            ],
+            names=["file", "start", "end"],
+        ),
+        pd.Index([pytest.WAV_FILE, "test.wav"], name="file"),
+    ],
+)
+@pytest.mark.parametrize(
+    "num_workers, multiprocessing",
+    [(1, False), (3, True)],
+)
+@pytest.mark.parametrize(
+    "segment",
+    [
+        None,
+        audinterface.Segment(process_func=segment),
+    ],
+)
+def test_index_memmap(
+    tmpdir,
+    feature_set,
+    feature_level,
+    index,
+    num_workers,
+    multiprocessing,
+    segment,
+):
+    fex = opensmile.Smile(
+        feature_set,
+        feature_level,
+        segment=segment,
+        num_workers=num_workers,
+        multiprocessing=multiprocessing,
+    )
+    memmap_root = os.path.join(tmpdir, "memmap")
+    preserve_index = feature_level == opensmile.FeatureLevel.Functionals
+    cache_root = os.path.join(tmpdir, "cache")
+
+    y = fex.process_index(index, preserve_index=preserve_index, root=pytest.ROOT)
+    for _ in range(2):
+        y_memmap = fex.process_index(
+            index,
+            preserve_index=preserve_index,
+            root=pytest.ROOT,
+            cache_root=cache_root,
+            memmap_root=memmap_root,
+        )
+        pd.testing.assert_frame_equal(y, y_memmap)
+        if segment is None:
+            # temporary folder with memory-mapped signals was removed
+            assert os.listdir(memmap_root) == []
+            assert len(os.listdir(cache_root)) == 1
+
+
+@pytest.mark.parametrize(
+    "index",
+    [
+        pd.MultiIndex.from_arrays(
+            [
+                [pytest.WAV_FILE, pytest.WAV_FILE, "test.wav", pytest.WAV_FILE],
+                pd.to_timedelta([0, 0.5, 1.2, 3.1], unit="s"),
+                pd.to_timedelta([1, None, 3.3, 4.25], unit="s"),
+            ],
+            names=["file", "start", "end"],
+        ),
+        pd.Index([pytest.WAV_FILE, "test.wav"], name="file"),
+    ],
+)
+@pytest.mark.parametrize(
+    "segment",
+    [
+        None,
+        audinterface.Segment(process_func=segment),
+    ],
+)
+def test_index_lld(tmpdir, index, segment):
+    fex = opensmile.Smile(
+        opensmile.FeatureSet.eGeMAPSv02,
+        opensmile.FeatureLevel.Functionals,
+        segment=segment,
+    )
+    lld_root = os.path.join(tmpdir, "lld")
+    cache_root = os.path.join(tmpdir, "cache")
+
+    y = fex.process_index(index, root=pytest.ROOT, cache_root=cache_root)
+    if segment is not None:
+        # low-level descriptors are not used
+        y_lld = fex.process_index(
+            index,
+            root=pytest.ROOT,
+            cache_root=cache_root,
+            lld_root=lld_root,
+        )
+        pd.testing.assert_frame_equal(y, y_lld)
+        return
+
+    # unsupported functionals are not returned
+    with pytest.warns(UserWarning, match="equivalentSoundLevel_dBp"):
+        y_lld = fex.process_index(
+            index,
+            root=pytest.ROOT,
+            cache_root=cache_root,
+            lld_root=lld_root,
+        )
+    pd.testing.assert_index_equal(y.index, y_lld.index)
+    pd.testing.assert_index_equal(
+        y.columns.drop("equivalentSoundLevel_dBp"),
+        y_lld.columns,
+    )
+    assert all(y_lld.dtypes == np.float32)
+    assert not y_lld.isna().all().any()
+    np.testing.assert_allclose(
+        y_lld["loudness_sma3_amean"],
+        y["loudness_sma3_amean"],
+        rtol=0.05,
+    )
+    # low-level descriptors are stored once per file
+    assert len(os.listdir(lld_root)) == 1
+    # cached separately from extracted functionals
+    pd.testing.assert_frame_equal(
+        fex.process_index(
+            index,
+            root=pytest.ROOT,
+            cache_root=cache_root,
+            lld_root=lld_root,
+        ),
+        y_lld,
+    )
+    assert len(os.listdir(cache_root)) == 2
+
+    # new segmentation reuses stored low-level descriptors
+    index = audformat.segmented_index(
+        [pytest.WAV_FILE],
+        [pd.Timedelta(2, unit="s")],
+        [pd.Timedelta(4, unit="s")],
+    )
+    with pytest.warns(UserWarning, match="equivalentSoundLevel_dBp"):
+        y_lld = fex.process_index(index, lld_root=lld_root)
+    assert len(os.listdir(lld_root)) == 1
+    np.testing.assert_allclose(
+        y_lld["loudness_sma3_amean"],
+        fex.process_index(index)["loudness_sma3_amean"],
+        rtol=0.05,
+    )
+
+
+@pytest.mark.parametrize(
+    "feature_set,feature_level,win_dur",
+    [
+        (
+            opensmile.FeatureSet.eGeMAPSv02,
+            opensmile.FeatureLevel.LowLevelDescriptors,
+            None,
+        ),
+        (
+            opensmile.FeatureSet.eGeMAPSv02,
+            opensmile.FeatureLevel.Functionals,
+            1.0,
+        ),
+        (
+            opensmile.FeatureSet.ComParE_2016,
+            opensmile.FeatureLevel.Functionals,
+            None,
+        ),
+    ],
+)
+def test_index_lld_errors(tmpdir, feature_set, feature_level, win_dur):
+    fex = opensmile.Smile(feature_set, feature_level, win_dur=win_dur)
+    index = pd.Index([pytest.WAV_FILE], name="file")
+    with pytest.raises(ValueError, match="lld_root"):
+        fex.process_index(index, lld_root=tmpdir)
+
+
+@pytest.mark.parametrize(
+    "feature_level",
+    [
+        opensmile.FeatureLevel.LowLevelDescriptors,
+        opensmile.FeatureLevel.Functionals,
+    ],
+)
+@pytest.mark.parametrize(
+    "deduplicate, memmap, expected_segments",
+    [
+        (None, False, 6),
+        ("segments", False, 5),
+        ("files", False, 3),
+        ("files", True, 3),
+    ],
+)
+def test_index_deduplicate(
+    tmpdir,
+    monkeypatch,
+    feature_level,
+    deduplicate,
+    memmap,
+    expected_segments,
+):
+    copy = os.path.join(tmpdir, "copy.wav")
+    shutil.copy(pytest.WAV_FILE, copy)
+    index = pd.MultiIndex.from_arrays(
+        [
+            ["test.wav", "test.wav", copy, "test.wav", copy, "test.wav"],
+            pd.to_timedelta([0, 1, 0, 0, 1, 2], unit="s"),
+            pd.to_timedelta([1, None, 1, 1, None, 3], unit="s"),
+        ],
+        names=["file", "start", "end"],
+    )
+    fex = opensmile.Smile(opensmile.FeatureSet.eGeMAPSv02, feature_level)
+    memmap_root = os.path.join(tmpdir, "memmap") if memmap else None
+    y = fex.process_index(index, root=pytest.ROOT, deduplicate=None)
+
+    segments = []
+    process_index = fex.process.process_index
+    process_memmap = fex._process_memmap
+
+    def count_index(index, **kwargs):
+        segments.extend(index)
+        return process_index(index, **kwargs)
+
+    def count_memmap(path, sampling_rate, file, start, end, **kwargs):
+        segments.append((file, start, end))
+        return process_memmap(path, sampling_rate, file, start, end, **kwargs)
+
+    monkeypatch.setattr(fex.process, "process_index", count_index)
+    monkeypatch.setattr(fex, "_process_memmap", count_memmap)
+    y_dedup = fex.process_index(
+        index,
+        root=pytest.ROOT,
+        memmap_root=memmap_root,
+        deduplicate=deduplicate,
+    )
+    pd.testing.assert_frame_equal(y_dedup, y)
+    assert len(segments) == expected_segments
+
+
+def test_index_deduplicate_errors():
+    fex = opensmile.Smile()
+    index = pd.Index([pytest.WAV_FILE], name="file")
+    with pytest.raises(ValueError, match="deduplicate"):
+        fex.process_index(index, deduplicate="content")
+
+
 @pytest.mark.parametrize(
     "file,feature_set,feature_level",
     [
@@ -334,3 +656,726 @@ def test_signal(file, feature_set, feature_level):
     np.testing.assert_equal(y.values, y_file.values)
     np.testing.assert_equal(y.values.squeeze(), y_call.squeeze().T)
     assert all(y_empty.isna())
+
+
+@pytest.mark.parametrize("dtype", ["float32", "float64", "int16"])
+def test_signal_dtype(dtype):
+    fex = opensmile.Smile(
+        pytest.CONFIG_FILE,
+        opensmile.FeatureLevel.LowLevelDescriptors,
+    )
+    if dtype == "int16":
+        # 16 bit PCM is passed without conversion
+        x, _ = audiofile.read(pytest.WAV_FILE, always_2d=True, dtype=dtype)
+        x.flags.writeable = False
+    else:
+        x = pytest.WAV_ARRAY.astype(dtype)
+    x_org = x.copy()
+    y = fex.process_signal(x, pytest.WAV_SR)
+    y_expected = fex.process_signal(pytest.WAV_ARRAY, pytest.WAV_SR)
+    pd.testing.assert_frame_equal(y, y_expected)
+    # input signal is not modified
+    np.testing.assert_equal(x, x_org)
+
+
+@pytest.mark.parametrize(
+    "sampling_rate, channels, mixdown, resample",
+    [
+        (None, [0, 1], True, False),
+        (8000, [0, 1], False, True),
+        (8000, [0, 1], True, True),
+    ],
+)
+def test_signal_int16_remix(sampling_rate, channels, mixdown, resample):
+    fex = opensmile.Smile(
+        opensmile.FeatureSet.eGeMAPSv02,
+        opensmile.FeatureLevel.Functionals,
+        sampling_rate=sampling_rate,
+        channels=channels,
+        mixdown=mixdown,
+        resample=resample,
+    )
+    x = np.concatenate([pytest.WAV_ARRAY, pytest.WAV_ARRAY[:, ::-1]])
+    pcm = (x * 32768).astype(np.int16)
+    pd.testing.assert_frame_equal(
+        fex.process_signal(pcm, pytest.WAV_SR),
+        fex.process_signal(x, pytest.WAV_SR),
+    )
+    np.testing.assert_equal(
+        fex(pcm, pytest.WAV_SR),
+        fex(x, pytest.WAV_SR),
+    )
+
+
+@pytest.mark.parametrize("buffer_dur", [None, 0.5])
+def test_signal_int16_channels(buffer_dur):
+    fex = opensmile.Smile(
+        opensmile.FeatureSet.eGeMAPSv02,
+        opensmile.FeatureLevel.LowLevelDescriptors,
+        channels=[0, 1],
+        buffer_dur=buffer_dur,
+    )
+    x = np.concatenate([pytest.WAV_ARRAY, pytest.WAV_ARRAY[:, ::-1]])
+    # channels are not contiguous in memory
+    pcm = np.asfortranarray((x * 32768).astype(np.int16))
+    pd.testing.assert_frame_equal(
+        fex.process_signal(pcm, pytest.WAV_SR),
+        fex.process_signal(x, pytest.WAV_SR),
+    )
+
+
+@pytest.mark.parametrize(
+    "win_dur, hop_dur, expected_hop_dur",
+    [
+        (1.0, 0.5, 0.5),
+        (1.0, None, 0.5),
+        (2.0, 1.0, 1.0),
+    ],
+)
+def test_window(win_dur, hop_dur, expected_hop_dur):
+    # create feature extractors
+
+    fex = opensmile.Smile(
+        opensmile.FeatureSet.eGeMAPSv02,
+        opensmile.FeatureLevel.Functionals,
+        win_dur=win_dur,
+        hop_dur=hop_dur,
+    )
+    fex = audobject.from_yaml_s(fex.to_yaml_s())
+    assert isinstance(fex, opensmile.Smile)
+    assert fex.win_dur == win_dur
+    assert fex.hop_dur == expected_hop_dur
+
+    fex_lld = opensmile.Smile(
+        opensmile.FeatureSet.eGeMAPSv02,
+        opensmile.FeatureLevel.LowLevelDescriptors,
+    )
+
+    # extract functionals over sliding window and LLDs
+
+    y = fex.process_file(pytest.WAV_FILE)
+    y_lld = fex_lld.process_file(pytest.WAV_FILE)
+
+    # assertions
+
+    assert fex.feature_names == y.columns.to_list()
+    starts = y.index.get_level_values("start")
+    np.testing.assert_equal(
+        np.diff(starts.total_seconds()),
+        expected_hop_dur,
+    )
+
+    # functionals of a window are computed from the LLDs
+    # of the whole signal, i.e. LLDs are not re-computed per window
+    frames_per_win = int(round(win_dur / 0.01))
+    frames_per_hop = int(round(expected_hop_dur / 0.01))
+    loudness = y_lld["Loudness_sma3"].values
+    for idx, mean in enumerate(y["loudness_sma3_amean"].values):
+        offset = idx * frames_per_hop
+        np.testing.assert_allclose(
+            mean,
+            loudness[offset : offset + frames_per_win].mean(),
+            rtol=1e-5,
+        )
+
+
+@pytest.mark.parametrize(
+    "feature_level, win_dur, hop_dur",
+    [
+        (opensmile.FeatureLevel.Functionals, None, 0.5),
+        (opensmile.FeatureLevel.LowLevelDescriptors, 1.0, 0.5),
+        (opensmile.FeatureLevel.LowLevelDescriptors_Deltas, 1.0, None),
+    ],
+)
+def test_window_errors(feature_level, win_dur, hop_dur):
+    with pytest.raises(ValueError):
+        opensmile.Smile(
+            opensmile.FeatureSet.ComParE_2016,
+            feature_level,
+            win_dur=win_dur,
+            hop_dur=hop_dur,
+        )
+
+
+@pytest.mark.parametrize("feature_set", list(opensmile.FeatureSet))
+def test_window_feature_sets(feature_set):
+    # configs without 'frameModeFunctionalsConf'
+    # would silently ignore the sliding window
+    if feature_set in [
+        opensmile.FeatureSet.emobase,
+        opensmile.FeatureSet.IS10,
+        opensmile.FeatureSet.IS11,
+        opensmile.FeatureSet.IS12,
+    ]:
+        with pytest.raises(ValueError, match="frameModeFunctionalsConf"):
+            opensmile.Smile(
+                feature_set,
+                opensmile.FeatureLevel.Functionals,
+                win_dur=1.0,
+            )
+    else:
+        fex = opensmile.Smile(
+            feature_set,
+            opensmile.FeatureLevel.Functionals,
+            win_dur=1.0,
+            hop_dur=1.0,
+        )
+        y = fex.process_signal(np.zeros(4 * 16000), 16000)
+        starts = y.index.get_level_values("start").total_seconds()
+        assert starts.to_list() == [0.0, 1.0, 2.0]
+
+
+@pytest.mark.parametrize(
+    "feature_set,feature_level",
+    [
+        (opensmile.FeatureSet.eGeMAPSv02, opensmile.FeatureLevel.Functionals),
+        (opensmile.FeatureSet.ComParE_2016, opensmile.FeatureLevel.LowLevelDescriptors),
+    ],
+)
+@pytest.mark.parametrize("buffer_dur", [0.01, 0.5, 10.0])
+@pytest.mark.parametrize("reuse_engine", [False, True])
+def test_buffer(feature_set, feature_level, buffer_dur, reuse_engine):
+    signal = pytest.WAV_ARRAY
+
+    fex = opensmile.Smile(feature_set, feature_level)
+    fex_buffer = opensmile.Smile(
+        feature_set,
+        feature_level,
+        buffer_dur=buffer_dur,
+        reuse_engine=reuse_engine,
+    )
+    assert fex_buffer.buffer_dur == buffer_dur
+    assert fex.to_yaml_s() == fex_buffer.to_yaml_s()
+
+    y = fex.process_signal(signal, pytest.WAV_SR)
+    for _ in range(2):
+        y_buffer = fex_buffer.process_signal(signal, pytest.WAV_SR)
+        pd.testing.assert_frame_equal(y, y_buffer)
+
+
+@pytest.mark.parametrize("reuse_engine", [False, True])
+def test_buffer_errors(reuse_engine):
+    # functionals of test config need the whole input,
+    # but low-level descriptors are stored in a ring buffer
+    fex = opensmile.Smile(
+        pytest.CONFIG_FILE,
+        "func",
+        buffer_dur=0.01,
+        reuse_engine=reuse_engine,
+    )
+    with pytest.raises(RuntimeError, match="Input buffer"):
+        fex.process_signal(pytest.WAV_ARRAY, pytest.WAV_SR)
+
+
+@pytest.mark.parametrize(
+    "feature_set,feature_level,win_dur",
+    [
+        (
+            opensmile.FeatureSet.eGeMAPSv02,
+            opensmile.FeatureLevel.LowLevelDescriptors,
+            None,
+        ),
+        (
+            opensmile.FeatureSet.ComParE_2016,
+            opensmile.FeatureLevel.LowLevelDescriptors_Deltas,
+            None,
+        ),
+        (opensmile.FeatureSet.eGeMAPSv02, opensmile.FeatureLevel.Functionals, None),
+        (opensmile.FeatureSet.eGeMAPSv02, opensmile.FeatureLevel.Functionals, 1.0),
+        (opensmile.FeatureSet.ComParE_2016, opensmile.FeatureLevel.Functionals, 2.0),
+    ],
+)
+@pytest.mark.parametrize("memory_profile", ["balanced", "low"])
+def test_memory_profile(feature_set, feature_level, win_dur, memory_profile):
+    signal = pytest.WAV_ARRAY
+
+    fex = opensmile.Smile(feature_set, feature_level, win_dur=win_dur)
+    fex_profile = opensmile.Smile(
+        feature_set,
+        feature_level,
+        win_dur=win_dur,
+        memory_profile=memory_profile,
+    )
+    assert fex.memory_profile == "throughput"
+    assert fex_profile.memory_profile == memory_profile
+    assert fex_profile.buffer_dur == 1.0
+    assert fex.to_yaml_s() == fex_profile.to_yaml_s()
+
+    pd.testing.assert_frame_equal(
+        fex.process_signal(signal, pytest.WAV_SR),
+        fex_profile.process_signal(signal, pytest.WAV_SR),
+    )
+
+
+def test_memory_profile_errors():
+    with pytest.raises(ValueError, match="memory_profile"):
+        opensmile.Smile(memory_profile="high")
+
+
+@pytest.mark.parametrize(
+    "feature_level",
+    [
+        opensmile.FeatureLevel.LowLevelDescriptors,
+        opensmile.FeatureLevel.Functionals,
+    ],
+)
+@pytest.mark.parametrize("output_dtype", ["float32", "float16"])
+def test_output_dtype(tmpdir, feature_level, output_dtype):
+    fex = opensmile.Smile(opensmile.FeatureSet.eGeMAPSv02, feature_level)
+    fex_dtype = opensmile.Smile(
+        opensmile.FeatureSet.eGeMAPSv02,
+        feature_level,
+        output_dtype=output_dtype,
+    )
+    assert fex_dtype.output_dtype == output_dtype
+    # output data type changes the features,
+    # so it is serialized
+    fex_yaml = audobject.from_yaml_s(fex_dtype.to_yaml_s())
+    assert fex_yaml.output_dtype == output_dtype
+    assert (fex_dtype.to_yaml_s() == fex.to_yaml_s()) == (output_dtype == "float32")
+
+    y = fex.process_signal(pytest.WAV_ARRAY, pytest.WAV_SR)
+    y_dtype = fex_dtype.process_signal(pytest.WAV_ARRAY, pytest.WAV_SR)
+    assert (y_dtype.dtypes == output_dtype).all()
+    pd.testing.assert_frame_equal(y_dtype, y.astype(output_dtype))
+
+    values, _, _ = fex_dtype.process_array(pytest.WAV_ARRAY, pytest.WAV_SR)
+    assert values.dtype == output_dtype
+    y_empty = fex_dtype.process_signals([], pytest.WAV_SR)
+    assert (y_empty.dtypes == output_dtype).all()
+    with pytest.warns(UserWarning):
+        values, _, _ = fex_dtype.process_array(np.zeros(10), pytest.WAV_SR)
+    assert values.dtype == output_dtype
+
+    if feature_level == opensmile.FeatureLevel.Functionals:
+        # functionals from low-level descriptors with full precision
+        index = audformat.segmented_index([pytest.WAV_FILE], [0], [2])
+        with pytest.warns(UserWarning, match="equivalentSoundLevel_dBp"):
+            y_lld = fex_dtype.process_index(
+                index,
+                lld_root=os.path.join(tmpdir, "lld"),
+            )
+        assert (y_lld.dtypes == output_dtype).all()
+
+
+def test_output_dtype_errors():
+    with pytest.raises(ValueError, match="output_dtype"):
+        opensmile.Smile(output_dtype="int16")
+
+
+@pytest.mark.parametrize(
+    "feature_set,feature_level",
+    [
+        (
+            opensmile.FeatureSet.eGeMAPSv02,
+            opensmile.FeatureLevel.LowLevelDescriptors,
+        ),
+        (
+            opensmile.FeatureSet.IS09,
+            opensmile.FeatureLevel.LowLevelDescriptors_Deltas,
+        ),
+    ],
+)
+@pytest.mark.parametrize(
+    "sampling_rate, chunk_dur, num_workers, buffer_dur",
+    [
+        (16000, 1.0, 3, None),
+        # chunks are at least as long as their context
+        (16000, 0.01, 1, 0.5),
+        (16000, 100.0, 3, None),
+        (8000, 1.33, None, None),
+        # frame step is not a multiple of the sample period
+        (22050, 1.0, 3, None),
+    ],
+)
+def test_chunk(
+    feature_set,
+    feature_level,
+    sampling_rate,
+    chunk_dur,
+    num_workers,
+    buffer_dur,
+):
+    signal = audresample.resample(pytest.WAV_ARRAY, pytest.WAV_SR, sampling_rate)
+    # two channels
+    signal = np.concatenate([signal, signal[:, ::-1]])
+    fex = opensmile.Smile(feature_set, feature_level, channels=[0, 1])
+    fex_chunk = opensmile.Smile(
+        feature_set,
+        feature_level,
+        channels=[0, 1],
+        chunk_dur=chunk_dur,
+        num_workers=num_workers,
+        buffer_dur=buffer_dur,
+    )
+    # frames of chunks are identical
+    # to the ones of the whole signal
+    pd.testing.assert_frame_equal(
+        fex_chunk.process_signal(signal, sampling_rate),
+        fex.process_signal(signal, sampling_rate),
+    )
+
+
+@pytest.mark.parametrize("multiprocessing", [False, True])
+def test_chunk_workers(monkeypatch, multiprocessing):
+    files = [pytest.WAV_FILE] * 4
+    fex = opensmile.Smile(
+        opensmile.FeatureSet.eGeMAPSv02,
+        opensmile.FeatureLevel.LowLevelDescriptors,
+    )
+    fex_chunk = opensmile.Smile(
+        opensmile.FeatureSet.eGeMAPSv02,
+        opensmile.FeatureLevel.LowLevelDescriptors,
+        chunk_dur=1.0,
+        num_workers=2,
+        multiprocessing=multiprocessing,
+    )
+
+    expected = fex.process_files(files)
+
+    threads = set()
+    extract_pcm = opensmile.Smile._extract_pcm
+
+    def record(self, *args):
+        threads.add(threading.current_thread().name)
+        return extract_pcm(self, *args)
+
+    if not multiprocessing:
+        monkeypatch.setattr(opensmile.Smile, "_extract_pcm", record)
+
+    pd.testing.assert_frame_equal(fex_chunk.process_files(files), expected)
+    if not multiprocessing:
+        # files and their chunks are processed in parallel,
+        # but all chunks by the same pool of two threads
+        assert len(threads) == 2
+        assert all(name.startswith("opensmile-chunk") for name in threads)
+        executor = opensmile.core.smile._chunk_executor(2)
+        fex_chunk.process_files(files)
+        assert opensmile.core.smile._chunk_executor(2) is executor
+
+
+@pytest.mark.parametrize(
+    "feature_set, pitch, approximated",
+    [
+        (
+            opensmile.FeatureSet.eGeMAPSv02,
+            "F0semitoneFrom27.5Hz_sma3nz",
+            ["jitterLocal_sma3nz", "shimmerLocaldB_sma3nz"],
+        ),
+        (
+            opensmile.FeatureSet.IS09,
+            "F0_sma",
+            ["F0_sma"],
+        ),
+    ],
+)
+@pytest.mark.parametrize("chunk_dur", [1.0, 5.0])
+def test_chunk_voiced(feature_set, pitch, approximated, chunk_dur):
+    # 30 s harmonic tone with a pitch sweep from 60 Hz to 180 Hz,
+    # which is gated to voiced segments of 1.5 s and 6 s
+    sampling_rate = 16000
+    t = np.arange(30 * sampling_rate) / sampling_rate
+    f0 = 120 - 60 * np.cos(2 * np.pi * t / 7.3)
+    phase = 2 * np.pi * np.cumsum(f0) / sampling_rate
+    tone = sum(np.sin(k * phase) / k for k in range(1, 11))
+    gate = np.where(t < 15, t % 3 < 1.5, t % 8 < 6)
+    noise = np.random.default_rng(1).standard_normal(t.size)
+    signal = (0.3 * tone * gate + 0.001 * noise).astype(np.float32)
+
+    fex = opensmile.Smile(feature_set, opensmile.FeatureLevel.LowLevelDescriptors)
+    fex_chunk = opensmile.Smile(
+        feature_set,
+        opensmile.FeatureLevel.LowLevelDescriptors,
+        chunk_dur=chunk_dur,
+    )
+    # chunk duration changes the features,
+    # so it is serialized
+    assert audobject.from_yaml_s(fex_chunk.to_yaml_s()).chunk_dur == chunk_dur
+    expected = fex.process_signal(signal, sampling_rate)
+    y = fex_chunk.process_signal(signal, sampling_rate)
+
+    # other low-level descriptors are identical
+    pd.testing.assert_frame_equal(
+        y.drop(columns=approximated),
+        expected.drop(columns=approximated),
+    )
+
+    # approximated ones deviate only
+    # in the first voiced segment of a chunk
+    voiced = expected[pitch].values > 0
+    segments = np.cumsum(np.diff(voiced, prepend=False))
+    allowed = np.zeros(len(voiced), dtype=bool)
+    for begin, _, skip, _ in fex_chunk._chunks(signal.size, sampling_rate)[1:]:
+        frame = begin // (sampling_rate // 100) + skip
+        if voiced[frame:].any():
+            first = frame + np.argmax(voiced[frame:])
+            allowed |= segments == segments[first]
+    deviates = (y[approximated].values != expected[approximated].values).any(axis=1)
+    assert not (deviates & ~allowed).any()
+
+
+@pytest.mark.parametrize(
+    "feature_set,feature_level,chunk_dur",
+    [
+        (
+            opensmile.FeatureSet.eGeMAPSv02,
+            opensmile.FeatureLevel.LowLevelDescriptors,
+            0,
+        ),
+        (
+            opensmile.FeatureSet.eGeMAPSv02,
+            opensmile.FeatureLevel.Functionals,
+            1.0,
+        ),
+        (
+            opensmile.FeatureSet.ComParE_2016,
+            opensmile.FeatureLevel.LowLevelDescriptors,
+            1.0,
+        ),
+        (
+            pytest.CONFIG_FILE,
+            opensmile.FeatureLevel.LowLevelDescriptors,
+            1.0,
+        ),
+    ],
+)
+def test_chunk_errors(feature_set, feature_level, chunk_dur):
+    with pytest.raises(ValueError, match="chunk_dur"):
+        opensmile.Smile(feature_set, feature_level, chunk_dur=chunk_dur)
+
+
+@pytest.mark.parametrize(
+    "feature_set,feature_level",
+    [
+        (pytest.CONFIG_FILE, opensmile.FeatureLevel.LowLevelDescriptors),
+        (opensmile.FeatureSet.eGeMAPSv02, opensmile.FeatureLevel.Functionals),
+    ],
+)
+@pytest.mark.parametrize(
+    "num_workers, multiprocessing",
+    [(1, False), (3, False), (3, True)],
+)
+def test_reuse_engine(
+    tmpdir,
+    feature_set,
+    feature_level,
+    num_workers,
+    multiprocessing,
+):
+    # create files with different sampling rates and durations
+
+    files = []
+    for idx, (sampling_rate, duration) in enumerate(
+        [(16000, 0.5), (pytest.WAV_SR, 1.0), (16000, 1.5), (8000, 0.2)]
+    ):
+        file = os.path.join(tmpdir, f"{idx}.wav")
+        signal = audresample.resample(pytest.WAV_ARRAY, pytest.WAV_SR, sampling_rate)
+        audiofile.write(file, signal[:, : int(duration * sampling_rate)], sampling_rate)
+        files.append(file)
+    files *= 2
+
+    # create feature extractors
+
+    fex = opensmile.Smile(
+        feature_set,
+        feature_level,
+        num_workers=num_workers,
+        multiprocessing=multiprocessing,
+    )
+    fex_reuse = opensmile.Smile(
+        feature_set,
+        feature_level,
+        num_workers=num_workers,
+        multiprocessing=multiprocessing,
+        reuse_engine=True,
+    )
+    fex_reuse = audobject.from_yaml_s(
+        fex_reuse.to_yaml_s(),
+        override_args={
+            "num_workers": num_workers,
+            "multiprocessing": multiprocessing,
+            "reuse_engine": True,
+        },
+    )
+    assert fex_reuse.reuse_engine
+    assert fex.to_yaml_s() == fex_reuse.to_yaml_s()
+
+    # extract features
+
+    opensmile.core.smile._engines.cache = {}
+    y = fex.process_files(files)
+    y_reuse = fex_reuse.process_files(files)
+
+    # assertions
+
+    pd.testing.assert_frame_equal(y, y_reuse)
+    if num_workers == 1:
+        # one engine per sampling rate was created in current thread
+        engines = opensmile.core.smile._engines.cache
+        keys = [key for key in engines if key[0] == fex_reuse.config_path]
+        assert len(keys) == 3
+
+
+@pytest.mark.parametrize("buffer_dur", [None, 1.0])
+def test_reuse_engine_error(monkeypatch, buffer_dur):
+    fex = opensmile.Smile(
+        opensmile.FeatureSet.eGeMAPSv02,
+        opensmile.FeatureLevel.Functionals,
+        buffer_dur=buffer_dur,
+        reuse_engine=True,
+    )
+    opensmile.core.smile._engines.cache = {}
+    expected = fex.process_signal(pytest.WAV_ARRAY, pytest.WAV_SR)
+    (engine,) = opensmile.core.smile._engines.cache.values()
+
+    # fail after input was written to the engine
+    def run(self):
+        raise RuntimeError("run failed")
+
+    with monkeypatch.context() as m:
+        m.setattr(opensmile.core.lib.OpenSMILE, "run", run)
+        with pytest.raises(RuntimeError, match="run failed"):
+            fex.process_signal(pytest.WAV_ARRAY, pytest.WAV_SR)
+
+    # engine was freed and is not reused
+    assert engine._smileobj is None
+    assert not opensmile.core.smile._engines.cache
+    pd.testing.assert_frame_equal(
+        fex.process_signal(pytest.WAV_ARRAY, pytest.WAV_SR),
+        expected,
+    )
+
+
+@pytest.mark.parametrize(
+    "feature_set,feature_level,win_dur",
+    [
+        (pytest.CONFIG_FILE, opensmile.FeatureLevel.LowLevelDescriptors, None),
+        (opensmile.FeatureSet.eGeMAPSv02, opensmile.FeatureLevel.Functionals, None),
+        (opensmile.FeatureSet.eGeMAPSv02, opensmile.FeatureLevel.Functionals, 1.0),
+    ],
+)
+@pytest.mark.parametrize(
+    "channels,mixdown,sampling_rate",
+    [(0, False, None), ([0, 0], False, None), ([0, 0], True, 8000)],
+)
+def test_process_array(
+    monkeypatch,
+    feature_set,
+    feature_level,
+    win_dur,
+    channels,
+    mixdown,
+    sampling_rate,
+):
+    signals = [
+        pytest.WAV_ARRAY[:, : int(duration * pytest.WAV_SR)]
+        for duration in [0.01, 0.33, 2.0]
+    ]
+    fex = opensmile.Smile(
+        feature_set,
+        feature_level,
+        win_dur=win_dur,
+        channels=channels,
+        mixdown=mixdown,
+        sampling_rate=sampling_rate,
+        resample=sampling_rate is not None,
+    )
+    expected = [fex.process_signal(signal, pytest.WAV_SR) for signal in signals]
+
+    # no pandas objects are created
+    def fail(*args, **kwargs):
+        raise AssertionError("pandas object created")
+
+    with monkeypatch.context() as m:
+        m.setattr(pd.DataFrame, "__init__", fail)
+        m.setattr(pd.Series, "__init__", fail)
+        m.setattr(pd, "to_timedelta", fail)
+        ys = [fex.process_array(signal, pytest.WAV_SR) for signal in signals]
+        ys_batch = fex.process_arrays(signals, pytest.WAV_SR)
+
+    assert fex.process_arrays([], pytest.WAV_SR) == []
+    for y, y_batch, df in zip(ys, ys_batch, expected):
+        values, starts, ends = y
+        assert values.dtype == np.float32
+        assert starts.dtype == np.int64
+        assert ends.dtype == np.int64
+        np.testing.assert_equal(values, df.values)
+        np.testing.assert_equal(
+            starts,
+            df.index.get_level_values("start")
+            .to_numpy("timedelta64[ns]")
+            .view("int64"),
+        )
+        np.testing.assert_equal(
+            ends,
+            df.index.get_level_values("end").to_numpy("timedelta64[ns]").view("int64"),
+        )
+        for x, x_batch in zip(y, y_batch):
+            np.testing.assert_equal(x, x_batch)
+
+
+def test_process_array_errors():
+    fex = opensmile.Smile(segment=audinterface.Segment(process_func=lambda x, sr: None))
+    with pytest.raises(ValueError, match="segmentation"):
+        fex.process_array(pytest.WAV_ARRAY, pytest.WAV_SR)
+
+
+@pytest.mark.parametrize(
+    "feature_set,feature_level",
+    [
+        (pytest.CONFIG_FILE, opensmile.FeatureLevel.LowLevelDescriptors),
+        (opensmile.FeatureSet.eGeMAPSv02, opensmile.FeatureLevel.Functionals),
+    ],
+)
+@pytest.mark.parametrize("num_signals", [0, 5])
+@pytest.mark.parametrize(
+    "num_workers, multiprocessing",
+    [(1, False), (3, False)],
+)
+@pytest.mark.parametrize(
+    "segment",
+    [
+        None,
+        audinterface.Segment(
+            process_func=lambda x, sr: pd.MultiIndex.from_arrays(
+                [
+                    pd.to_timedelta([0.0, 0.1], unit="s"),
+                    pd.to_timedelta([0.2, 0.3], unit="s"),
+                ],
+                names=["start", "end"],
+            ),
+        ),
+    ],
+)
+def test_process_signals(
+    feature_set,
+    feature_level,
+    num_signals,
+    num_workers,
+    multiprocessing,
+    segment,
+):
+    signals = [
+        pytest.WAV_ARRAY[:, : int((idx + 1) * 0.3 * pytest.WAV_SR)]
+        for idx in range(num_signals)
+    ]
+    fex = opensmile.Smile(
+        feature_set,
+        feature_level,
+        segment=segment,
+        num_workers=num_workers,
+        multiprocessing=multiprocessing,
+        reuse_engine=True,
+    )
+    y = fex.process_signals(signals, pytest.WAV_SR)
+
+    assert y.index.names == ["signal", "start", "end"]
+    assert list(y.columns) == list(fex.column_names)
+    assert y.index.get_level_values("signal").unique().tolist() == list(
+        range(num_signals)
+    )
+    for idx, signal in enumerate(signals):
+        pd.testing.assert_frame_equal(
+            y.loc[idx],
+            fex.process_signal(signal, pytest.WAV_SR),
+        )
@@ -0,0 +1,152 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import audformat
+import audiofile
+
+import opensmile
+
+
+@pytest.fixture(scope="module")
+def files(tmpdir_factory):
+    root = str(tmpdir_factory.mktemp("wav"))
+    files = []
+    for idx in range(3):
+        file = f"{idx}.wav"
+        signal = pytest.WAV_ARRAY[:, : pytest.WAV_SR * (idx + 1)]
+        audiofile.write(os.path.join(root, file), signal, pytest.WAV_SR)
+        files.append(file)
+    return root, files
+
+
+@pytest.mark.parametrize(
+    "feature_level, output_dtype, keep_nat",
+    [
+        (opensmile.FeatureLevel.LowLevelDescriptors, "float32", False),
+        (opensmile.FeatureLevel.LowLevelDescriptors, "float16", True),
+        (opensmile.FeatureLevel.Functionals, "float32", False),
+    ],
+)
+@pytest.mark.parametrize(
+    "segments",
+    [
+        None,
+        # segments of a file are not next to each other
+        [(0, 0, 1), (1, 0, None), (0, 0.5, 1), (2, 1, 2), (0, 0, 1)],
+    ],
+)
+@pytest.mark.parametrize("batch_size", [1, 100])
+def test_feature_store(
+    tmpdir,
+    files,
+    feature_level,
+    output_dtype,
+    keep_nat,
+    segments,
+    batch_size,
+):
+    root, files = files
+    smile = opensmile.Smile(
+        opensmile.FeatureSet.eGeMAPSv02,
+        feature_level,
+        output_dtype=output_dtype,
+        keep_nat=keep_nat,
+    )
+    if segments is None:
+        index = audformat.filewise_index(files)
+    else:
+        index = audformat.segmented_index(
+            [files[idx] for idx, _, _ in segments],
+            [start for _, start, _ in segments],
+            [end for _, _, end in segments],
+        )
+    store_root = os.path.join(tmpdir, "store")
+
+    store = opensmile.FeatureStore.create(
+        smile,
+        index,
+        store_root,
+        root=root,
+        batch_size=batch_size,
+    )
+    assert store.store_root == store_root
+    assert store.params == smile.to_yaml_s()
+    assert store.columns == smile.feature_names
+    assert len(store) == len(index)
+    assert store.values.dtype == output_dtype
+
+    # segments are grouped by file
+    assert list(store.index.get_level_values("file").unique()) == list(
+        index.get_level_values("file").unique()
+    )
+    pd.testing.assert_index_equal(
+        store.index.sort_values(),
+        audformat.utils.to_segmented_index(
+            index,
+            allow_nat=keep_nat,
+            root=root,
+        ).sort_values(),
+    )
+
+    # features are identical to the ones of the index
+    expected = smile.process_index(store.index, root=root, deduplicate=None)
+    np.testing.assert_equal(store.values, expected.values)
+    np.testing.assert_equal(
+        store.starts,
+        expected.index.get_level_values("start").asi8,
+    )
+    np.testing.assert_equal(
+        store.ends,
+        expected.index.get_level_values("end").asi8,
+    )
+
+    # random access to files and segments
+    for file in files:
+        values, starts, ends = store[file]
+        assert isinstance(values, np.memmap)
+        np.testing.assert_equal(values, expected.loc[file].values)
+    for position in [0, -1]:
+        values, starts, ends = store[position]
+        np.testing.assert_equal(
+            values,
+            smile.process_index(store.index[[position]], root=root).values,
+        )
+
+    # open existing store
+    store_index = store.index
+    store = opensmile.FeatureStore(store_root)
+    np.testing.assert_equal(store.values, expected.values)
+    pd.testing.assert_index_equal(store.index, store_index)
+
+
+def test_feature_store_empty(tmpdir):
+    smile = opensmile.Smile()
+    store_root = os.path.join(tmpdir, "store")
+    index = audformat.filewise_index([pytest.WAV_FILE])
+    opensmile.FeatureStore.create(smile, index, store_root)
+    # existing store is overwritten
+    store = opensmile.FeatureStore.create(
+        smile,
+        audformat.filewise_index(),
+        store_root,
+    )
+    assert len(store) == 0
+    assert store.values.shape == (0, len(smile.feature_names))
+    assert store.starts.shape == store.ends.shape == (0,)
+
+
+def test_feature_store_errors(tmpdir):
+    smile = opensmile.Smile()
+    with pytest.raises(FileNotFoundError):
+        opensmile.FeatureStore(tmpdir)
+    index = audformat.filewise_index([pytest.WAV_FILE])
+    with pytest.raises(ValueError, match="batch_size"):
+        opensmile.FeatureStore.create(smile, index, tmpdir, batch_size=0)
+    store = opensmile.FeatureStore.create(smile, index, tmpdir)
+    with pytest.raises(IndexError):
+        store[1]
+    with pytest.raises(KeyError):
+        store["unknown.wav"]
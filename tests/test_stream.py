@@ -0,0 +1,276 @@
+import asyncio
+import time
+
+import numpy as np
+import pytest
+
+import opensmile
+
+
+@pytest.mark.parametrize(
+    "feature_set,feature_level,win_dur",
+    [
+        (
+            opensmile.FeatureSet.eGeMAPSv02,
+            opensmile.FeatureLevel.LowLevelDescriptors,
+            None,
+        ),
+        (
+            opensmile.FeatureSet.ComParE_2016,
+            opensmile.FeatureLevel.LowLevelDescriptors_Deltas,
+            None,
+        ),
+        (
+            opensmile.FeatureSet.eGeMAPSv02,
+            opensmile.FeatureLevel.Functionals,
+            1.0,
+        ),
+    ],
+)
+@pytest.mark.parametrize("chunk_size", [160, 4410, 100000])
+def test_stream(feature_set, feature_level, win_dur, chunk_size):
+    smile = opensmile.Smile(feature_set, feature_level, win_dur=win_dur)
+    signal = pytest.WAV_ARRAY
+
+    frames = []
+
+    def callback(values, start, end, latency):
+        frames.append((values, start, end, latency))
+
+    with opensmile.Stream(smile, pytest.WAV_SR, callback) as stream:
+        for offset in range(0, signal.shape[1], chunk_size):
+            stream.write(signal[:, offset : offset + chunk_size])
+    # closing twice has no effect
+    stream.close()
+
+    # features are identical to offline processing
+    expected = smile.process_signal(signal, pytest.WAV_SR)
+    assert stream.num_frames == len(expected)
+    assert stream.num_dropped == 0
+    values, starts, ends, latencies = zip(*frames)
+    np.testing.assert_equal(np.stack(values), expected.values)
+    # offline processing sets start of first frame
+    # and end of last frame to signal boundaries
+    np.testing.assert_allclose(
+        starts[1:],
+        expected.index.get_level_values("start")[1:].total_seconds(),
+        atol=1e-6,
+    )
+    np.testing.assert_allclose(
+        ends[:-1],
+        expected.index.get_level_values("end")[:-1].total_seconds(),
+        atol=1e-6,
+    )
+    assert all(latency >= 0 for latency in latencies)
+
+
+@pytest.mark.parametrize(
+    "feature_level",
+    [
+        opensmile.FeatureLevel.LowLevelDescriptors,
+        # openSMILE consumes input without emitting frames
+        opensmile.FeatureLevel.Functionals,
+    ],
+)
+def test_stream_async(feature_level):
+    smile = opensmile.Smile(opensmile.FeatureSet.eGeMAPSv02, feature_level)
+    signal = pytest.WAV_ARRAY
+    frames = []
+
+    async def main():
+        # writing waits for space in the small input buffer
+        stream = opensmile.Stream(
+            smile,
+            pytest.WAV_SR,
+            lambda values, *args: frames.append(values),
+            buffer_dur=0.1,
+        )
+        await stream.awrite(signal)
+        await stream.aclose()
+        # closing twice has no effect
+        await stream.aclose()
+
+    asyncio.run(main())
+    expected = smile.process_signal(signal, pytest.WAV_SR)
+    np.testing.assert_equal(np.stack(frames), expected.values)
+
+
+def test_stream_drop():
+    smile = opensmile.Smile(
+        opensmile.FeatureSet.eGeMAPSv02,
+        opensmile.FeatureLevel.LowLevelDescriptors,
+    )
+    frames = []
+
+    def slow_callback(values, start, end, latency):
+        frames.append(latency)
+        time.sleep(0.01)
+
+    # consumer falls behind
+    # and late frames are dropped
+    with opensmile.Stream(
+        smile,
+        pytest.WAV_SR,
+        slow_callback,
+        max_latency=0.1,
+    ) as stream:
+        stream.write(pytest.WAV_ARRAY[:, : pytest.WAV_SR * 2])
+    assert stream.num_dropped > 0
+    assert stream.num_frames == len(frames) + stream.num_dropped
+    assert all(latency <= 0.1 for latency in frames)
+
+
+def test_stream_errors():
+    smile = opensmile.Smile(
+        opensmile.FeatureSet.eGeMAPSv02,
+        opensmile.FeatureLevel.LowLevelDescriptors,
+    )
+    signal = pytest.WAV_ARRAY
+
+    # sampling rate
+    with pytest.raises(ValueError, match="Sampling rate"):
+        opensmile.Stream(
+            opensmile.Smile(sampling_rate=16000),
+            8000,
+            lambda *args: None,
+        )
+
+    # channels
+    with opensmile.Stream(smile, pytest.WAV_SR, lambda *args: None) as stream:
+        with pytest.raises(ValueError, match="mono"):
+            stream.write(np.zeros((2, 100)))
+    with pytest.raises(RuntimeError, match="closed"):
+        stream.write(signal)
+
+    # error in callback
+    def callback(values, start, end, latency):
+        raise ValueError("callback failed")
+
+    stream = opensmile.Stream(smile, pytest.WAV_SR, callback)
+    with pytest.raises(RuntimeError, match="callback failed"):
+        for _ in range(100):
+            stream.write(signal)
+    with pytest.raises(RuntimeError, match="callback failed"):
+        stream.close()
+    with pytest.raises(ValueError, match="other error"):
+        with opensmile.Stream(smile, pytest.WAV_SR, callback) as stream:
+            stream.write(signal[:, :4410])
+            # wait until callback has failed
+            time.sleep(0.5)
+            raise ValueError("other error")
+
+    # functionals of test config need the whole input
+    smile = opensmile.Smile(pytest.CONFIG_FILE, "func")
+    stream = opensmile.Stream(smile, pytest.WAV_SR, lambda *args: None, buffer_dur=0.01)
+    with pytest.raises(RuntimeError, match="Input buffer"):
+        stream.write(signal)
+    with pytest.raises(RuntimeError, match="Input buffer"):
+        stream.close()
+
+
+async def chunks(signal, chunk_size, delay=0.0):
+    for offset in range(0, signal.shape[1], chunk_size):
+        await asyncio.sleep(delay)
+        yield signal[:, offset : offset + chunk_size]
+
+
+@pytest.mark.parametrize("max_frames", [1, 100])
+@pytest.mark.parametrize("output_dtype", ["float32", "float16"])
+def test_astream(max_frames, output_dtype):
+    smile = opensmile.Smile(
+        opensmile.FeatureSet.eGeMAPSv02,
+        opensmile.FeatureLevel.LowLevelDescriptors,
+        output_dtype=output_dtype,
+    )
+    signal = pytest.WAV_ARRAY
+
+    async def extract(signal, slow):
+        frames = []
+        async for frame in smile.astream(
+            chunks(signal, 1600),
+            pytest.WAV_SR,
+            max_frames=max_frames,
+            buffer_dur=0.1,
+        ):
+            frames.append(frame)
+            if slow:
+                # slow consumer pauses openSMILE
+                await asyncio.sleep(0.001)
+        return frames
+
+    async def main():
+        # concurrent streams in one event loop
+        return await asyncio.gather(
+            extract(signal, False),
+            extract(signal[:, : pytest.WAV_SR], True),
+        )
+
+    for y, frames in zip(
+        [signal, signal[:, : pytest.WAV_SR]],
+        asyncio.run(main()),
+    ):
+        expected = smile.process_signal(y, pytest.WAV_SR)
+        values, starts, ends = zip(*frames)
+        assert all(value.dtype == output_dtype for value in values)
+        np.testing.assert_equal(np.stack(values), expected.values)
+        np.testing.assert_allclose(
+            starts[1:],
+            expected.index.get_level_values("start")[1:].total_seconds(),
+            atol=1e-6,
+        )
+
+
+def test_astream_stop():
+    smile = opensmile.Smile(
+        opensmile.FeatureSet.eGeMAPSv02,
+        opensmile.FeatureLevel.LowLevelDescriptors,
+    )
+
+    async def first_frames(num_frames, delay):
+        frames = []
+        stream = smile.astream(
+            chunks(pytest.WAV_ARRAY, 1600, delay),
+            pytest.WAV_SR,
+            max_frames=1,
+        )
+        async for frame in stream:
+            frames.append(frame)
+            if len(frames) == num_frames:
+                break
+        await stream.aclose()
+        return frames
+
+    # consumer stops while openSMILE waits for chunks
+    # or for space in the queue
+    assert len(asyncio.run(first_frames(5, 0.01))) == 5
+    assert len(asyncio.run(first_frames(5, 0.0))) == 5
+
+
+def test_astream_errors():
+    smile = opensmile.Smile(
+        opensmile.FeatureSet.eGeMAPSv02,
+        opensmile.FeatureLevel.LowLevelDescriptors,
+    )
+
+    async def extract(chunks, **kwargs):
+        return [frame async for frame in smile.astream(chunks, pytest.WAV_SR, **kwargs)]
+
+    with pytest.raises(ValueError, match="max_frames"):
+        asyncio.run(extract(chunks(pytest.WAV_ARRAY, 1600), max_frames=0))
+
+    # channels
+    with pytest.raises(ValueError, match="mono"):
+        asyncio.run(extract(chunks(np.zeros((2, 3200)), 1600)))
+
+    # error while reading chunks
+    async def failing_chunks():
+        yield pytest.WAV_ARRAY[:, :1600]
+        raise OSError("connection lost")
+
+    with pytest.raises(OSError, match="connection lost"):
+        asyncio.run(extract(failing_chunks()))
+
+    # functionals of test config need the whole input
+    smile = opensmile.Smile(pytest.CONFIG_FILE, "func")
+    with pytest.raises(RuntimeError, match="Input buffer"):
+        asyncio.run(extract(chunks(pytest.WAV_ARRAY, 16000), buffer_dur=0.01))
@@ -0,0 +1,69 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import audiofile
+
+import opensmile
+from opensmile.core.workers import _call
+from opensmile.core.workers import _smiles
+
+
+@pytest.mark.parametrize("reuse_engine", [False, True])
+def test_worker_pool(tmpdir, reuse_engine):
+    smile = opensmile.Smile(
+        opensmile.FeatureSet.eGeMAPSv02,
+        opensmile.FeatureLevel.Functionals,
+        sampling_rate=pytest.WAV_SR,
+        reuse_engine=reuse_engine,
+    )
+    signals = [pytest.WAV_ARRAY[:, : pytest.WAV_SR * (idx + 1)] for idx in range(3)]
+    files = []
+    for idx, signal in enumerate(signals):
+        file = f"{idx}.wav"
+        audiofile.write(os.path.join(tmpdir, file), signal, pytest.WAV_SR)
+        files.append(file)
+
+    with opensmile.WorkerPool(smile, 2) as pool:
+        assert pool.sampling_rates == [pytest.WAV_SR]
+        assert pool._key in _smiles
+
+        ys = pool.process_arrays(signals, pytest.WAV_SR)
+        expected = smile.process_arrays(signals, pytest.WAV_SR)
+        for y, y_expected in zip(ys, expected):
+            for values, values_expected in zip(y, y_expected):
+                np.testing.assert_equal(values, values_expected)
+
+        y = pool.process_files(files, root=str(tmpdir))
+        pd.testing.assert_frame_equal(
+            y,
+            smile.process_files(files, root=str(tmpdir)),
+        )
+
+        # pool runs other tasks as well
+        index = y.index
+        job = opensmile.Job(smile, index, os.path.join(tmpdir, "job"), root=tmpdir)
+        pd.testing.assert_frame_equal(job.run(pool), y)
+
+    assert pool._key not in _smiles
+
+
+def test_worker_pool_call():
+    # tasks run in forked workers,
+    # so call them in the current process as well
+    smile = opensmile.Smile(
+        opensmile.FeatureSet.eGeMAPSv02,
+        opensmile.FeatureLevel.Functionals,
+    )
+    with opensmile.WorkerPool(smile, 1) as pool:
+        assert pool.sampling_rates == []
+        values, starts, ends = _call(
+            pool._key,
+            "process_array",
+            np.zeros(16000),
+            16000,
+        )
+    assert values.shape == (1, len(smile.feature_names))
+    assert ends.tolist() == [1_000_000_000]